@@ -0,0 +1,56 @@
+"""add composite indexes for hot query shapes and unique (course_id, tag_id)
+
+資料表本身由 backend.main 的 lifespan 以 create_all 建立；這個 revision 只補上
+既有資料庫缺少的索引，新資料庫已由 create_all 建好，因此都用 if_not_exists。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_courses_user_id_updated_at", "courses", ["user_id", "updated_at", "id"]),
+    ("ix_knowledge_points_course_id_created_at", "knowledge_points", ["course_id", "created_at", "id"]),
+    ("ix_action_items_user_id_created_at", "action_items", ["user_id", "created_at", "id"]),
+    ("ix_action_items_course_id_user_id_created_at", "action_items", ["course_id", "user_id", "created_at"]),
+    ("ix_action_items_knowledge_point_id", "action_items", ["knowledge_point_id"]),
+    ("ix_review_logs_user_id_review_date", "review_logs", ["user_id", "review_date", "id"]),
+    ("ix_review_logs_course_id_user_id_review_date", "review_logs", ["course_id", "user_id", "review_date"]),
+    ("ix_tags_user_id_name", "tags", ["user_id", "name", "id"]),
+    ("ix_course_tags_tag_id", "course_tags", ["tag_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+    # 先移除重複的課程標籤，保留最早的一筆，才能建立唯一索引
+    op.execute(sa.text(
+        "DELETE FROM course_tags WHERE id NOT IN ("
+        "SELECT MIN(id) FROM course_tags GROUP BY course_id, tag_id)"
+    ))
+    op.create_index(
+        "uq_course_tags_course_id_tag_id", "course_tags", ["course_id", "tag_id"],
+        unique=True, if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_course_tags_course_id_tag_id", table_name="course_tags", if_exists=True)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
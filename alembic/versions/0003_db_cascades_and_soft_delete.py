@@ -0,0 +1,56 @@
+"""cascade user-owned rows at the database level and add courses.deleted_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+USER_OWNED_TABLES = ["courses", "action_items", "review_logs", "tags"]
+
+# SQLite 的外鍵沒有名稱，batch 模式需要命名規則才能找到並替換
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_user_fk(table: str, ondelete) -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        with op.batch_alter_table(table, recreate="always", naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(f"fk_{table}_user_id_users", type_="foreignkey")
+            batch_op.create_foreign_key(f"fk_{table}_user_id_users", "users", ["user_id"], ["id"], ondelete=ondelete)
+        return
+
+    for fk in sa.inspect(bind).get_foreign_keys(table):
+        if fk["referred_table"] == "users" and fk["constrained_columns"] == ["user_id"]:
+            op.drop_constraint(fk["name"], table, type_="foreignkey")
+    op.create_foreign_key(f"{table}_user_id_fkey", table, "users", ["user_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("courses")}
+    if "deleted_at" not in columns:
+        op.add_column("courses", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+
+    for table in USER_OWNED_TABLES:
+        _replace_user_fk(table, "CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in USER_OWNED_TABLES:
+        _replace_user_fk(table, None)
+
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("deleted_at")
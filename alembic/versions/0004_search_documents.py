@@ -0,0 +1,93 @@
+"""add search_documents with tsvector/GIN (PostgreSQL) or FTS5 (SQLite) and backfill it
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models import SEARCH_INDEX_DDL
+from backend.search import build_document
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_search_documents_entity_type_entity_id", ["entity_type", "entity_id"]),
+    ("ix_search_documents_user_id", ["user_id"]),
+    ("ix_search_documents_course_id", ["course_id"]),
+    ("ix_search_documents_knowledge_point_id", ["knowledge_point_id"]),
+    ("ix_search_documents_review_log_id", ["review_log_id"]),
+]
+
+# 既有資料的來源查詢；知識點沒有 user_id，由課程取得
+SOURCES = {
+    "course": "SELECT * FROM courses",
+    "knowledge_point": (
+        "SELECT knowledge_points.*, courses.user_id FROM knowledge_points "
+        "JOIN courses ON courses.id = knowledge_points.course_id"
+    ),
+    "review_log": "SELECT * FROM review_logs",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # 新資料庫可能已由 create_all 建好，這時只需要回填
+    if not sa.inspect(bind).has_table("search_documents"):
+        op.create_table(
+            "search_documents",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("knowledge_point_id", sa.Integer(),
+                      sa.ForeignKey("knowledge_points.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("review_log_id", sa.Integer(),
+                      sa.ForeignKey("review_logs.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("entity_type", sa.String(length=20), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("body", sa.Text(), nullable=True),
+            sa.Column("title_tokens", sa.Text(), nullable=False),
+            sa.Column("body_tokens", sa.Text(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        for name, columns in INDEXES:
+            op.create_index(name, "search_documents", columns)
+
+    for statement in SEARCH_INDEX_DDL.get(bind.dialect.name, []):
+        op.execute(statement)
+
+    documents = sa.table(
+        "search_documents",
+        *(sa.column(name) for name in (
+            "user_id", "course_id", "knowledge_point_id", "review_log_id", "entity_type", "entity_id",
+            "title", "body", "title_tokens", "body_tokens", "updated_at",
+        )),
+    )
+    op.execute(documents.delete())
+    now = datetime.utcnow()
+    for entity_type, query in SOURCES.items():
+        rows = [
+            {**build_document(row.user_id, entity_type, row), "updated_at": now}
+            for row in bind.execute(sa.text(query))
+        ]
+        if rows:
+            op.bulk_insert(documents, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    op.drop_table("search_documents")
@@ -0,0 +1,80 @@
+"""add sync_tombstones with delete triggers and updated_at indexes for /api/sync
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models import SYNC_TOMBSTONE_DDL, SYNC_TOMBSTONE_SOURCES
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_knowledge_points_course_id_updated_at", "knowledge_points", ["course_id", "updated_at"]),
+    ("ix_action_items_user_id_updated_at", "action_items", ["user_id", "updated_at"]),
+    ("ix_review_logs_user_id_updated_at", "review_logs", ["user_id", "updated_at"]),
+    ("ix_tags_user_id_updated_at", "tags", ["user_id", "updated_at"]),
+    ("ix_course_tags_course_id_created_at", "course_tags", ["course_id", "created_at"]),
+]
+
+
+def _columns(table: str) -> set:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 新資料庫可能已由 create_all 建好
+    if "updated_at" not in _columns("tags"):
+        op.add_column("tags", sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(sa.text("UPDATE tags SET updated_at = created_at"))
+    if "created_at" not in _columns("course_tags"):
+        op.add_column("course_tags", sa.Column("created_at", sa.DateTime(), nullable=True))
+        op.execute(sa.text("UPDATE course_tags SET created_at = CURRENT_TIMESTAMP"))
+
+    if not sa.inspect(op.get_bind()).has_table("sync_tombstones"):
+        op.create_table(
+            "sync_tombstones",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("entity_type", sa.String(length=20), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_sync_tombstones_user_id_deleted_at", "sync_tombstones", ["user_id", "deleted_at"])
+        op.create_index("ix_sync_tombstones_deleted_at", "sync_tombstones", ["deleted_at"])
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+    for statement in SYNC_TOMBSTONE_DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table in SYNC_TOMBSTONE_SOURCES:
+        if dialect == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}")
+            op.execute(f"DROP FUNCTION IF EXISTS {table}_sync_tombstone()")
+        else:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_sync_tombstone")
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    op.drop_table("sync_tombstones")
+    with op.batch_alter_table("course_tags") as batch_op:
+        batch_op.drop_column("created_at")
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,40 @@
+"""recreate the course_tags tombstone trigger to find the owner through courses
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend.models import SYNC_TOMBSTONE_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_course_tags_trigger() -> None:
+    dialect = op.get_bind().dialect.name
+    # PostgreSQL 以 CREATE OR REPLACE 更新 function；SQLite 的 trigger 要先刪除再建立
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS course_tags_sync_tombstone")
+    for statement in SYNC_TOMBSTONE_DDL.get(dialect, []):
+        if "course_tags_sync_tombstone" in statement:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_course_tags_trigger()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 舊的 trigger 在刪除標籤時找不到擁有者，不還原
+    pass
@@ -1,25 +1,133 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 import bcrypt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.config import get_settings
-from backend.database import get_db
+from backend.database import AsyncSessionLocal, get_db, read_session
 from backend.models import User
 
 settings = get_settings()
 security = HTTPBearer()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+@dataclass(frozen=True)
+class CurrentUser:
+    """由已驗證的 JWT claims 建立的使用者身分，不需查詢資料庫"""
+    id: int
+    email: str
+    name: str
+    token_version: int = 0
+
+
+class TTLCache:
+    """有容量上限的 LRU + TTL 快取"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[object, Tuple[float, object]]" = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+# token -> CurrentUser，重複的請求可略過 HMAC 驗證
+_token_cache = TTLCache(settings.auth_token_cache_size, settings.auth_token_cache_ttl_seconds)
+# user_id -> token_version，撤銷檢查不必每個請求都查資料庫；多個 worker 間最多延遲一個 TTL
+_token_version_cache = TTLCache(settings.auth_token_cache_size, settings.auth_token_version_ttl_seconds)
+
+
+# bcrypt 每次約耗時數百毫秒，放到專用執行緒池避免卡住 event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash",
+)
+# 已送進執行緒池、還沒執行完的工作數；請求取消後 bcrypt 仍會跑完，所以在工作結束時才減少
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+
+def _hash_job_done(future) -> None:
+    global _hash_pending
+    with _hash_pending_lock:
+        _hash_pending -= 1
+
+
+async def _run_hash_job(fn, *args):
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= settings.password_hash_workers + settings.password_hash_max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        _hash_pending += 1
+    try:
+        job = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_job_done(None)
+        raise
+    # 回呼在工作執行完（或排隊中被取消）時於執行緒池中呼叫
+    job.add_done_callback(_hash_job_done)
+    return await asyncio.wrap_future(job)
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(_checkpw, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    return await _run_hash_job(_hashpw, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt 雜湊格式為 $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -32,26 +140,113 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def create_user_token(user: User) -> str:
+    remember_token_version(user.id, user.token_version)
+    return create_access_token({
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "ver": user.token_version,
+    })
+
+
+def remember_token_version(user_id: int, token_version: int) -> None:
+    _token_version_cache.set(user_id, token_version)
+
+
+def forget_user(user_id: int) -> None:
+    # 下一個請求會重新查詢 token_version，找不到使用者即回 401
+    _token_version_cache.pop(user_id)
+
+
+def decode_access_token(token: str) -> Optional[CurrentUser]:
+    principal = _token_cache.get(token)
+    if principal is not None:
+        return principal
+
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return None
+    user_id = payload.get("id")
+    if user_id is None:
+        return None
+
+    principal = CurrentUser(
+        id=user_id,
+        email=payload.get("email", ""),
+        name=payload.get("name", ""),
+        token_version=payload.get("ver", 0),
+    )
+    _token_cache.set(token, principal, ttl=payload["exp"] - time.time() if "exp" in payload else None)
+    return principal
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id: int = payload.get("id")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id))
+
+async def _load_token_version(user_id: int, read: bool) -> Optional[int]:
+    """查詢 token_version，查完即關閉 session
+
+    read=True 時經由唯讀 session（有設定時走複本），讀取端點不必為了驗證連到主資料庫。
+    """
+    stmt = select(User.token_version).where(User.id == user_id)
+    if read:
+        async with aclosing(read_session(user_id)) as sessions:
+            async for db in sessions:
+                return (await db.execute(stmt)).scalar_one_or_none()
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def _authenticate(token: str, read: bool) -> CurrentUser:
+    """驗證 JWT 並確認沒有被撤銷；token_version 快取未命中時才查資料庫"""
+    principal = decode_access_token(token)
+    if principal is None:
+        raise _credentials_exception()
+
+    token_version = _token_version_cache.get(principal.id)
+    if token_version is None:
+        token_version = await _load_token_version(principal.id, read)
+        if token_version is None:
+            raise _credentials_exception()
+        remember_token_version(principal.id, token_version)
+
+    if principal.token_version != token_version:
+        _token_cache.pop(token)
+        raise _credentials_exception()
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> CurrentUser:
+    """不依賴 get_db：GET 端點只開唯讀 session，串流回應也不會在整段期間占住連線"""
+    principal = await _authenticate(credentials.credentials, read=request.method in ("GET", "HEAD"))
+    # get_db commit 後據此記錄這位使用者剛寫入過，讀取暫時改走主資料庫
+    request.state.user_id = principal.id
+    return principal
+
+
+async def get_read_db(current_user: CurrentUser = Depends(get_current_user)):
+    """GET 端點使用的唯讀 session，不 autoflush 也不 commit，有設定時改走讀取複本"""
+    async for session in read_session(current_user.id):
+        yield session
+
+
+async def get_current_user_record(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """需要完整 User 資料列的端點才使用，會多一次資料庫查詢"""
+    result = await db.execute(select(User).where(User.id == current_user.id))
     user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
@@ -0,0 +1,288 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Tuple
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import read_session
+from backend.models import Tag, Course, CourseTag, KnowledgePoint, ActionItem, ReviewLog
+from backend.search import index_documents
+
+# 依相依順序輸出，匯入時父資料一定先於子資料出現
+EXPORT_TABLES = {
+    "tag": Tag,
+    "course": Course,
+    "course_tag": CourseTag,
+    "knowledge_point": KnowledgePoint,
+    "action_item": ActionItem,
+    "review_log": ReviewLog,
+}
+# 屬於帳號而非資料本身的欄位，不匯出也不接受匯入
+SKIPPED_COLUMNS = {"user_id", "deleted_at"}
+# 外鍵欄位 -> 被參照的資料類型，匯入時改寫成新的 id
+REFERENCES = {"course_id": "course", "tag_id": "tag", "knowledge_point_id": "knowledge_point"}
+SEARCHABLE = {"course", "knowledge_point", "review_log"}
+
+EXPORT_BATCH_SIZE = 500
+EXPORT_FLUSH_BYTES = 64 * 1024
+IMPORT_CHUNK_SIZE = 500
+# 單筆紀錄的上限，避免沒有換行的上傳內容一直堆在記憶體裡
+MAX_RECORD_BYTES = 10 * 1024 * 1024
+
+
+class BackupFormatError(ValueError):
+    """上傳內容格式錯誤"""
+
+
+def _columns(model) -> List[str]:
+    return [column.name for column in model.__table__.columns if column.name not in SKIPPED_COLUMNS]
+
+
+CSV_COLUMNS = ["type"] + list(dict.fromkeys(
+    name for model in EXPORT_TABLES.values() for name in _columns(model)
+))
+
+
+def _export_query(name: str, model, user_id: int):
+    stmt = select(*(model.__table__.c[name] for name in _columns(model)))
+    if model is Tag:
+        stmt = stmt.where(Tag.user_id == user_id)
+    elif model is Course:
+        stmt = stmt.where(Course.user_id == user_id, Course.deleted_at.is_(None))
+    else:
+        stmt = stmt.join(Course, Course.id == model.course_id).where(
+            Course.user_id == user_id, Course.deleted_at.is_(None)
+        )
+    return stmt.order_by(model.id)
+
+
+async def export_rows(user_id: int) -> AsyncIterator[Tuple[str, dict]]:
+    """以 server-side cursor 逐批讀出使用者的所有資料，不會一次載入記憶體
+
+    在自己的唯讀 session 裡執行，因為 StreamingResponse 會在端點返回後才開始讀取。
+    """
+    async for db in read_session(user_id):
+        for name, model in EXPORT_TABLES.items():
+            result = await db.stream(
+                _export_query(name, model, user_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for row in result.mappings():
+                yield name, row
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def export_ndjson(user_id: int) -> AsyncIterator[bytes]:
+    lines = []
+    size = 0
+    async for name, row in export_rows(user_id):
+        line = json.dumps({"type": name, **row}, ensure_ascii=False, default=_json_default) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= EXPORT_FLUSH_BYTES:
+            yield "".join(lines).encode("utf-8")
+            lines, size = [], 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+async def export_csv(user_id: int) -> AsyncIterator[bytes]:
+    # 所有類型共用一張表，以 type 欄區分，不適用的欄位留空
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    async for name, row in export_rows(user_id):
+        writer.writerow([name if column == "type" else _csv_value(row.get(column)) for column in CSV_COLUMNS])
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(pending) > MAX_RECORD_BYTES:
+            raise BackupFormatError("Record too large")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    line_number = 0
+    async for line in _iter_lines(stream):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            raise BackupFormatError(f"Line {line_number}: invalid JSON")
+        if not isinstance(record, dict):
+            raise BackupFormatError(f"Line {line_number}: expected an object")
+        yield record
+
+
+async def parse_csv(stream: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    header = None
+    record = ""
+    async for line in _iter_lines(stream):
+        record += line
+        # 引號成對才代表這筆紀錄結束（欄位內可以有換行）
+        if record.count('"') % 2:
+            if len(record) > MAX_RECORD_BYTES:
+                raise BackupFormatError("Record too large")
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        yield {column: value for column, value in zip(header, values) if value != ""}
+
+
+def _parse_int(value) -> int:
+    # CSV 的值都是字串；NDJSON 只接受整數（或小數部分為 0 的數字），不截斷小數
+    if isinstance(value, bool):
+        raise TypeError("expected an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value)
+    raise ValueError("expected an integer")
+
+
+def _parse_value(column, value):
+    """依欄位型別檢查並轉換匯入的值；型別不符時拋出 ValueError / TypeError，不強制轉換"""
+    if value is None or value == "":
+        return None
+    python_type = column.type.python_type
+    if python_type is int:
+        return _parse_int(value)
+    if python_type is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ("true", "false", "1", "0"):
+            return value.lower() in ("true", "1")
+        raise ValueError("expected a boolean")
+    if python_type is Decimal:
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise TypeError("expected a number")
+        number = Decimal(str(value))
+        if not number.is_finite():
+            raise ValueError("expected a finite number")
+        return number
+    if not isinstance(value, str):
+        raise TypeError(f"expected a string, got {type(value).__name__}")
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return value
+
+
+class Importer:
+    """把匯出檔的紀錄分批寫入，並把舊 id 對應到新 id
+
+    只保留會被參照的類型（標籤、課程、知識點）的 id 對照表，其他資料寫入後即釋放。
+    """
+
+    def __init__(self, db: AsyncSession, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.id_maps: Dict[str, Dict[int, int]] = {name: {} for name in set(REFERENCES.values())}
+        self.pending: Dict[str, List[Tuple[int, dict]]] = {name: [] for name in EXPORT_TABLES}
+        self.counts: Dict[str, int] = {name: 0 for name in EXPORT_TABLES}
+
+    async def add(self, record: dict) -> None:
+        name = record.get("type")
+        model = EXPORT_TABLES.get(name)
+        if model is None:
+            raise BackupFormatError(f"Unknown record type: {name!r}")
+
+        columns = model.__table__.c
+        try:
+            old_id = _parse_int(record["id"])
+            row = {
+                key: _parse_value(columns[key], value)
+                for key, value in record.items()
+                if key in columns and key not in SKIPPED_COLUMNS and key != "id"
+            }
+        except (KeyError, ValueError, TypeError, ArithmeticError):
+            raise BackupFormatError(f"Invalid {name} record")
+
+        for key, parent in REFERENCES.items():
+            if row.get(key) is not None:
+                row[key] = await self._resolve(parent, row[key])
+        if "user_id" in columns:
+            row["user_id"] = self.user_id
+
+        self.pending[name].append((old_id, row))
+        if len(self.pending[name]) >= IMPORT_CHUNK_SIZE:
+            await self.flush(name)
+
+    async def _resolve(self, parent: str, old_id: int) -> int:
+        if old_id not in self.id_maps[parent]:
+            await self.flush(parent)
+        try:
+            return self.id_maps[parent][old_id]
+        except KeyError:
+            raise BackupFormatError(f"Reference to unknown {parent} {old_id}")
+
+    async def flush(self, name: str) -> None:
+        batch = self.pending[name]
+        if not batch:
+            return
+        self.pending[name] = []
+        model = EXPORT_TABLES[name]
+        result = await self.db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [row for _, row in batch],
+        )
+        new_ids = result.all()
+        if name in self.id_maps:
+            self.id_maps[name].update((old_id, new_id) for (old_id, _), new_id in zip(batch, new_ids))
+        if name in SEARCHABLE:
+            await index_documents(
+                self.db, self.user_id, name,
+                [
+                    SimpleNamespace(**{**dict.fromkeys(_columns(model)), **row, "id": new_id})
+                    for (_, row), new_id in zip(batch, new_ids)
+                ],
+            )
+        self.counts[name] += len(batch)
+
+    async def finish(self) -> Dict[str, int]:
+        for name in EXPORT_TABLES:
+            await self.flush(name)
+        return self.counts
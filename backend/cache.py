@@ -0,0 +1,212 @@
+import functools
+import inspect
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from backend.config import get_settings
+from backend.fast_json import JSONBytes
+
+settings = get_settings()
+
+
+class CacheBackend(ABC):
+    """回應快取的儲存層介面
+
+    快取 key 內含 (user, resource) 在資料庫中的版本號（cache_versions），寫入時遞增版本號，
+    舊 key 便不再被讀到並自然淘汰；後端只存放回應本文，不需要跨 worker 同步。
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """單一行程內的 LRU + TTL 快取，以筆數與位元組總量設上限"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 弱比較：忽略 W/ 前綴
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+BACKENDS = {
+    "memory": lambda: MemoryCacheBackend(
+        max_entries=settings.response_cache_max_entries,
+        max_bytes=settings.response_cache_max_bytes,
+    ),
+}
+
+
+def register_backend(name: str, factory) -> None:
+    """註冊其他快取後端，之後以 RESPONSE_CACHE_BACKEND=<name> 啟用"""
+    BACKENDS[name] = factory
+
+
+class ResponseCache:
+    """以使用者與資源分區的 API 回應快取"""
+
+    def __init__(self):
+        self._backend: Optional[CacheBackend] = None
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = BACKENDS[settings.response_cache_backend]()
+        return self._backend
+
+    def cached(self, resource: Union[str, Tuple[str, ...]], response_model):
+        """快取 GET 端點序列化後的 JSON，並以資料庫中的版本號產生弱 ETag 支援 304
+
+        端點需有 `current_user` 與 `db` 參數；組合多種資源的端點可傳入 tuple，任一資源失效即重算。
+        版本號與資料在同一個 session 讀取，多個 worker 或重啟後產生的 ETag 都一致。
+        端點回傳 JSONBytes（見 backend/fast_json.py）時直接作為回應本文，略過 pydantic 驗證。
+        """
+        adapter = TypeAdapter(response_model)
+        resources = (resource,) if isinstance(resource, str) else resource
+        resource_key = "+".join(resources)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, _cache_request: Request, **kwargs):
+                user_id = kwargs["current_user"].id
+                # 先讀版本號再讀資料：兩者同一個交易寫入，不會拿舊版本號配上舊資料以外的組合
+                versions = await self._load_versions(kwargs["db"], user_id, resources)
+                generation = ".".join(str(versions.get(name, 0)) for name in resources)
+                params = ",".join(
+                    f"{name}={vars(value) if hasattr(value, '__dict__') else value!r}"
+                    for name, value in sorted(kwargs.items())
+                    if name not in ("current_user", "db")
+                )
+                key = f"{user_id}:{resource_key}:{generation}:{func.__name__}:{params}"
+                etag = f'W/"{generation}-{zlib.crc32(key.encode()):08x}"'
+                headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+                # 資料沒變就直接回 304，不載入也不序列化任何資料列
+                if _etag_matches(_cache_request.headers.get("if-none-match"), etag):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+                body = await self.backend.get(key) if settings.response_cache_enabled else None
+                if body is None:
+                    result = await func(*args, **kwargs)
+                    if isinstance(result, JSONBytes):
+                        body = bytes(result)
+                    else:
+                        body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+                    if settings.response_cache_enabled:
+                        await self.backend.set(key, body, settings.response_cache_ttl_seconds)
+                return Response(content=body, media_type="application/json", headers=headers)
+
+            signature = inspect.signature(func)
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ])
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    async def _load_versions(db, user_id: int, resources: Tuple[str, ...]) -> dict:
+        from backend.models import CacheVersion
+
+        result = await db.execute(
+            select(CacheVersion.resource, CacheVersion.version)
+            .where(CacheVersion.user_id == user_id, CacheVersion.resource.in_(resources))
+        )
+        return dict(result.all())
+
+    def invalidate(self, db, user_id: int, *resources: str) -> None:
+        """登記要失效的資源；get_db 在 commit 前遞增版本號，與資料一起 commit"""
+        db.info.setdefault("cache_invalidations", set()).update(
+            (user_id, resource) for resource in resources
+        )
+
+    async def bump_versions(self, db) -> None:
+        from backend.models import CacheVersion
+
+        namespaces = sorted(db.info.pop("cache_invalidations", ()))
+        if not namespaces:
+            return
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(CacheVersion).values([
+            {"user_id": user_id, "resource": resource, "version": 1} for user_id, resource in namespaces
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.user_id, CacheVersion.resource],
+            set_={"version": CacheVersion.version + 1},
+        ))
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,171 @@
+import asyncio
+import zlib
+from typing import Callable, Dict, List, Optional
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from backend.config import get_settings
+from backend.static_assets import accepted_encodings
+
+settings = get_settings()
+
+# 只壓縮文字類回應；text/event-stream 需要即時送出，不經過壓縮
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+    "text/plain", "text/csv", "text/html", "text/css", "text/xml",
+)
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Z_SYNC_FLUSH 讓每個串流區塊都能立即被客戶端解開
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+COMPRESSORS: Dict[str, Callable] = {"gzip": _Gzip, "br": _Brotli, "zstd": _Zstd}
+
+
+def available_encodings() -> List[str]:
+    """依 compression_encodings 的偏好順序，列出支援的編碼"""
+    return [name.strip() for name in settings.compression_encodings.split(",") if name.strip() in COMPRESSORS]
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    return next((name for name in available_encodings() if name in accepted or "*" in accepted), None)
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (
+        content_type in COMPRESSIBLE_TYPES
+        and "content-encoding" not in headers
+        and "content-range" not in headers
+    )
+
+
+async def _run(compressor, data: bytes, finish: bool = False) -> bytes:
+    # 大的本文交給執行緒壓縮，避免卡住 event loop；zlib / brotli / zstd 壓縮時都會釋放 GIL
+    work = compressor.finish if finish else compressor.compress
+    if len(data) >= settings.compression_offload_min_size:
+        return await asyncio.to_thread(work, data)
+    return work(data)
+
+
+class CompressionMiddleware:
+    """依 Accept-Encoding 壓縮 API 回應（zstd / br / gzip）
+
+    小於 compression_min_size 的回應原樣送出；串流回應（例如 /api/backup/export）
+    會先累積到門檻大小再開始逐塊壓縮，每塊都 flush，客戶端可以邊收邊解壓。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # HEAD 的 content-length 描述的是 GET 本文，不能改寫
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        compressor = None
+        pending: List[bytes] = []
+        pending_size = 0
+        passthrough = False
+
+        async def send_start(compressed: bool, content_length: Optional[int]) -> None:
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if compressed:
+                headers["content-encoding"] = encoding
+                # 壓縮後的表示與原本不同，強 ETag 改為弱 ETag
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["etag"] = "W/" + etag
+            if content_length is None:
+                if "content-length" in headers:
+                    del headers["content-length"]
+            else:
+                headers["content-length"] = str(content_length)
+            await send(start_message)
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, pending_size, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                if message["status"] in (204, 304) or message["status"] < 200 or not _compressible(headers):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                pending.append(body)
+                pending_size += len(body)
+                if pending_size < settings.compression_min_size:
+                    if more_body:
+                        return
+                    # 整個回應都小於門檻：原樣送出
+                    passthrough = True
+                    data = b"".join(pending)
+                    await send_start(False, len(data))
+                    await send({"type": "http.response.body", "body": data, "more_body": False})
+                    return
+                compressor = COMPRESSORS[encoding]()
+                body = b"".join(pending)
+                pending.clear()
+                if not more_body:
+                    data = await _run(compressor, body, finish=True)
+                    await send_start(True, len(data))
+                    await send({"type": "http.response.body", "body": data, "more_body": False})
+                    return
+                await send_start(True, None)
+
+            data = await _run(compressor, body, finish=not more_body)
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -11,14 +12,91 @@ class Settings(BaseSettings):
 
     # Database - 預設使用 SQLite 進行本地測試
     database_url: str = "sqlite+aiosqlite:///./aar.db"
+    database_replica_url: Optional[str] = None  # GET 的唯讀查詢改走此連線，未設定則使用主資料庫
+    database_replica_retry_seconds: int = 30  # 複本連不上時改用主資料庫，這段時間內不再嘗試
+    database_replica_lag_seconds: int = 5  # 使用者寫入後這段時間內的讀取仍走主資料庫，避免讀到舊資料
+    database_read_only_transactions: bool = False  # PostgreSQL 上對唯讀 session 執行 SET TRANSACTION READ ONLY
+    database_echo: bool = False  # 輸出每一句 SQL，只在本機除錯時開啟
+    database_pool_size: int = 10
+    database_max_overflow: int = 10  # 忙碌時可額外開啟的連線數，閒置後關閉
+    database_pool_timeout: float = 30  # 連線全部被占用時最多等待的秒數
+    database_pool_recycle: int = 1800  # 連線使用超過此秒數就重建，避免被伺服器或防火牆切斷
+    database_pool_pre_ping: bool = True
+    database_pool_warmup: bool = True  # 啟動時先建立 pool_size 條連線
+    database_statement_cache_size: int = 100  # asyncpg 每條連線快取的 prepared statement 數量
+    database_pgbouncer: bool = False  # 經由 PgBouncer transaction mode 連線時開啟，停用 prepared statement 快取
 
     # JWT
     jwt_secret: str = "dev-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 60 * 24 * 7  # 7 days
+    auth_token_cache_size: int = 10000  # 已驗證 token 的快取筆數上限
+    auth_token_cache_ttl_seconds: int = 300
+    auth_token_version_ttl_seconds: int = 60  # 撤銷 token 在其他 worker 生效的最長延遲
+
+    # Password hashing
+    bcrypt_rounds: int = 12  # 調整後，舊雜湊會在使用者下次登入時自動重算
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32  # 排隊超過此數量直接回 503
+
+    # Response cache
+    response_cache_enabled: bool = True
+    response_cache_backend: str = "memory"
+    response_cache_ttl_seconds: int = 60
+    response_cache_max_entries: int = 10000
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Metrics
+    metrics_enabled: bool = True  # 提供 /api/metrics（Prometheus 文字格式）
+    metrics_loop_lag_interval_seconds: float = 0.5
+
+    # Profiling（預設全部關閉，關閉時不掛上任何 middleware 或事件）
+    profile_sample_rate: float = 0.0  # 0~1，隨機剖析的請求比例
+    profile_header_token: Optional[str] = None  # 設定後，帶 X-Profile: <token> 標頭的請求一定會被剖析
+    profile_interval_ms: float = 1.0
+    profile_output_dir: str = "profiles"
+    slow_query_threshold_ms: Optional[float] = None  # 超過此毫秒數的 SQL 寫入 backend.slow_query 日誌
+
+    # Query guard（開發用）
+    query_guard: bool = False  # 開啟後關聯一律 lazy="raise"，請求超過查詢預算時記錄警告
+    query_budget_default: int = 10  # 沒有以 @query_budget 標註的端點使用此預算
+
+    # Response compression（/api/ 下的文字回應）
+    compression_enabled: bool = True
+    compression_encodings: str = "zstd,br,gzip"  # 偏好順序
+    compression_min_size: int = 1024  # 小於此位元組數的回應不壓縮
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    compression_offload_min_size: int = 64 * 1024  # 超過此大小的區塊在執行緒中壓縮，不占用 event loop
+
+    # Static files（前端建置結果 dist/）
+    static_asset_max_age_seconds: int = 365 * 24 * 3600  # assets/ 下帶雜湊的檔案
+    static_index_ttl_seconds: int = 60  # index.html 與其他檔案的快取秒數，也是記憶體中 index.html 的重新檢查間隔
+
+    # Delta sync（/api/sync）
+    sync_overlap_seconds: int = 5  # 查詢時往前多取的秒數，涵蓋較晚 commit 的交易與各 worker 的時鐘誤差
+    sync_tombstone_retention_days: int = 30  # 刪除紀錄保留天數；更舊的 token 會收到完整資料（reset）
+    sync_tombstone_purge_interval_seconds: int = 3600
+
+    # Live updates（/api/events，Server-Sent Events）
+    events_enabled: bool = True
+    events_broker: str = "memory"  # memory 只送給同一個 worker 的連線；多個 worker 時用 postgres（LISTEN/NOTIFY）
+    events_broker_url: Optional[str] = None  # postgres broker LISTEN 用的連線，未設定則用 database_url；經 PgBouncer transaction mode 時需指向資料庫本身
+    events_broker_retry_seconds: float = 5
+    events_max_connections: int = 1000  # 每個 worker 的串流連線上限，超過回 503
+    events_max_connections_per_user: int = 10  # 超過回 429
+    events_queue_size: int = 100  # 每條連線的待送事件上限，超過就丟棄並要求客戶端重新載入
+    events_max_items: int = 100  # 單一事件附帶的資料筆數上限，超過改送 invalidate
+    events_heartbeat_seconds: float = 15  # 沒有事件時送出註解行，避免代理伺服器切斷閒置連線
+
+    # Course deletion
+    course_soft_delete: bool = False  # 開啟後刪除課程只標記 deleted_at，由背景工作清除
+    course_purge_interval_seconds: int = 300
+    course_purge_batch_size: int = 100
 
     # Server
-    debug: bool = True
+    debug: bool = False
     port: int = 8000
 
 
@@ -1,47 +1,277 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
 from backend.config import get_settings
+from backend.cache import response_cache
+from backend.events import change_events
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def normalize_database_url(url: str) -> str:
+    # 自動轉換 PostgreSQL URL 為 asyncpg 格式
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+
+class PoolMetrics:
+    """連線池的取得延遲與飽和度，用來調整 pool_size / max_overflow"""
+
+    def __init__(self, window: int = 1024):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self._recent.append(seconds)
+
+    def snapshot(self, pool) -> dict:
+        recent = sorted(self._recent)
+        stats = {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_p95": round(recent[int(len(recent) * 0.95)] * 1000, 3) if recent else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "saturation": round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+            })
+        return stats
+
+
+# engine -> 連線池統計；記憶體中的 SQLite 沒有連線池可統計
+pool_metrics: Dict[AsyncEngine, Optional[PoolMetrics]] = {}
+
+
+def _metered_pool(metrics: PoolMetrics):
+    # 以子類別包住 connect()；engine.dispose() 重建連線池時沿用同一個類別，統計不會遺失
+    class MeteredPool(AsyncAdaptedQueuePool):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                metrics.timeouts += 1
+                raise
+            finally:
+                metrics.observe(time.perf_counter() - started)
+
+    return MeteredPool
+
+
+def _connect_args(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    if not url.startswith("postgresql+asyncpg"):
+        return {}
+    if settings.database_pgbouncer:
+        # transaction mode 下同一條伺服器連線會被不同客戶端共用，具名 prepared statement 會互相衝突
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.database_statement_cache_size,
+        "prepared_statement_cache_size": settings.database_statement_cache_size,
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    options = {"echo": settings.database_echo, "connect_args": _connect_args(url)}
+    parsed = make_url(url)
+    # 記憶體中的 SQLite 只能使用單一連線，維持 SQLAlchemy 預設的連線池
+    metrics = None
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        metrics = PoolMetrics()
+        options.update(
+            poolclass=_metered_pool(metrics),
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=settings.database_pool_pre_ping,
+        )
+    new_engine = create_async_engine(url, **options)
+    pool_metrics[new_engine] = metrics
+
+    # SQLite 預設不檢查外鍵，要開啟才會執行 ON DELETE CASCADE
+    if url.startswith("sqlite"):
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return new_engine
+
+
+async def warm_up_pool(target: AsyncEngine) -> None:
+    """同時建立 pool_size 條連線再放回連線池，讓第一批請求不必等待連線建立"""
+    if not isinstance(target.pool, QueuePool):
+        return
+    connections = await asyncio.gather(*(target.connect() for _ in range(target.pool.size())))
+    for connection in connections:
+        await connection.close()
+
+
+def pool_stats() -> dict:
+    engines = {"primary": engine, "replica": replica_engine}
+    return {
+        name: (pool_metrics[target] or PoolMetrics()).snapshot(target.pool)
+        for name, target in engines.items()
+        if target is not None
+    }
+
 
 # 支援 SQLite (本地測試) 和 PostgreSQL (生產環境)
-database_url = settings.database_url
-
-# 自動轉換 PostgreSQL URL 為 asyncpg 格式
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-elif database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
-
-# SQLite 需要特殊處理
-if database_url.startswith("sqlite"):
-    engine = create_async_engine(
-        database_url,
-        echo=settings.debug,
-        connect_args={"check_same_thread": False},
-    )
-else:
-    engine = create_async_engine(
-        database_url,
-        echo=settings.debug,
-    )
+database_url = normalize_database_url(settings.database_url)
+engine = _create_engine(database_url)
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(normalize_database_url(settings.database_replica_url))
+    if settings.database_replica_url else None
+)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+# 唯讀 session：不 autoflush、也不 commit
+ReadSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+) if replica_engine is not None else None
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db():
+# 記錄 session 是否真的寫入過，commit 後用來決定讀取是否要暫時改走主資料庫
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+# user_id -> 這個時間點前的讀取都走主資料庫
+_primary_reads_until: Dict[int, float] = {}
+_replica_down_until = 0.0
+
+
+def note_write(user_id: int) -> None:
+    if replica_engine is None:
+        return
+    now = time.monotonic()
+    _primary_reads_until[user_id] = now + settings.database_replica_lag_seconds
+    # 順便清掉過期的項目，避免字典無限成長
+    if len(_primary_reads_until) > 10000:
+        for key in [key for key, until in _primary_reads_until.items() if until <= now]:
+            del _primary_reads_until[key]
+
+
+async def _open_replica_session() -> Optional[AsyncSession]:
+    global _replica_down_until
+    if ReplicaSessionLocal is None or time.monotonic() < _replica_down_until:
+        return None
+    session = ReplicaSessionLocal()
+    try:
+        await session.connection()
+    except (OSError, SQLAlchemyError) as exc:
+        logger.warning("Read replica unavailable, falling back to primary: %s", exc)
+        _replica_down_until = time.monotonic() + settings.database_replica_retry_seconds
+        await session.close()
+        return None
+    return session
+
+
+async def read_session(user_id: Optional[int] = None, replica: bool = True) -> AsyncIterator[AsyncSession]:
+    """唯讀查詢用的 session：有設定複本時優先使用複本，結束時直接 rollback 不 commit
+
+    replica=False 一律讀主資料庫，給不能容忍複本延遲的查詢使用（例如 /api/sync）。
+    """
+    session = None
+    if replica and (user_id is None or _primary_reads_until.get(user_id, 0.0) <= time.monotonic()):
+        session = await _open_replica_session()
+    if session is None:
+        session = ReadSessionLocal()
+
+    async with session:
+        if settings.database_read_only_transactions and session.get_bind().dialect.name == "postgresql":
+            await session.execute(text("SET TRANSACTION READ ONLY"))
+        yield session
+
+
+def after_commit(session: AsyncSession, func, *args) -> None:
+    """登記 get_db commit 成功後才執行的工作；交易失敗時不會執行
+
+    FastAPI 的背景工作會在 get_db commit 之前執行，依賴這次寫入的工作要改用這裡。
+    """
+    session.info.setdefault("after_commit", []).append((func, args))
+
+
+async def get_db(request: Request):
     async with AsyncSessionLocal() as session:
+        # 變更事件帶上發出請求的分頁，讓它略過自己造成的事件
+        session.info["client_id"] = request.headers.get("x-client-id", "")[:64]
         try:
             yield session
+            # 快取版本號與資料同一個交易寫入
+            await response_cache.bump_versions(session)
             await session.commit()
         except Exception:
+            session.info.pop("cache_invalidations", None)
+            session.info.pop("after_commit", None)
+            change_events.discard(session)
             await session.rollback()
             raise
+        user_id = getattr(request.state, "user_id", None)
+        if session.info.pop("wrote", False) and user_id is not None:
+            note_write(user_id)
+        await change_events.flush(session)
+        for func, args in session.info.pop("after_commit", ()):
+            try:
+                await func(*args)
+            except Exception:
+                # 寫入已經 commit，後續工作失敗只記錄
+                logger.exception("After-commit task %s failed", getattr(func, "__name__", func))
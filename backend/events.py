@@ -0,0 +1,330 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pydantic import TypeAdapter
+from backend.config import get_settings
+from backend.fast_json import dumps
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 事件串流結束的記號
+CLOSED = object()
+# 佇列滿了：丟棄待送事件，改要求客戶端整個重新載入
+RESYNC = b'{"op":"resync"}'
+
+
+class ConnectionLimitExceeded(Exception):
+    def __init__(self, per_user: bool):
+        self.per_user = per_user
+
+
+class Subscription:
+    """一條事件串流連線的待送佇列"""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue" = asyncio.Queue(maxsize=settings.events_queue_size)
+        self.dropped = False
+
+    def put(self, payload) -> None:
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # 連線太慢：清空佇列只留一個 resync，之後的事件繼續排入
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.dropped = True
+
+    def close(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSED)
+
+    async def get(self, timeout: float):
+        """等待下一個事件；逾時回傳 None，串流結束回傳 CLOSED"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """這個 worker 上的事件串流連線，依使用者分組並限制連線數"""
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self.connections = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def check_limits(self, user_id: int) -> None:
+        if len(self._subscriptions.get(user_id, ())) >= settings.events_max_connections_per_user:
+            self.rejected += 1
+            raise ConnectionLimitExceeded(per_user=True)
+        if self.connections >= settings.events_max_connections:
+            self.rejected += 1
+            raise ConnectionLimitExceeded(per_user=False)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        self.check_limits(user_id)
+        subscription = Subscription(user_id)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        self.connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        user_subscriptions = self._subscriptions.get(subscription.user_id)
+        if user_subscriptions is None or subscription not in user_subscriptions:
+            return
+        user_subscriptions.discard(subscription)
+        if not user_subscriptions:
+            del self._subscriptions[subscription.user_id]
+        self.connections -= 1
+        self.dropped += subscription.dropped
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscriptions
+
+    def deliver(self, user_id: int, payload: bytes) -> None:
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.put(payload)
+            self.delivered += 1
+
+    def deliver_all(self, payload: bytes) -> None:
+        for user_id in list(self._subscriptions):
+            self.deliver(user_id, payload)
+
+    def close(self) -> None:
+        """結束所有串流，讓 worker 關閉時不必等待長連線"""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.close()
+
+    def stats(self) -> dict:
+        return {
+            "broker": settings.events_broker,
+            "connections": self.connections,
+            "users": len(self._subscriptions),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+
+hub = EventHub()
+
+
+class EventBroker(ABC):
+    """把變更事件送到所有 worker 上該使用者的連線
+
+    各 worker 收到事件後交給自己的 hub；預設的 memory broker 只送給同一個 worker，
+    以多個 worker 部署時改用 postgres（或以 register_broker 註冊的其他 broker）。
+    """
+
+    # 單一事件的位元組上限，超過改送 invalidate；None 表示不限
+    max_payload: Optional[int] = None
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def may_deliver(self, user_id: int) -> bool:
+        """沒有人會收到時可略過序列化；跨 worker 的 broker 無從得知，一律回傳 True"""
+        return True
+
+    @abstractmethod
+    async def publish(self, messages: List[Tuple[int, bytes]]) -> None:
+        """送出一次交易產生的事件：[(user_id, payload), ...]"""
+
+
+class MemoryEventBroker(EventBroker):
+    """只在單一行程內轉送"""
+
+    def may_deliver(self, user_id: int) -> bool:
+        return hub.has_subscribers(user_id)
+
+    async def publish(self, messages: List[Tuple[int, bytes]]) -> None:
+        for user_id, payload in messages:
+            hub.deliver(user_id, payload)
+
+
+class PostgresEventBroker(EventBroker):
+    """以 PostgreSQL LISTEN/NOTIFY 轉送給所有 worker（asyncpg）
+
+    每個 worker 保留一條專用連線 LISTEN；連線中斷後重新連線，期間可能漏掉事件，
+    因此重連後對所有連線送出 resync。NOTIFY 的內容上限約 8000 位元組。
+    """
+
+    channel = "aar_events"
+    max_payload = 7900
+
+    def __init__(self, url: str):
+        self.url = url
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def publish(self, messages: List[Tuple[int, bytes]]) -> None:
+        from sqlalchemy import func, select
+        from backend.database import engine
+
+        async with engine.connect() as connection:
+            await connection.execute(select(*(
+                func.pg_notify(self.channel, f"{user_id}:{payload.decode('utf-8')}")
+                for user_id, payload in messages
+            )))
+            await connection.commit()
+
+    def _on_notify(self, connection, pid, channel, message: str) -> None:
+        user_id, _, payload = message.partition(":")
+        hub.deliver(int(user_id), payload.encode("utf-8"))
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        reconnecting = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self.url)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Event broker connection failed: %s", exc)
+                await asyncio.sleep(settings.events_broker_retry_seconds)
+                reconnecting = True
+                continue
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                if reconnecting:
+                    hub.deliver_all(RESYNC)
+                await lost.wait()
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+            logger.warning("Event broker connection lost, reconnecting")
+            reconnecting = True
+            await asyncio.sleep(settings.events_broker_retry_seconds)
+
+
+def _postgres_broker() -> PostgresEventBroker:
+    from sqlalchemy import make_url
+
+    url = make_url(settings.events_broker_url or settings.database_url)
+    return PostgresEventBroker(url.set(drivername="postgresql").render_as_string(hide_password=False))
+
+
+BROKERS = {
+    "memory": MemoryEventBroker,
+    "postgres": _postgres_broker,
+}
+
+
+def register_broker(name: str, factory) -> None:
+    """註冊其他事件 broker（例如 Redis pub/sub），之後以 EVENTS_BROKER=<name> 啟用"""
+    BROKERS[name] = factory
+
+
+class ChangeEvents:
+    """寫入端點登記的變更事件，commit 後才送出（見 get_db）
+
+    事件格式（JSON）：
+    - `{"resource": "action_items", "op": "upsert", "items": [...]}`：新增或修改後的完整資料
+    - `{"resource": "action_items", "op": "delete", "ids": [...]}`
+    - `{"resource": "course_tags", "op": "invalidate"}`：無法以資料描述的變更，客戶端重新查詢
+    `origin` 為發出請求的 X-Client-Id，客戶端可略過自己造成的事件。
+    """
+
+    def __init__(self):
+        self._broker: Optional[EventBroker] = None
+        self._adapters: Dict[type, TypeAdapter] = {}
+
+    @property
+    def broker(self) -> EventBroker:
+        if self._broker is None:
+            self._broker = BROKERS[settings.events_broker]()
+        return self._broker
+
+    def upserted(self, db, user_id: int, resource: str, schema, items: Iterable) -> None:
+        self._add(db, user_id, {"resource": resource, "op": "upsert"}, (schema, list(items)))
+
+    def deleted(self, db, user_id: int, resource: str, ids: Iterable[int]) -> None:
+        ids = list(ids)
+        if ids:
+            self._add(db, user_id, {"resource": resource, "op": "delete", "ids": ids})
+
+    def invalidated(self, db, user_id: int, *resources: str) -> None:
+        for resource in resources:
+            self._add(db, user_id, {"resource": resource, "op": "invalidate"})
+
+    def _add(self, db, user_id: int, event: dict, rows=None) -> None:
+        if settings.events_enabled:
+            db.info.setdefault("change_events", []).append((user_id, event, rows))
+
+    def _encode(self, event: dict, rows, origin: Optional[str]) -> bytes:
+        event = dict(event)
+        if origin:
+            event["origin"] = origin
+        if rows is not None:
+            schema, items = rows
+            if len(items) > settings.events_max_items:
+                event["op"] = "invalidate"
+            else:
+                adapter = self._adapters.get(schema)
+                if adapter is None:
+                    adapter = self._adapters[schema] = TypeAdapter(List[schema])
+                event["items"] = adapter.dump_python(
+                    adapter.validate_python(items, from_attributes=True), mode="json"
+                )
+        payload = dumps(event)
+        if self.broker.max_payload is not None and len(payload) > self.broker.max_payload:
+            payload = dumps({key: event[key] for key in ("resource", "origin") if key in event} | {"op": "invalidate"})
+        return payload
+
+    async def flush(self, db) -> None:
+        origin = db.info.pop("client_id", None)
+        # 物件在 commit 後仍可讀取（expire_on_commit=False），沒有人在聽就不序列化
+        messages = [
+            (user_id, self._encode(event, rows, origin))
+            for user_id, event, rows in db.info.pop("change_events", ())
+            if self.broker.may_deliver(user_id)
+        ]
+        if not messages:
+            return
+        try:
+            await self.broker.publish(messages)
+        except Exception:
+            # 事件只是加速更新，送不出去不影響已 commit 的寫入
+            logger.exception("Failed to publish change events")
+
+    def discard(self, db) -> None:
+        db.info.pop("change_events", None)
+        db.info.pop("client_id", None)
+
+    async def start(self) -> None:
+        await self.broker.start()
+
+    async def close(self) -> None:
+        hub.close()
+        await self.broker.close()
+
+    def stats(self) -> dict:
+        return hub.stats()
+
+
+change_events = ChangeEvents()
+
+
+def format_sse(payload: bytes) -> bytes:
+    """一個 Server-Sent Events 訊息；事件內容是單行 JSON"""
+    return b"data: " + payload + b"\n\n"
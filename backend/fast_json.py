@@ -0,0 +1,44 @@
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence, Type
+import orjson
+from pydantic import BaseModel
+
+
+class JSONBytes(bytes):
+    """已序列化好的 JSON 回應本文；response_cache.cached 遇到它會直接使用，不再經過 pydantic 驗證"""
+
+
+def _default(value):
+    # 與 pydantic 的 JSON 輸出一致：Decimal 輸出為字串
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(value) -> JSONBytes:
+    # orjson 原生支援 datetime / date，輸出與 isoformat() 相同
+    return JSONBytes(orjson.dumps(value, default=_default))
+
+
+def schema_columns(schema: Type[BaseModel], model, prefix: str = "", fields: Optional[Iterable[str]] = None) -> list:
+    """回應 schema 需要的欄位，依 schema 的欄位順序；prefix 用於同一查詢中的第二個資料表
+
+    fields 只取其中部分欄位（例如 ?fields= 參數），同樣依 schema 的順序。
+    """
+    table = model.__table__
+    return [table.c[name].label(prefix + name) for name in _field_names(schema, fields)]
+
+
+def records(rows: Sequence[Sequence], schema: Type[BaseModel], start: int = 0,
+            fields: Optional[Iterable[str]] = None) -> List[dict]:
+    """把 select(*schema_columns(...)) 的資料列轉成 dict；start 為這組欄位在列中的起始位置"""
+    names = _field_names(schema, fields)
+    end = start + len(names)
+    return [dict(zip(names, row[start:end])) for row in rows]
+
+
+def _field_names(schema: Type[BaseModel], fields: Optional[Iterable[str]]) -> tuple:
+    if fields is None:
+        return tuple(schema.model_fields)
+    wanted = set(fields)
+    return tuple(name for name in schema.model_fields if name in wanted)
@@ -1,12 +1,25 @@
+import asyncio
+import logging
 import os
 import pathlib
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from backend.database import engine, Base
-from backend.routers import auth, courses, knowledge_points, action_items, review_logs, tags
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import SQLAlchemyError
+from backend.config import get_settings
+from backend.database import engine, replica_engine, Base, pool_stats, warm_up_pool
+from backend.maintenance import run_course_purge_loop, run_sync_tombstone_purge_loop
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.compression import CompressionMiddleware
+from backend.metrics import MetricsMiddleware, install_query_hooks, monitor_event_loop_lag, registry
+from backend.profiling import ProfilingMiddleware, install_slow_query_log, profiling_enabled
+from backend.query_budget import QueryGuardMiddleware, install_query_guard
+from backend.static_assets import StaticAssets
+from backend.routers import (
+    auth, courses, knowledge_points, action_items, review_logs, tags, analytics, search, backup, sync, events
+)
 
 
 @asynccontextmanager
@@ -14,7 +27,29 @@ async def lifespan(app: FastAPI):
     # Create database tables on startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+    if get_settings().database_pool_warmup:
+        await warm_up_pool(engine)
+        if replica_engine is not None:
+            try:
+                await warm_up_pool(replica_engine)
+            except (OSError, SQLAlchemyError) as exc:
+                # 複本連不上時讀取會改走主資料庫，不影響啟動
+                logging.getLogger(__name__).warning("Read replica warm-up failed: %s", exc)
+
+    if get_settings().events_enabled:
+        await change_events.start()
+
+    background_tasks = [asyncio.create_task(run_sync_tombstone_purge_loop())]
+    if get_settings().course_soft_delete:
+        background_tasks.append(asyncio.create_task(run_course_purge_loop()))
+    if get_settings().metrics_enabled:
+        background_tasks.append(asyncio.create_task(monitor_event_loop_lag()))
     yield
+    # 結束仍開著的事件串流；uvicorn 會先等連線結束才執行到這裡，所以啟動指令加上 --timeout-graceful-shutdown
+    await change_events.close()
+    for task in background_tasks:
+        task.cancel()
 
 
 app = FastAPI(
@@ -44,6 +79,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if get_settings().compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+if get_settings().metrics_enabled:
+    install_query_hooks()
+    app.add_middleware(MetricsMiddleware)
+if get_settings().slow_query_threshold_ms is not None:
+    install_slow_query_log()
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+if get_settings().query_guard:
+    install_query_guard()
+    app.add_middleware(QueryGuardMiddleware)
 
 # Health check
 @app.get("/api/health")
@@ -51,6 +98,27 @@ async def api_health_check():
     return {"status": "ok"}
 
 
+@app.get("/api/health/cache")
+async def api_cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/api/health/events")
+async def api_event_stats():
+    return change_events.stats()
+
+
+@app.get("/api/health/db")
+async def api_pool_stats():
+    return pool_stats()
+
+
+if get_settings().metrics_enabled:
+    @app.get("/api/metrics", include_in_schema=False)
+    async def api_metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(courses.router, prefix="/api")
@@ -58,15 +126,17 @@ app.include_router(knowledge_points.router, prefix="/api")
 app.include_router(action_items.router, prefix="/api")
 app.include_router(review_logs.router, prefix="/api")
 app.include_router(tags.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(backup.router, prefix="/api")
+app.include_router(sync.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 # Serve frontend static files (built by Vite into dist/)
 dist_dir = pathlib.Path(__file__).parent.parent / "dist"
 if dist_dir.exists():
-    app.mount("/assets", StaticFiles(directory=dist_dir / "assets"), name="assets")
-
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        file_path = dist_dir / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(dist_dir / "index.html")
+    static_assets = StaticAssets(dist_dir)
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_spa(full_path: str, request: Request):
+        return static_assets.response(full_path, request.headers)
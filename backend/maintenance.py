@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, delete
+from backend.config import get_settings
+from backend.database import AsyncSessionLocal
+from backend.models import Course, SyncTombstone
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def purge_deleted_courses(course_ids: Optional[List[int]] = None) -> int:
+    """實際刪除已軟刪除的課程，子資料由 ON DELETE CASCADE 一併清除"""
+    stmt = delete(Course).where(Course.deleted_at.is_not(None))
+    if course_ids is not None:
+        stmt = stmt.where(Course.id.in_(course_ids))
+    else:
+        stmt = stmt.where(Course.id.in_(
+            select(Course.id)
+            .where(Course.deleted_at.is_not(None))
+            .limit(settings.course_purge_batch_size)
+            .scalar_subquery()
+        ))
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount
+
+
+async def run_course_purge_loop() -> None:
+    """定期清除漏網的軟刪除課程（例如背景工作執行前行程就重啟）"""
+    while True:
+        try:
+            while await purge_deleted_courses() >= settings.course_purge_batch_size:
+                pass
+        except Exception:
+            logger.exception("Failed to purge soft-deleted courses")
+        await asyncio.sleep(settings.course_purge_interval_seconds)
+
+
+async def purge_sync_tombstones() -> int:
+    """刪除超過保留期限的刪除紀錄；更舊的 sync token 會改收完整資料"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.sync_tombstone_retention_days)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+        await db.commit()
+        return result.rowcount
+
+
+async def run_sync_tombstone_purge_loop() -> None:
+    while True:
+        try:
+            await purge_sync_tombstones()
+        except Exception:
+            logger.exception("Failed to purge sync tombstones")
+        await asyncio.sleep(settings.sync_tombstone_purge_interval_seconds)
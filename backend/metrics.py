@@ -0,0 +1,324 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.config import get_settings
+from backend.cache import response_cache
+from backend.database import pool_stats
+from backend.events import change_events
+
+settings = get_settings()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+QUERY_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """固定 bucket 的直方圖；observe 只做一次二分搜尋與整數累加"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Family:
+    """同名但標籤不同的一組指標；子指標以標籤值 tuple 為 key 快取，請求路徑上不建立標籤 dict"""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Sequence[str] = (),
+                 buckets: Optional[Tuple[float, ...]] = None):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+            self.children[values] = child
+        return child
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for values, child in list(self.children.items()):
+            if self.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(self.buckets, child.counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, values, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {child.count}")
+                labels = _format_labels(self.label_names, values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+                lines.append(f"{self.name}_count{labels} {child.count}")
+            else:
+                labels = _format_labels(self.label_names, values)
+                lines.append(f"{self.name}{labels} {_format_value(child.value)}")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.families: List[Family] = []
+        # 讀取時才計算的指標：name -> (help, kind, callback 回傳 [(標籤 dict, 數值)])
+        self.collectors: List[Tuple[str, str, str, Callable[[], List[Tuple[dict, float]]]]] = []
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Family:
+        family = Family(name, help_text, "counter", label_names)
+        self.families.append(family)
+        return family
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...],
+                  label_names: Sequence[str] = ()) -> Family:
+        family = Family(name, help_text, "histogram", label_names, buckets)
+        self.families.append(family)
+        return family
+
+    def collector(self, name: str, help_text: str, kind: str = "gauge"):
+        def decorator(func):
+            self.collectors.append((name, help_text, kind, func))
+            return func
+        return decorator
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self.families:
+            family.render(lines)
+        for name, help_text, kind, func in self.collectors:
+            samples = func()
+            if not samples:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"),
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", LATENCY_BUCKETS, ("method", "route"),
+)
+request_queries = registry.histogram(
+    "http_request_db_queries", "Database statements executed per request", QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+request_db_time = registry.histogram(
+    "http_request_db_seconds", "Database time spent per request", LATENCY_BUCKETS, ("method", "route"),
+)
+db_queries = registry.histogram("db_query_duration_seconds", "Duration of each database statement", QUERY_TIME_BUCKETS)
+loop_lag = registry.histogram("event_loop_lag_seconds", "Event loop scheduling delay", LOOP_LAG_BUCKETS)
+db_query_timer = db_queries.labels()
+loop_lag_timer = loop_lag.labels()
+
+in_flight = 0
+last_loop_lag = 0.0
+
+# 目前請求的 [查詢數, 查詢秒數]；在 middleware 設定，子工作複製 context 後仍指向同一個 list
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+@registry.collector("http_requests_in_flight", "Requests currently being handled")
+def _collect_in_flight():
+    return [({}, in_flight)]
+
+
+@registry.collector("event_loop_lag_last_seconds", "Most recent event loop scheduling delay")
+def _collect_loop_lag():
+    return [({}, last_loop_lag)]
+
+
+def _cache_stat(key: str):
+    def collect():
+        stats = response_cache.stats()
+        return [({"backend": stats.get("backend", "")}, stats[key])] if key in stats else []
+    return collect
+
+
+def _event_stat(key: str):
+    def collect():
+        return [({}, change_events.stats()[key])]
+    return collect
+
+
+def _pool_stat(key: str, scale: float = 1.0):
+    def collect():
+        return [
+            ({"engine": name}, stats[key] * scale)
+            for name, stats in pool_stats().items()
+            if key in stats
+        ]
+    return collect
+
+
+for _name, _help, _kind, _key in (
+    ("response_cache_hits_total", "Response cache hits", "counter", "hits"),
+    ("response_cache_misses_total", "Response cache misses", "counter", "misses"),
+    ("response_cache_hit_ratio", "Response cache hit ratio since start", "gauge", "hit_rate"),
+    ("response_cache_evictions_total", "Response cache evictions", "counter", "evictions"),
+    ("response_cache_entries", "Response cache entries", "gauge", "entries"),
+    ("response_cache_bytes", "Response cache size in bytes", "gauge", "bytes"),
+):
+    registry.collector(_name, _help, _kind)(_cache_stat(_key))
+
+for _name, _help, _kind, _key in (
+    ("event_stream_connections", "Open event stream connections on this worker", "gauge", "connections"),
+    ("event_stream_events_total", "Change events queued to event stream connections", "counter", "delivered"),
+    ("event_stream_overflows_total", "Closed streams that fell behind and were sent a resync", "counter", "dropped"),
+    ("event_stream_rejected_total", "Event stream connections refused by the connection limits", "counter", "rejected"),
+):
+    registry.collector(_name, _help, _kind)(_event_stat(_key))
+
+for _name, _help, _kind, _key, _scale in (
+    ("db_pool_checkouts_total", "Connections checked out of the pool", "counter", "checkouts", 1.0),
+    ("db_pool_timeouts_total", "Checkouts that timed out waiting for a connection", "counter", "timeouts", 1.0),
+    ("db_pool_checkout_wait_p95_seconds", "p95 wait for a pooled connection (recent checkouts)", "gauge",
+     "wait_ms_p95", 0.001),
+    ("db_pool_checkout_wait_max_seconds", "Longest wait for a pooled connection", "gauge", "wait_ms_max", 0.001),
+    ("db_pool_size", "Configured pool size", "gauge", "size", 1.0),
+    ("db_pool_checked_out", "Connections currently in use", "gauge", "checked_out", 1.0),
+    ("db_pool_overflow", "Overflow connections currently open", "gauge", "overflow", 1.0),
+    ("db_pool_saturation", "Checked-out connections / (pool_size + max_overflow)", "gauge", "saturation", 1.0),
+):
+    registry.collector(_name, _help, _kind)(_pool_stat(_key, _scale))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_query_timer.observe(elapsed)
+    current = _request_db.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += elapsed
+
+
+def install_query_hooks() -> None:
+    """掛在 Engine 類別上，主資料庫與讀取複本都會計入"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def monitor_event_loop_lag() -> None:
+    """定期睡一小段時間，實際醒來比預期晚多少就是 event loop 被占住的時間"""
+    global last_loop_lag
+    interval = settings.metrics_loop_lag_interval_seconds
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        last_loop_lag = max(loop.time() - started - interval, 0.0)
+        loop_lag_timer.observe(last_loop_lag)
+
+
+# route 物件 -> 完整的 route template；同一個 route 的掛載前綴固定，只需計算一次
+_route_templates: Dict[int, str] = {}
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = _route_templates.get(id(route))
+    if template is None:
+        # 依 FastAPI 版本，route.path 可能不含 include_router 的前綴，由實際路徑反推
+        path_format = getattr(route, "path_format", None) or getattr(route, "path", "")
+        template = path_format
+        try:
+            concrete = path_format.format(**scope.get("path_params", {}))
+        except (KeyError, IndexError, ValueError):
+            concrete = None
+        if concrete and scope["path"].endswith(concrete):
+            template = scope["path"][:len(scope["path"]) - len(concrete)] + path_format
+        _route_templates[id(route)] = template
+    return template
+
+
+class MetricsMiddleware:
+    """以 route template（例如 /api/courses/{course_id}）為標籤記錄每個請求，避免 id 造成標籤爆量"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global in_flight
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+        in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight -= 1
+            _request_db.reset(token)
+            template = route_template(scope)
+            method = scope["method"]
+            http_requests.labels(method, template, str(status_code)).inc()
+            http_latency.labels(method, template).observe(elapsed)
+            request_queries.labels(method, template).observe(db_stats[0])
+            request_db_time.labels(method, template).observe(db_stats[1])
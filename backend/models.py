@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
-from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey, Numeric
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey, Numeric, Index, DDL, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from backend.database import Base
 
@@ -13,21 +13,26 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # 遞增即撤銷所有已發出的 token
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    courses: Mapped[List["Course"]] = relationship(back_populates="user", cascade="all, delete-orphan")
-    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="user", cascade="all, delete-orphan")
-    review_logs: Mapped[List["ReviewLog"]] = relationship(back_populates="user", cascade="all, delete-orphan")
-    tags: Mapped[List["Tag"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    courses: Mapped[List["Course"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    review_logs: Mapped[List["ReviewLog"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    tags: Mapped[List["Tag"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # list_courses: WHERE user_id ORDER BY updated_at DESC, id DESC
+        Index("ix_courses_user_id_updated_at", "user_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     platform: Mapped[Optional[str]] = mapped_column(String(100))
     instructor: Mapped[Optional[str]] = mapped_column(String(100))
@@ -39,19 +44,26 @@ class Course(Base):
     completed_chapters: Mapped[int] = mapped_column(Integer, default=0)
     total_chapters: Mapped[int] = mapped_column(Integer, default=0)
     priority: Mapped[str] = mapped_column(String(10), default="medium")  # low, medium, high
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # 軟刪除，待背景清除
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="courses")
-    knowledge_points: Mapped[List["KnowledgePoint"]] = relationship(back_populates="course", cascade="all, delete-orphan")
-    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="course", cascade="all, delete-orphan")
-    review_logs: Mapped[List["ReviewLog"]] = relationship(back_populates="course", cascade="all, delete-orphan")
-    course_tags: Mapped[List["CourseTag"]] = relationship(back_populates="course", cascade="all, delete-orphan")
+    knowledge_points: Mapped[List["KnowledgePoint"]] = relationship(back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+    review_logs: Mapped[List["ReviewLog"]] = relationship(back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+    course_tags: Mapped[List["CourseTag"]] = relationship(back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class KnowledgePoint(Base):
     __tablename__ = "knowledge_points"
+    __table_args__ = (
+        # list_knowledge_points_by_course: WHERE course_id ORDER BY created_at DESC, id DESC
+        Index("ix_knowledge_points_course_id_created_at", "course_id", "created_at", "id"),
+        # /api/sync: WHERE course_id IN (使用者的課程) AND updated_at > since
+        Index("ix_knowledge_points_course_id_updated_at", "course_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
@@ -64,16 +76,26 @@ class KnowledgePoint(Base):
 
     # Relationships
     course: Mapped["Course"] = relationship(back_populates="knowledge_points")
-    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="knowledge_point")
+    action_items: Mapped[List["ActionItem"]] = relationship(back_populates="knowledge_point", passive_deletes=True)
 
 
 class ActionItem(Base):
     __tablename__ = "action_items"
+    __table_args__ = (
+        # list_action_items_by_user: WHERE user_id ORDER BY created_at DESC, id DESC
+        Index("ix_action_items_user_id_created_at", "user_id", "created_at", "id"),
+        # /api/sync: WHERE user_id AND updated_at > since
+        Index("ix_action_items_user_id_updated_at", "user_id", "updated_at"),
+        # list_action_items_by_course: WHERE course_id AND user_id ORDER BY created_at DESC
+        Index("ix_action_items_course_id_user_id_created_at", "course_id", "user_id", "created_at"),
+        # ON DELETE SET NULL from knowledge_points
+        Index("ix_action_items_knowledge_point_id", "knowledge_point_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
     knowledge_point_id: Mapped[Optional[int]] = mapped_column(ForeignKey("knowledge_points.id", ondelete="SET NULL"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
     priority: Mapped[str] = mapped_column(String(10), default="medium")  # low, medium, high
@@ -91,10 +113,18 @@ class ActionItem(Base):
 
 class ReviewLog(Base):
     __tablename__ = "review_logs"
+    __table_args__ = (
+        # list_review_logs_by_user: WHERE user_id ORDER BY review_date DESC, id DESC
+        Index("ix_review_logs_user_id_review_date", "user_id", "review_date", "id"),
+        # list_review_logs_by_course: WHERE course_id AND user_id ORDER BY review_date DESC
+        Index("ix_review_logs_course_id_user_id_review_date", "course_id", "user_id", "review_date"),
+        # /api/sync: WHERE user_id AND updated_at > since
+        Index("ix_review_logs_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     reflection: Mapped[Optional[str]] = mapped_column(Text)
     application_insights: Mapped[Optional[str]] = mapped_column(Text)
@@ -111,26 +141,196 @@ class ReviewLog(Base):
 
 class Tag(Base):
     __tablename__ = "tags"
+    __table_args__ = (
+        # list_tags: WHERE user_id ORDER BY name, id
+        Index("ix_tags_user_id_name", "user_id", "name", "id"),
+        # /api/sync: WHERE user_id AND updated_at > since
+        Index("ix_tags_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     color: Mapped[Optional[str]] = mapped_column(String(20))
     category: Mapped[Optional[str]] = mapped_column(String(50))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="tags")
-    course_tags: Mapped[List["CourseTag"]] = relationship(back_populates="tag", cascade="all, delete-orphan")
+    course_tags: Mapped[List["CourseTag"]] = relationship(back_populates="tag", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class CourseTag(Base):
     __tablename__ = "course_tags"
+    __table_args__ = (
+        # 同一課程不可重複加上同一標籤；也涵蓋 WHERE course_id 的查詢
+        Index("uq_course_tags_course_id_tag_id", "course_id", "tag_id", unique=True),
+        # ON DELETE CASCADE from tags
+        Index("ix_course_tags_tag_id", "tag_id"),
+        # /api/sync: WHERE course_id IN (使用者的課程) AND created_at > since；關聯只會新增或刪除
+        Index("ix_course_tags_course_id_created_at", "course_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
     tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
     course: Mapped["Course"] = relationship(back_populates="course_tags")
     tag: Mapped["Tag"] = relationship(back_populates="course_tags")
+
+
+class SyncTombstone(Base):
+    """已刪除資料的紀錄，讓 /api/sync 的客戶端知道要移除哪些資料
+
+    由資料庫 trigger 寫入（見下方 SYNC_TOMBSTONE_DDL），因此 ORM 刪除、批次 DELETE 與
+    ON DELETE CASCADE 都會留下紀錄。課程連帶刪除的子資料不一定有紀錄，客戶端收到課程的
+    tombstone 時應一併移除其子資料。保留 sync_tombstone_retention_days 天後由背景工作清除。
+    """
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+        Index("ix_sync_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # 不設外鍵：刪除使用者時連帶刪除的資料也會觸發 trigger，那時使用者已不存在
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)  # 與 /api/sync 回應的欄位名稱相同
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class CacheVersion(Base):
+    """回應快取的版本號，寫入資料時在同一個交易內遞增（見 backend/cache.py）
+
+    ETag 與快取 key 都由這裡的版本號產生，多個 worker 與重啟後都一致。
+    """
+    __tablename__ = "cache_versions"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    resource: Mapped[str] = mapped_column(String(30), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class SearchDocument(Base):
+    """全文檢索用的文件：每筆課程、知識點、復盤日誌各一列，由 backend/search.py 寫入
+
+    *_tokens 是斷詞後以空白分隔的 token（中日韓文字為單字 + 雙字 bigram），
+    實際的索引是 PostgreSQL 的 tsvector/GIN 或 SQLite 的 FTS5，見下方 SEARCH_INDEX_DDL。
+    """
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        Index("ix_search_documents_entity_type_entity_id", "entity_type", "entity_id"),
+        Index("ix_search_documents_user_id", "user_id"),
+        # ON DELETE CASCADE from courses / knowledge_points / review_logs
+        Index("ix_search_documents_course_id", "course_id"),
+        Index("ix_search_documents_knowledge_point_id", "knowledge_point_id"),
+        Index("ix_search_documents_review_log_id", "review_log_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # 來源資料刪除時由外鍵一併刪除索引文件
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    knowledge_point_id: Mapped[Optional[int]] = mapped_column(ForeignKey("knowledge_points.id", ondelete="CASCADE"))
+    review_log_id: Mapped[Optional[int]] = mapped_column(ForeignKey("review_logs.id", ondelete="CASCADE"))
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)  # course, knowledge_point, review_log
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[Optional[str]] = mapped_column(Text)
+    title_tokens: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    body_tokens: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# 各資料庫的全文索引；寫入 search_documents 後由資料庫自行同步
+SEARCH_INDEX_DDL = {
+    # generated tsvector 欄位，標題權重 A、內文權重 B
+    "postgresql": [
+        "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', title_tokens), 'A') || "
+        "setweight(to_tsvector('simple', body_tokens), 'B')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_search_vector "
+        "ON search_documents USING GIN (search_vector)",
+    ],
+    # external content 的 FTS5 表，以 trigger 跟著 search_documents 更新
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "title_tokens, body_tokens, content='search_documents', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_fts(rowid, title_tokens, body_tokens) "
+        "VALUES (new.id, new.title_tokens, new.body_tokens); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, title_tokens, body_tokens) "
+        "VALUES ('delete', old.id, old.title_tokens, old.body_tokens); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, title_tokens, body_tokens) "
+        "VALUES ('delete', old.id, old.title_tokens, old.body_tokens); "
+        "INSERT INTO search_fts(rowid, title_tokens, body_tokens) "
+        "VALUES (new.id, new.title_tokens, new.body_tokens); END",
+    ],
+}
+
+for _dialect, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(
+    SearchDocument.__table__, "after_drop",
+    DDL("DROP TABLE IF EXISTS search_fts").execute_if(dialect="sqlite"),
+)
+
+
+# 寫入 sync_tombstones 的 trigger：資料表 -> (取得 user_id 的上層資料表, 外鍵欄位)，None 表示直接使用 old.user_id
+# entity_type 就是資料表名稱；上層已被刪除時（連帶刪除）查不到 user_id 就不寫入
+SYNC_TOMBSTONE_SOURCES = {
+    "courses": None,
+    "knowledge_points": ("courses", "course_id"),
+    "action_items": None,
+    "review_logs": None,
+    "tags": None,
+    # 刪除標籤時連帶刪除的 course_tags 仍找得到課程；刪除課程時則由課程的 tombstone 涵蓋
+    "course_tags": ("courses", "course_id"),
+}
+
+
+def _tombstone_insert(table: str, owner: Optional[tuple], now: str) -> str:
+    insert = "INSERT INTO sync_tombstones (user_id, entity_type, entity_id, deleted_at) "
+    if owner is None:
+        return insert + f"VALUES (old.user_id, '{table}', old.id, {now})"
+    owner_table, foreign_key = owner
+    return insert + f"SELECT user_id, '{table}', old.id, {now} FROM {owner_table} WHERE id = old.{foreign_key}"
+
+
+SYNC_TOMBSTONE_DDL = {
+    "postgresql": [
+        statement
+        for table, owner in SYNC_TOMBSTONE_SOURCES.items()
+        for statement in (
+            f"CREATE OR REPLACE FUNCTION {table}_sync_tombstone() RETURNS trigger AS $$ BEGIN "
+            + _tombstone_insert(table, owner, "timezone('UTC', clock_timestamp())")
+            + "; RETURN NULL; END $$ LANGUAGE plpgsql",
+            f"DROP TRIGGER IF EXISTS {table}_sync_tombstone ON {table}",
+            f"CREATE TRIGGER {table}_sync_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_sync_tombstone()",
+        )
+    ],
+    "sqlite": [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_sync_tombstone AFTER DELETE ON {table} BEGIN "
+        + _tombstone_insert(table, owner, "strftime('%Y-%m-%d %H:%M:%f', 'now')")
+        + "; END"
+        for table, owner in SYNC_TOMBSTONE_SOURCES.items()
+    ],
+}
+
+# trigger 會參照其他資料表，等全部資料表建立後再建立；DDL 會做 % 格式化，strftime 的 % 需要跳脫
+for _dialect, _statements in SYNC_TOMBSTONE_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Base.metadata, "after_create",
+            DDL(_statement.replace("%", "%%")).execute_if(dialect=_dialect),
+        )
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class PageParams:
+    """分頁查詢參數：`limit` 與上一頁回傳的 `cursor`"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(stmt: Select, sort_column, id_column, params: PageParams, descending: bool = True) -> Select:
+    """以 (sort_column, id) 做 keyset 分頁，多取一筆用來判斷是否還有下一頁"""
+    if params.cursor:
+        sort_value, row_id = decode_cursor(params.cursor, sort_column)
+        key = tuple_(sort_column, id_column)
+        boundary = tuple_(sort_value, row_id)
+        stmt = stmt.where(key < boundary if descending else key > boundary)
+
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+    return stmt.limit(params.limit + 1)
+
+
+def encode_offset_cursor(offset: int) -> str:
+    raw = json.dumps({"offset": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    """依分數排序的結果（例如搜尋）無法做 keyset，改用位移 cursor"""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return offset
+
+
+def split_page(rows: list, params: PageParams, sort_attr: str) -> Tuple[list, Optional[str]]:
+    """切掉多取的那一筆，並產生下一頁的 cursor"""
+    if len(rows) <= params.limit:
+        return rows, None
+    rows = rows[:params.limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
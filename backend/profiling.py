@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.config import get_settings
+from backend.metrics import route_template
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("backend.slow_query")
+
+PROFILE_HEADER = b"x-profile"
+# 低於此比例的分支不輸出，避免 call tree 過長
+PROFILE_MIN_SHARE = 0.01
+SLOW_QUERY_MAX_SQL = 2000
+
+# 目前請求的 ASGI scope，slow query log 用來標示是哪個端點送出的 SQL
+_current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+class _Node:
+    __slots__ = ("samples", "children")
+
+    def __init__(self):
+        self.samples = 0
+        self.children: Dict[str, "_Node"] = {}
+
+
+class SamplingProfiler:
+    """在背景執行緒定期擷取 event loop 執行緒的堆疊
+
+    同一個執行緒上還有其他請求在跑，所以只計入當下正在執行目標 task 的樣本；
+    task 在等待 I/O（例如資料庫回應）時的樣本另外計為 <awaiting>。
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.task = task
+        self.loop = task.get_loop()
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.root = _Node()
+        self.awaiting = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if asyncio.current_task(self.loop) is not self.task:
+                self.awaiting += 1
+                continue
+            stack = []
+            # 從 middleware 底下開始記錄，略過 event loop 與外層 middleware 的共同前綴
+            while frame is not None and frame.f_code is not _MIDDLEWARE_CODE:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            node = self.root
+            node.samples += 1
+            for name in reversed(stack):
+                node = node.children.setdefault(name, _Node())
+                node.samples += 1
+
+    def render(self, title: str, elapsed: float) -> str:
+        total = self.root.samples + self.awaiting
+        lines = [
+            title,
+            f"wall time {elapsed * 1000:.1f} ms, {total} samples every {self.interval * 1000:g} ms "
+            f"({self.root.samples} running, {self.awaiting} awaiting)",
+            "",
+        ]
+        if total:
+            lines.append(f"{self.awaiting / total:6.1%}  <awaiting>")
+            self._render_node(self.root, total, 0, lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_node(self, node: _Node, total: int, depth: int, lines: List[str]) -> None:
+        for name, child in sorted(node.children.items(), key=lambda item: -item[1].samples):
+            if child.samples / total < PROFILE_MIN_SHARE:
+                continue
+            lines.append(f"{child.samples / total:6.1%}  {'  ' * depth}{name}")
+            self._render_node(child, total, depth + 1, lines)
+
+
+def _short_path(filename: str) -> str:
+    _, found, rest = filename.rpartition("site-packages" + os.sep)
+    if found:
+        return rest
+    _, found, rest = filename.rpartition(os.sep + "backend" + os.sep)
+    return "backend" + os.sep + rest if found else os.path.basename(filename)
+
+
+class ProfilingMiddleware:
+    """依取樣比例或 X-Profile 標頭剖析單一請求，call tree 寫入 profile_output_dir
+
+    只有在 Settings 開啟剖析或 slow query log 時才會掛上，關閉時沒有任何成本。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        token = settings.profile_header_token
+        self.header_token = token.encode() if token else None
+
+    def _should_profile(self, scope) -> bool:
+        if settings.profile_sample_rate and random.random() < settings.profile_sample_rate:
+            return True
+        if self.header_token is None:
+            return False
+        return any(name == PROFILE_HEADER and value == self.header_token for name, value in scope["headers"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_scope.set(scope)
+        try:
+            if not self._should_profile(scope):
+                await self.app(scope, receive, send)
+                return
+
+            profiler = SamplingProfiler(asyncio.current_task(), settings.profile_interval_ms / 1000)
+            started = time.perf_counter()
+            profiler.start()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.stop()
+                elapsed = time.perf_counter() - started
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _write_profile, scope, profiler, elapsed,
+                )
+        finally:
+            _current_scope.reset(token)
+
+
+_MIDDLEWARE_CODE = ProfilingMiddleware.__call__.__code__
+
+
+def _write_profile(scope, profiler: SamplingProfiler, elapsed: float) -> None:
+    title = f"{scope['method']} {scope['path']}  (route {route_template(scope)})"
+    filename = "{}-{}-{}.txt".format(
+        datetime.now().strftime("%Y%m%d-%H%M%S-%f"),
+        scope["method"].lower(),
+        re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root",
+    )
+    try:
+        os.makedirs(settings.profile_output_dir, exist_ok=True)
+        path = os.path.join(settings.profile_output_dir, filename)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(profiler.render(title, elapsed))
+    except OSError:
+        logger.exception("Failed to write request profile")
+        return
+    logger.info("Profiled %s in %.1f ms -> %s", title, elapsed * 1000, path)
+
+
+def _parameters_shape(parameters) -> str:
+    """只記錄參數的型別與數量，不把使用者資料寫進日誌"""
+    if parameters is None:
+        return "none"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {_parameters_shape(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["slow_query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("slow_query_started", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < settings.slow_query_threshold_ms:
+        return
+    scope = _current_scope.get()
+    route = f"{scope['method']} {route_template(scope)}" if scope is not None else "background"
+    slow_query_logger.warning(
+        "slow query %.1f ms route=%s params=%s sql=%s",
+        elapsed_ms, route, _parameters_shape(parameters),
+        " ".join(statement.split())[:SLOW_QUERY_MAX_SQL],
+    )
+
+
+def install_slow_query_log() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profile_sample_rate or settings.profile_header_token
+                or settings.slow_query_threshold_ms is not None)
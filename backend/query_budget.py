@@ -0,0 +1,106 @@
+import logging
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, raiseload
+from backend.config import get_settings
+from backend.metrics import route_template
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def query_budget(limit: int):
+    """標註端點每個請求最多可以送出幾句 SQL，未標註的端點使用 query_budget_default"""
+    def decorator(func):
+        func.query_budget = limit
+        return func
+    return decorator
+
+
+def budget_for(route) -> int:
+    return getattr(getattr(route, "endpoint", None), "query_budget", settings.query_budget_default)
+
+
+class QueryCounter:
+    """記錄區塊內送出的所有 SQL，供基準測試與 tests/ 使用
+
+        with QueryCounter() as counter:
+            await client.get("/api/courses")
+        assert counter.count <= 2, counter.statements
+    """
+
+    def __init__(self, target=Engine):
+        self.target = target
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.target, "before_cursor_execute", self._record)
+
+
+# 目前請求已送出的 SQL 數；在 middleware 設定
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    current = _request_queries.get()
+    if current is not None:
+        current[0] += 1
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    # 關聯沒有用 selectinload / joinedload 預先載入就被存取時直接報錯，而不是默默多一句查詢
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+def install_query_guard() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _count_statement):
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+class QueryGuardMiddleware:
+    """開發模式：請求超過端點的查詢預算或觸發 lazy load 時記錄警告"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        except InvalidRequestError as exc:
+            if "lazy='raise'" in str(exc):
+                logger.warning("Lazy load in %s %s: %s", scope["method"], route_template(scope), exc)
+            raise
+        finally:
+            _request_queries.reset(token)
+            route = scope.get("route")
+            if route is not None and queries[0] > budget_for(route):
+                logger.warning(
+                    "%s %s ran %d queries (budget %d)",
+                    scope["method"], route_template(scope), queries[0], budget_for(route),
+                )
@@ -2,76 +2,86 @@ from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, func, insert, update, delete, case
 from backend.database import get_db
-from backend.models import User, ActionItem, Course
+from backend.models import ActionItem, Course, KnowledgePoint
 from backend.schemas import (
     ActionItemCreate, ActionItemUpdate, ActionItemResponse,
-    ActionItemWithCourse, ActionItemStats, SuccessResponse, CourseResponse
+    ActionItemWithCourse, ActionItemStats, SuccessResponse, CourseResponse, Page,
+    ActionItemBulkCreate, ActionItemBulkUpdate, BulkDelete, BulkResult
 )
-from backend.auth import get_current_user
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.fast_json import dumps, records, schema_columns
+from backend.pagination import PageParams
+from backend.query_budget import query_budget
+from backend.with_course import WithCourseParams, list_with_course
 
 router = APIRouter(prefix="/action-items", tags=["action-items"])
 
 
 @router.get("/course/{course_id}", response_model=List[ActionItemResponse])
+@query_budget(3)
+@response_cache.cached("action_items", List[ActionItemResponse])
 async def list_action_items_by_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(ActionItem)
-        .where(ActionItem.course_id == course_id, ActionItem.user_id == current_user.id)
+        select(*schema_columns(ActionItemResponse, ActionItem))
+        .join(Course, Course.id == ActionItem.course_id)
+        .where(ActionItem.course_id == course_id, ActionItem.user_id == current_user.id, Course.deleted_at.is_(None))
         .order_by(desc(ActionItem.created_at))
     )
-    return result.scalars().all()
+    return dumps(records(result.all(), ActionItemResponse))
 
 
-@router.get("", response_model=List[ActionItemWithCourse])
+@router.get("", response_model=Page[ActionItemWithCourse])
+@query_budget(4)
+@response_cache.cached("action_items", Page[ActionItemWithCourse])
 async def list_action_items_by_user(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    view: WithCourseParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(ActionItem)
-        .options(selectinload(ActionItem.course))
-        .where(ActionItem.user_id == current_user.id)
-        .order_by(desc(ActionItem.created_at))
+    """預設每筆附帶完整課程；`shape=normalized` 時課程只輸出一次，`fields=` 可只取需要的欄位"""
+    return await list_with_course(
+        db, ActionItem, ActionItemResponse, "action_item", "created_at",
+        [ActionItem.user_id == current_user.id], page, view,
     )
-    items = result.scalars().all()
-
-    return [
-        ActionItemWithCourse(
-            action_item=ActionItemResponse.model_validate(item),
-            course=CourseResponse.model_validate(item.course) if item.course else None
-        )
-        for item in items
-    ]
 
 
 @router.get("/stats", response_model=ActionItemStats)
+@query_budget(3)
+@response_cache.cached("action_items", ActionItemStats)
 async def get_action_item_stats(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(ActionItem).where(ActionItem.user_id == current_user.id)
+        select(
+            func.count().label("total"),
+            func.count().filter(ActionItem.completed.is_(True)).label("completed"),
+        )
+        .join(Course, Course.id == ActionItem.course_id)
+        .where(ActionItem.user_id == current_user.id, Course.deleted_at.is_(None))
     )
-    items = result.scalars().all()
+    total, completed = result.one()
 
     return ActionItemStats(
-        total=len(items),
-        completed=len([i for i in items if i.completed]),
-        pending=len([i for i in items if not i.completed]),
+        total=total,
+        completed=completed,
+        pending=total - completed,
     )
 
 
 @router.post("", response_model=ActionItemResponse)
 async def create_action_item(
     data: ActionItemCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     item = ActionItem(
@@ -86,14 +96,110 @@ async def create_action_item(
     db.add(item)
     await db.flush()
     await db.refresh(item)
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.upserted(db, current_user.id, "action_items", ActionItemResponse, [item])
     return item
 
 
+async def _check_owned_targets(db: AsyncSession, items: List[ActionItemCreate], user_id: int) -> None:
+    # 批次新增沒有逐筆查詢，先確認課程與知識點都屬於目前使用者，有任何一個不是就整批拒絕
+    owned_courses = (Course.user_id == user_id, Course.deleted_at.is_(None))
+    course_ids = {item.course_id for item in items}
+    result = await db.scalars(select(Course.id).where(Course.id.in_(course_ids), *owned_courses))
+    if len(result.all()) != len(course_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    point_ids = {item.knowledge_point_id for item in items if item.knowledge_point_id is not None}
+    if point_ids:
+        result = await db.scalars(
+            select(KnowledgePoint.id).join(Course).where(KnowledgePoint.id.in_(point_ids), *owned_courses)
+        )
+        if len(result.all()) != len(point_ids):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Knowledge point not found")
+
+
+@router.post("/bulk", response_model=List[ActionItemResponse])
+async def bulk_create_action_items(
+    data: ActionItemBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    await _check_owned_targets(db, data.items, current_user.id)
+    # 一次 INSERT ... RETURNING 寫入全部，回傳順序與請求相同
+    result = await db.scalars(
+        insert(ActionItem).returning(ActionItem, sort_by_parameter_order=True),
+        [
+            {
+                "course_id": item.course_id,
+                "knowledge_point_id": item.knowledge_point_id,
+                "user_id": current_user.id,
+                "title": item.title,
+                "description": item.description,
+                "priority": item.priority or "medium",
+                "due_date": item.due_date,
+            }
+            for item in data.items
+        ],
+    )
+    items = result.all()
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.upserted(db, current_user.id, "action_items", ActionItemResponse, items)
+    return items
+
+
+@router.patch("/bulk", response_model=List[ActionItemResponse])
+async def bulk_update_action_items(
+    data: ActionItemBulkUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    update_data = data.patch.model_dump(exclude_unset=True)
+
+    # 與單筆更新相同：標記完成時只有原本未完成的才寫入 completed_at，取消完成則清空
+    if "completed" in update_data:
+        if update_data["completed"]:
+            update_data["completed_at"] = case(
+                (ActionItem.completed.is_(True), ActionItem.completed_at),
+                else_=datetime.utcnow(),
+            )
+        else:
+            update_data["completed_at"] = None
+
+    owned = (ActionItem.id.in_(data.ids), ActionItem.user_id == current_user.id)
+    if update_data:
+        stmt = update(ActionItem).where(*owned).values(**update_data).returning(ActionItem)
+    else:
+        stmt = select(ActionItem).where(*owned)
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    position = {item_id: index for index, item_id in enumerate(data.ids)}
+    items = sorted(result.all(), key=lambda item: position[item.id])
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.upserted(db, current_user.id, "action_items", ActionItemResponse, items)
+    return items
+
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_action_items(
+    data: BulkDelete,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        delete(ActionItem)
+        .where(ActionItem.id.in_(data.ids), ActionItem.user_id == current_user.id)
+        .returning(ActionItem.id)
+    )
+    deleted_ids = result.scalars().all()
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.deleted(db, current_user.id, "action_items", deleted_ids)
+    return BulkResult(count=len(deleted_ids))
+
+
 @router.patch("/{item_id}", response_model=ActionItemResponse)
 async def update_action_item(
     item_id: int,
     data: ActionItemUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -118,13 +224,15 @@ async def update_action_item(
 
     await db.flush()
     await db.refresh(item)
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.upserted(db, current_user.id, "action_items", ActionItemResponse, [item])
     return item
 
 
 @router.delete("/{item_id}", response_model=SuccessResponse)
 async def delete_action_item(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -136,4 +244,6 @@ async def delete_action_item(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action item not found")
 
     await db.delete(item)
+    response_cache.invalidate(db, current_user.id, "action_items", "analytics")
+    change_events.deleted(db, current_user.id, "action_items", [item_id])
     return SuccessResponse(success=True)
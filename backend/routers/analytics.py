@@ -0,0 +1,115 @@
+from typing import Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, func
+from backend.models import Course, ActionItem, ReviewLog
+from backend.schemas import (
+    AnalyticsSummary, CourseStats, ActionItemStats, PlatformCount,
+    CourseProgressPoint, EmotionalTrendPoint, CourseResponse,
+)
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.query_budget import query_budget
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+PROGRESS_CHART_SIZE = 8
+DASHBOARD_COURSES = 3
+
+
+@router.get("/summary", response_model=AnalyticsSummary)
+@query_budget(9)
+@response_cache.cached("analytics", AnalyticsSummary)
+async def get_analytics_summary(
+    days: Optional[int] = Query(None, ge=1, le=3650, description="復盤日誌統計的時間範圍（天），未指定為全部"),
+    trend_points: int = Query(10, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    course_row = (await db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(Course.status == "completed").label("completed"),
+            func.count().filter(Course.status == "in-progress").label("in_progress"),
+            func.count().filter(Course.status == "not-started").label("not_started"),
+            func.avg(Course.progress_percentage).label("average_progress"),
+        ).where(Course.user_id == current_user.id, Course.deleted_at.is_(None))
+    )).one()
+
+    action_total, action_completed = (await db.execute(
+        select(func.count(), func.count().filter(ActionItem.completed.is_(True)))
+        .join(Course, Course.id == ActionItem.course_id)
+        .where(ActionItem.user_id == current_user.id, Course.deleted_at.is_(None))
+    )).one()
+
+    platform_rows = (await db.execute(
+        select(Course.platform, func.count())
+        .where(Course.user_id == current_user.id, Course.deleted_at.is_(None))
+        .group_by(Course.platform)
+        .order_by(desc(func.count()))
+    )).all()
+
+    # 最近更新的課程同時供進度圖與儀表板「最近課程」使用
+    recent_courses = (await db.execute(
+        select(Course)
+        .where(Course.user_id == current_user.id, Course.deleted_at.is_(None))
+        .order_by(desc(Course.updated_at), desc(Course.id))
+        .limit(PROGRESS_CHART_SIZE)
+    )).scalars().all()
+
+    in_progress_courses = (await db.execute(
+        select(Course)
+        .where(Course.user_id == current_user.id, Course.deleted_at.is_(None), Course.status == "in-progress")
+        .order_by(desc(Course.updated_at), desc(Course.id))
+        .limit(DASHBOARD_COURSES)
+    )).scalars().all()
+
+    # 已軟刪除課程的復盤日誌不列入統計
+    log_filter = [ReviewLog.user_id == current_user.id, Course.deleted_at.is_(None)]
+    if days is not None:
+        log_filter.append(ReviewLog.review_date >= datetime.utcnow() - timedelta(days=days))
+
+    log_count, average_emotion = (await db.execute(
+        select(func.count(), func.avg(ReviewLog.emotional_indicator))
+        .join(Course, Course.id == ReviewLog.course_id)
+        .where(*log_filter)
+    )).one()
+
+    trend_rows = (await db.execute(
+        select(ReviewLog.review_date, ReviewLog.emotional_indicator)
+        .join(Course, Course.id == ReviewLog.course_id)
+        .where(*log_filter)
+        .order_by(desc(ReviewLog.review_date), desc(ReviewLog.id))
+        .limit(trend_points)
+    )).all()
+
+    return AnalyticsSummary(
+        course_stats=CourseStats(
+            total=course_row.total,
+            completed=course_row.completed,
+            in_progress=course_row.in_progress,
+            not_started=course_row.not_started,
+        ),
+        action_item_stats=ActionItemStats(
+            total=action_total,
+            completed=action_completed,
+            pending=action_total - action_completed,
+        ),
+        average_progress=float(course_row.average_progress or 0),
+        platform_distribution=[
+            PlatformCount(platform=platform, count=count) for platform, count in platform_rows
+        ],
+        course_progress=[
+            CourseProgressPoint(id=c.id, title=c.title, progress_percentage=c.progress_percentage)
+            for c in recent_courses
+        ],
+        recent_courses=[CourseResponse.model_validate(c) for c in recent_courses[:DASHBOARD_COURSES]],
+        in_progress_courses=[CourseResponse.model_validate(c) for c in in_progress_courses],
+        review_log_count=log_count,
+        average_emotional_score=float(average_emotion) if average_emotion is not None else None,
+        emotional_trend=[
+            EmotionalTrendPoint(review_date=review_date, emotional_indicator=indicator)
+            for review_date, indicator in reversed(trend_rows)
+        ],
+    )
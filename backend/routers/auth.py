@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from backend.database import get_db
 from backend.models import User
-from backend.schemas import UserCreate, UserLogin, UserResponse, TokenResponse
-from backend.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from backend.schemas import UserCreate, UserLogin, UserResponse, TokenResponse, SuccessResponse
+from backend.auth import (
+    CurrentUser, get_password_hash, verify_password, password_needs_rehash, create_user_token,
+    remember_token_version, forget_user, get_current_user,
+)
+from backend.query_budget import query_budget
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -22,7 +26,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Create new user
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash(user_data.password),
         name=user_data.name,
     )
     db.add(user)
@@ -30,7 +34,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(user)
 
     # Create token
-    token = create_access_token({"id": user.id, "email": user.email, "name": user.name})
+    token = create_user_token(user)
 
     return TokenResponse(
         user=UserResponse(id=user.id, email=user.email, name=user.name),
@@ -43,13 +47,17 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not await verify_password(user_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
-    token = create_access_token({"id": user.id, "email": user.email, "name": user.name})
+    # 設定的 bcrypt cost 變更後，趁登入時以新 cost 重新雜湊
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await get_password_hash(user_data.password)
+
+    token = create_user_token(user)
 
     return TokenResponse(
         user=UserResponse(id=user.id, email=user.email, name=user.name),
@@ -58,5 +66,33 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+@query_budget(1)
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
     return UserResponse(id=current_user.id, email=current_user.email, name=current_user.name)
+
+
+@router.post("/logout-all", response_model=SuccessResponse)
+async def logout_all(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # 遞增 token_version，讓此使用者所有已發出的 token 失效
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    )
+    remember_token_version(current_user.id, result.scalar_one())
+    return SuccessResponse(success=True)
+
+
+@router.delete("/me", response_model=SuccessResponse)
+async def delete_me(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # 單一 DELETE，所有課程與其子資料、標籤由 ON DELETE CASCADE 清除
+    await db.execute(delete(User).where(User.id == current_user.id))
+    forget_user(current_user.id)
+    return SuccessResponse(success=True)
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_db
+from backend.schemas import ImportResult
+from backend.auth import CurrentUser, get_current_user
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.backup import BackupFormatError, Importer, export_csv, export_ndjson, parse_csv, parse_ndjson
+
+router = APIRouter(prefix="/backup", tags=["backup"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export")
+async def export_data(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """串流匯出目前使用者的所有資料"""
+    body = export_csv(current_user.id) if format == "csv" else export_ndjson(current_user.id)
+    filename = f"aar-export-{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=f"{MEDIA_TYPES[format]}; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_data(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(None, description="預設依 Content-Type 判斷"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """匯入 /backup/export 產生的檔案（請求本文即檔案內容），全部成功才會寫入"""
+    if format is None:
+        format = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+    records = parse_csv(request.stream()) if format == "csv" else parse_ndjson(request.stream())
+
+    importer = Importer(db, current_user.id)
+    try:
+        async for record in records:
+            await importer.add(record)
+        imported = await importer.finish()
+    except BackupFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except (IntegrityError, DataError):
+        # DataError：值超出欄位長度或範圍（PostgreSQL）
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import contains invalid records")
+
+    response_cache.invalidate(
+        db, current_user.id,
+        "courses", "analytics", "action_items", "review_logs", "knowledge_points", "tags",
+    )
+    change_events.invalidated(
+        db, current_user.id,
+        "courses", "knowledge_points", "action_items", "review_logs", "tags", "course_tags",
+    )
+    return ImportResult(imported=imported)
@@ -1,55 +1,84 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from backend.database import get_db
-from backend.models import User, Course
-from backend.schemas import CourseCreate, CourseUpdate, CourseResponse, CourseStats, SuccessResponse
-from backend.auth import get_current_user
-
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete, func
+from backend.config import get_settings
+from backend.database import after_commit, get_db
+from backend.models import Course, CourseTag
+from backend.schemas import (
+    CourseCreate, CourseUpdate, CourseResponse, CourseStats, CourseFull, SuccessResponse, Page,
+    KnowledgePointResponse, ActionItemResponse, ReviewLogResponse, CourseTagResponse, TagResponse
+)
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.fast_json import dumps, records, schema_columns
+from backend.pagination import PageParams, paginate, split_page
+from backend.search import index_documents
+from backend.maintenance import purge_deleted_courses
+from backend.query_budget import query_budget
+
+settings = get_settings()
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+# include 名稱 -> 對應的 selectinload；每種子資源固定多一次 IN 查詢，與筆數無關
+COURSE_INCLUDES = {
+    "knowledge_points": selectinload(Course.knowledge_points),
+    "action_items": selectinload(Course.action_items),
+    "review_logs": selectinload(Course.review_logs),
+    "tags": selectinload(Course.course_tags).selectinload(CourseTag.tag),
+}
+
 
-@router.get("", response_model=List[CourseResponse])
+@router.get("", response_model=Page[CourseResponse])
+@query_budget(3)
+@response_cache.cached("courses", Page[CourseResponse])
 async def list_courses(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(Course)
-        .where(Course.user_id == current_user.id)
-        .order_by(desc(Course.updated_at))
+        paginate(
+            select(*schema_columns(CourseResponse, Course))
+            .where(Course.user_id == current_user.id, Course.deleted_at.is_(None)),
+            Course.updated_at, Course.id, page,
+        )
     )
-    return result.scalars().all()
+    rows, next_cursor = split_page(result.all(), page, "updated_at")
+    return dumps({"items": records(rows, CourseResponse), "next_cursor": next_cursor})
 
 
 @router.get("/stats", response_model=CourseStats)
+@query_budget(3)
+@response_cache.cached("courses", CourseStats)
 async def get_course_stats(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(Course).where(Course.user_id == current_user.id)
-    )
-    courses = result.scalars().all()
-
-    return CourseStats(
-        total=len(courses),
-        completed=len([c for c in courses if c.status == "completed"]),
-        in_progress=len([c for c in courses if c.status == "in-progress"]),
-        not_started=len([c for c in courses if c.status == "not-started"]),
+        select(
+            func.count().label("total"),
+            func.count().filter(Course.status == "completed").label("completed"),
+            func.count().filter(Course.status == "in-progress").label("in_progress"),
+            func.count().filter(Course.status == "not-started").label("not_started"),
+        ).where(Course.user_id == current_user.id, Course.deleted_at.is_(None))
     )
+    return CourseStats(**result.one()._mapping)
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
+@query_budget(3)
+@response_cache.cached("courses", CourseResponse)
 async def get_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(Course)
-        .where(Course.id == course_id, Course.user_id == current_user.id)
+        .where(Course.id == course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None))
     )
     course = result.scalar_one_or_none()
     if not course:
@@ -57,10 +86,64 @@ async def get_course(
     return course
 
 
+@router.get("/{course_id}/full", response_model=CourseFull)
+@query_budget(8)
+@response_cache.cached(
+    ("courses", "knowledge_points", "action_items", "review_logs", "tags"), CourseFull
+)
+async def get_course_full(
+    course_id: int,
+    include: str = Query(",".join(COURSE_INCLUDES), description="以逗號分隔的子資源"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """一次載入課程詳情頁需要的所有資料"""
+    includes = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = includes - COURSE_INCLUDES.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
+
+    result = await db.execute(
+        select(Course)
+        .options(*(COURSE_INCLUDES[name] for name in includes))
+        .where(Course.id == course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None))
+    )
+    course = result.scalar_one_or_none()
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    # 排序與各自的列表端點一致
+    full = CourseFull.model_validate(CourseResponse.model_validate(course), from_attributes=True)
+    if "knowledge_points" in includes:
+        full.knowledge_points = [
+            KnowledgePointResponse.model_validate(point)
+            for point in sorted(course.knowledge_points, key=lambda p: (p.created_at, p.id), reverse=True)
+        ]
+    if "action_items" in includes:
+        full.action_items = [
+            ActionItemResponse.model_validate(item)
+            for item in sorted(course.action_items, key=lambda i: (i.created_at, i.id), reverse=True)
+        ]
+    if "review_logs" in includes:
+        full.review_logs = [
+            ReviewLogResponse.model_validate(log)
+            for log in sorted(course.review_logs, key=lambda l: (l.review_date, l.id), reverse=True)
+        ]
+    if "tags" in includes:
+        full.tags = [
+            CourseTagResponse(course_tag_id=ct.id, tag=TagResponse.model_validate(ct.tag))
+            for ct in course.course_tags
+        ]
+    return full
+
+
 @router.post("", response_model=CourseResponse)
 async def create_course(
     course_data: CourseCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     course = Course(
@@ -76,6 +159,9 @@ async def create_course(
     db.add(course)
     await db.flush()
     await db.refresh(course)
+    await index_documents(db, current_user.id, "course", [course])
+    response_cache.invalidate(db, current_user.id, "courses", "analytics")
+    change_events.upserted(db, current_user.id, "courses", CourseResponse, [course])
     return course
 
 
@@ -83,12 +169,12 @@ async def create_course(
 async def update_course(
     course_id: int,
     course_data: CourseUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
         select(Course)
-        .where(Course.id == course_id, Course.user_id == current_user.id)
+        .where(Course.id == course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None))
     )
     course = result.scalar_one_or_none()
     if not course:
@@ -100,22 +186,32 @@ async def update_course(
 
     await db.flush()
     await db.refresh(course)
+    await index_documents(db, current_user.id, "course", [course])
+    response_cache.invalidate(db, current_user.id, "courses", "analytics", "action_items", "review_logs")
+    change_events.upserted(db, current_user.id, "courses", CourseResponse, [course])
     return course
 
 
 @router.delete("/{course_id}", response_model=SuccessResponse)
 async def delete_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Course)
-        .where(Course.id == course_id, Course.user_id == current_user.id)
-    )
-    course = result.scalar_one_or_none()
-    if not course:
+    owned_course = (Course.id == course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None))
+    if settings.course_soft_delete:
+        # 只標記刪除即回應，子資料在 commit 後以 DB cascade 清除；
+        # 清除失敗或行程重啟時由 run_course_purge_loop 補上，期間各列表會略過這門課程的子資料
+        result = await db.execute(update(Course).where(*owned_course).values(deleted_at=datetime.utcnow()))
+        if result.rowcount:
+            after_commit(db, purge_deleted_courses, [course_id])
+    else:
+        # 單一 DELETE，知識點、行動項目、復盤日誌與課程標籤由 ON DELETE CASCADE 處理
+        result = await db.execute(delete(Course).where(*owned_course))
+    if result.rowcount == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
-    await db.delete(course)
+    response_cache.invalidate(db, current_user.id, "courses", "analytics", "action_items", "review_logs", "knowledge_points", "tags")
+    # 客戶端一併移除這門課程的子資料
+    change_events.deleted(db, current_user.id, "courses", [course_id])
     return SuccessResponse(success=True)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from backend.config import get_settings
+from backend.auth import CurrentUser, get_current_user
+from backend.events import CLOSED, ConnectionLimitExceeded, format_sse, hub
+
+router = APIRouter(prefix="/events", tags=["events"])
+settings = get_settings()
+
+
+def _limit_error(exc: ConnectionLimitExceeded) -> HTTPException:
+    if exc.per_user:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many event streams",
+            headers={"Retry-After": "30"},
+        )
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Event stream capacity reached",
+        headers={"Retry-After": "30"},
+    )
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_events(current_user: CurrentUser = Depends(get_current_user)):
+    """目前使用者資料的變更事件（Server-Sent Events），格式見 backend/events.py 的 ChangeEvents
+
+    客戶端依事件直接更新已載入的資料；連線中斷期間的事件不會補送，重新連線後應重新查詢。
+    """
+    if not settings.events_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event stream disabled")
+    try:
+        subscription = hub.subscribe(current_user.id)
+    except ConnectionLimitExceeded as exc:
+        raise _limit_error(exc)
+
+    async def stream():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                payload = await subscription.get(settings.events_heartbeat_seconds)
+                if payload is CLOSED:
+                    return
+                yield b": ping\n\n" if payload is None else format_sse(payload)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # 串流還沒開始連線就中斷時 stream() 的 finally 不會執行，由這裡取消訂閱
+        background=BackgroundTask(hub.unsubscribe, subscription),
+    )
@@ -1,35 +1,64 @@
-from typing import List
+from typing import List, Set
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, insert, update, delete
 from backend.database import get_db
-from backend.models import User, KnowledgePoint
-from backend.schemas import KnowledgePointCreate, KnowledgePointUpdate, KnowledgePointResponse, SuccessResponse
-from backend.auth import get_current_user
+from backend.models import KnowledgePoint, Course
+from backend.schemas import (
+    KnowledgePointCreate, KnowledgePointUpdate, KnowledgePointResponse, SuccessResponse, Page,
+    KnowledgePointBulkCreate, KnowledgePointBulkUpdate, BulkDelete, BulkResult
+)
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.fast_json import dumps, records, schema_columns
+from backend.pagination import PageParams, paginate, split_page
+from backend.search import index_documents
+from backend.query_budget import query_budget
 
 router = APIRouter(prefix="/knowledge-points", tags=["knowledge-points"])
 
 
-@router.get("/course/{course_id}", response_model=List[KnowledgePointResponse])
+@router.get("/course/{course_id}", response_model=Page[KnowledgePointResponse])
+@query_budget(3)
+@response_cache.cached("knowledge_points", Page[KnowledgePointResponse])
 async def list_knowledge_points_by_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(KnowledgePoint)
-        .where(KnowledgePoint.course_id == course_id)
-        .order_by(desc(KnowledgePoint.created_at))
+        paginate(
+            select(*schema_columns(KnowledgePointResponse, KnowledgePoint))
+            .join(Course, Course.id == KnowledgePoint.course_id)
+            .where(
+                KnowledgePoint.course_id == course_id,
+                Course.user_id == current_user.id,
+                Course.deleted_at.is_(None),
+            ),
+            KnowledgePoint.created_at, KnowledgePoint.id, page,
+        )
     )
-    return result.scalars().all()
+    rows, next_cursor = split_page(result.all(), page, "created_at")
+    return dumps({"items": records(rows, KnowledgePointResponse), "next_cursor": next_cursor})
 
 
 @router.post("", response_model=KnowledgePointResponse)
 async def create_knowledge_point(
     data: KnowledgePointCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    # 知識點沒有 user_id，只能建立在目前使用者的課程下；搜尋索引記在課程擁有者名下
+    owner_id = await db.scalar(
+        select(Course.user_id).where(
+            Course.id == data.course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None)
+        )
+    )
+    if owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
     point = KnowledgePoint(
         course_id=data.course_id,
         title=data.title,
@@ -40,22 +69,108 @@ async def create_knowledge_point(
     db.add(point)
     await db.flush()
     await db.refresh(point)
+    await index_documents(db, owner_id, "knowledge_point", [point])
+    response_cache.invalidate(db, current_user.id, "knowledge_points")
+    change_events.upserted(db, current_user.id, "knowledge_points", KnowledgePointResponse, [point])
     return point
 
 
+async def _check_owned_courses(db: AsyncSession, course_ids: Set[int], user_id: int) -> None:
+    # 批次新增沒有逐筆查詢課程，先確認全部屬於目前使用者，有任何一個不是就整批拒絕
+    result = await db.scalars(
+        select(Course.id).where(Course.id.in_(course_ids), Course.user_id == user_id, Course.deleted_at.is_(None))
+    )
+    if len(result.all()) != len(course_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+
+@router.post("/bulk", response_model=List[KnowledgePointResponse])
+async def bulk_create_knowledge_points(
+    data: KnowledgePointBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    await _check_owned_courses(db, {point.course_id for point in data.items}, current_user.id)
+    # 一次 INSERT ... RETURNING 寫入全部，回傳順序與請求相同
+    result = await db.scalars(
+        insert(KnowledgePoint).returning(KnowledgePoint, sort_by_parameter_order=True),
+        [point.model_dump() for point in data.items],
+    )
+    points = result.all()
+    await index_documents(db, current_user.id, "knowledge_point", points)
+    response_cache.invalidate(db, current_user.id, "knowledge_points")
+    change_events.upserted(db, current_user.id, "knowledge_points", KnowledgePointResponse, points)
+    return points
+
+
+def _owned_points(ids: List[int], user_id: int):
+    # 知識點沒有 user_id，批次操作以所屬課程限定在目前使用者未刪除的資料
+    return (
+        KnowledgePoint.id.in_(ids),
+        KnowledgePoint.course_id.in_(
+            select(Course.id).where(Course.user_id == user_id, Course.deleted_at.is_(None))
+        ),
+    )
+
+
+@router.patch("/bulk", response_model=List[KnowledgePointResponse])
+async def bulk_update_knowledge_points(
+    data: KnowledgePointBulkUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    update_data = data.patch.model_dump(exclude_unset=True)
+    owned = _owned_points(data.ids, current_user.id)
+    if update_data:
+        stmt = update(KnowledgePoint).where(*owned).values(**update_data).returning(KnowledgePoint)
+    else:
+        stmt = select(KnowledgePoint).where(*owned)
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    position = {point_id: index for index, point_id in enumerate(data.ids)}
+    points = sorted(result.all(), key=lambda point: position[point.id])
+    await index_documents(db, current_user.id, "knowledge_point", points)
+    response_cache.invalidate(db, current_user.id, "knowledge_points")
+    change_events.upserted(db, current_user.id, "knowledge_points", KnowledgePointResponse, points)
+    return points
+
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_knowledge_points(
+    data: BulkDelete,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        delete(KnowledgePoint).where(*_owned_points(data.ids, current_user.id)).returning(KnowledgePoint.id)
+    )
+    deleted_ids = result.scalars().all()
+    # 關聯的行動項目由 ON DELETE SET NULL 解除連結
+    response_cache.invalidate(db, current_user.id, "knowledge_points", "action_items")
+    change_events.deleted(db, current_user.id, "knowledge_points", deleted_ids)
+    return BulkResult(count=len(deleted_ids))
+
+
+async def _get_owned_point(db: AsyncSession, point_id: int, user_id: int):
+    """單筆知識點與其課程擁有者；不屬於目前使用者（或課程已刪除）時回傳 404"""
+    result = await db.execute(
+        select(KnowledgePoint, Course.user_id)
+        .join(Course, Course.id == KnowledgePoint.course_id)
+        .where(KnowledgePoint.id == point_id, Course.user_id == user_id, Course.deleted_at.is_(None))
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Knowledge point not found")
+    return row
+
+
 @router.patch("/{point_id}", response_model=KnowledgePointResponse)
 async def update_knowledge_point(
     point_id: int,
     data: KnowledgePointUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(KnowledgePoint).where(KnowledgePoint.id == point_id)
-    )
-    point = result.scalar_one_or_none()
-    if not point:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Knowledge point not found")
+    point, owner_id = await _get_owned_point(db, point_id, current_user.id)
 
     update_data = data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
@@ -63,21 +178,21 @@ async def update_knowledge_point(
 
     await db.flush()
     await db.refresh(point)
+    await index_documents(db, owner_id, "knowledge_point", [point])
+    response_cache.invalidate(db, current_user.id, "knowledge_points")
+    change_events.upserted(db, current_user.id, "knowledge_points", KnowledgePointResponse, [point])
     return point
 
 
 @router.delete("/{point_id}", response_model=SuccessResponse)
 async def delete_knowledge_point(
     point_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(KnowledgePoint).where(KnowledgePoint.id == point_id)
-    )
-    point = result.scalar_one_or_none()
-    if not point:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Knowledge point not found")
+    point, _ = await _get_owned_point(db, point_id, current_user.id)
 
     await db.delete(point)
+    response_cache.invalidate(db, current_user.id, "knowledge_points", "action_items")
+    change_events.deleted(db, current_user.id, "knowledge_points", [point_id])
     return SuccessResponse(success=True)
@@ -3,58 +3,61 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
 from backend.database import get_db
-from backend.models import User, ReviewLog
+from backend.models import ReviewLog, Course
 from backend.schemas import (
     ReviewLogCreate, ReviewLogUpdate, ReviewLogResponse,
-    ReviewLogWithCourse, SuccessResponse, CourseResponse
+    ReviewLogWithCourse, SuccessResponse, CourseResponse, Page
 )
-from backend.auth import get_current_user
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.fast_json import dumps, records, schema_columns
+from backend.pagination import PageParams
+from backend.search import index_documents
+from backend.query_budget import query_budget
+from backend.with_course import WithCourseParams, list_with_course
 
 router = APIRouter(prefix="/review-logs", tags=["review-logs"])
 
 
 @router.get("/course/{course_id}", response_model=List[ReviewLogResponse])
+@query_budget(3)
+@response_cache.cached("review_logs", List[ReviewLogResponse])
 async def list_review_logs_by_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
-        select(ReviewLog)
-        .where(ReviewLog.course_id == course_id, ReviewLog.user_id == current_user.id)
+        select(*schema_columns(ReviewLogResponse, ReviewLog))
+        .join(Course, Course.id == ReviewLog.course_id)
+        .where(ReviewLog.course_id == course_id, ReviewLog.user_id == current_user.id, Course.deleted_at.is_(None))
         .order_by(desc(ReviewLog.review_date))
     )
-    return result.scalars().all()
+    return dumps(records(result.all(), ReviewLogResponse))
 
 
-@router.get("", response_model=List[ReviewLogWithCourse])
+@router.get("", response_model=Page[ReviewLogWithCourse])
+@query_budget(4)
+@response_cache.cached("review_logs", Page[ReviewLogWithCourse])
 async def list_review_logs_by_user(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    view: WithCourseParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(ReviewLog)
-        .options(selectinload(ReviewLog.course))
-        .where(ReviewLog.user_id == current_user.id)
-        .order_by(desc(ReviewLog.review_date))
+    """預設每筆附帶完整課程；`shape=normalized` 時課程只輸出一次，`fields=` 可只取需要的欄位"""
+    return await list_with_course(
+        db, ReviewLog, ReviewLogResponse, "review_log", "review_date",
+        [ReviewLog.user_id == current_user.id], page, view,
     )
-    logs = result.scalars().all()
-
-    return [
-        ReviewLogWithCourse(
-            review_log=ReviewLogResponse.model_validate(log),
-            course=CourseResponse.model_validate(log.course) if log.course else None
-        )
-        for log in logs
-    ]
 
 
 @router.post("", response_model=ReviewLogResponse)
 async def create_review_log(
     data: ReviewLogCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     log = ReviewLog(
@@ -70,6 +73,9 @@ async def create_review_log(
     db.add(log)
     await db.flush()
     await db.refresh(log)
+    await index_documents(db, current_user.id, "review_log", [log])
+    response_cache.invalidate(db, current_user.id, "review_logs", "analytics")
+    change_events.upserted(db, current_user.id, "review_logs", ReviewLogResponse, [log])
     return log
 
 
@@ -77,7 +83,7 @@ async def create_review_log(
 async def update_review_log(
     log_id: int,
     data: ReviewLogUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -94,13 +100,16 @@ async def update_review_log(
 
     await db.flush()
     await db.refresh(log)
+    await index_documents(db, current_user.id, "review_log", [log])
+    response_cache.invalidate(db, current_user.id, "review_logs", "analytics")
+    change_events.upserted(db, current_user.id, "review_logs", ReviewLogResponse, [log])
     return log
 
 
 @router.delete("/{log_id}", response_model=SuccessResponse)
 async def delete_review_log(
     log_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -112,4 +121,6 @@ async def delete_review_log(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review log not found")
 
     await db.delete(log)
+    response_cache.invalidate(db, current_user.id, "review_logs", "analytics")
+    change_events.deleted(db, current_user.id, "review_logs", [log_id])
     return SuccessResponse(success=True)
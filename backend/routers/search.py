@@ -0,0 +1,46 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.schemas import SearchHit, Page
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.pagination import PageParams, encode_offset_cursor, decode_offset_cursor
+from backend.search import SNIPPET_LENGTH, highlight, query_terms, search_documents
+from backend.query_budget import query_budget
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=Page[SearchHit])
+@query_budget(2)
+async def search(
+    q: str = Query(min_length=1, max_length=200),
+    type: Optional[Literal["course", "knowledge_point", "review_log"]] = Query(None),
+    course_id: Optional[int] = Query(None),
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """搜尋課程、知識點與復盤日誌，依相關度排序"""
+    offset = decode_offset_cursor(page.cursor)
+    rows = await search_documents(
+        db, current_user.id, q,
+        entity_type=type, course_id=course_id, limit=page.limit + 1, offset=offset,
+    )
+    next_cursor = encode_offset_cursor(offset + page.limit) if len(rows) > page.limit else None
+
+    terms = query_terms(q)
+    items = []
+    for doc, score in rows[:page.limit]:
+        title, title_highlights = highlight(doc.title, terms)
+        snippet, highlights = highlight(doc.body or "", terms, SNIPPET_LENGTH)
+        items.append(SearchHit(
+            type=doc.entity_type,
+            id=doc.entity_id,
+            course_id=doc.course_id,
+            title=title,
+            snippet=snippet,
+            title_highlights=title_highlights,
+            highlights=highlights,
+            score=score,
+        ))
+    return Page(items=items, next_cursor=next_cursor)
@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.config import get_settings
+from backend.database import read_session
+from backend.models import Course, KnowledgePoint, ActionItem, ReviewLog, Tag, CourseTag, SyncTombstone
+from backend.schemas import (
+    CourseResponse, KnowledgePointResponse, ActionItemResponse, ReviewLogResponse, TagResponse,
+    CourseTagLink, SyncResponse, SyncDeleted
+)
+from backend.auth import CurrentUser, get_current_user
+from backend.fast_json import dumps, records, schema_columns
+from backend.query_budget import query_budget
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+settings = get_settings()
+
+
+def encode_token(at: datetime) -> str:
+    raw = json.dumps({"t": at.isoformat()}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> datetime:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return datetime.fromisoformat(json.loads(base64.urlsafe_b64decode(padded))["t"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+
+
+async def get_sync_db(current_user: CurrentUser = Depends(get_current_user)):
+    """同步只讀主資料庫：複本落後時，token 之前已 commit 的變更可能還不在複本上，之後就再也同步不到"""
+    async for session in read_session(current_user.id, replica=False):
+        yield session
+
+
+@router.get("", response_model=SyncResponse)
+@query_budget(7)
+async def sync(
+    since: Optional[str] = Query(None, description="上次同步回傳的 token；省略時回傳完整資料"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_sync_db),
+):
+    """回傳 since 之後新增、修改或刪除的資料，供客戶端維護本機副本
+
+    以 updated_at 判斷變更（課程標籤只會新增或刪除，使用 created_at），刪除來自 sync_tombstones，
+    軟刪除的課程也列在 deleted 中。查詢時往前多取 sync_overlap_seconds 秒，
+    客戶端可能收到已經有的資料，依 id 覆蓋即可。
+    """
+    now = datetime.utcnow()
+    changed_after = None
+    if since is not None:
+        changed_after = decode_token(since) - timedelta(seconds=settings.sync_overlap_seconds)
+        # 刪除紀錄已被清除，無法得知這段期間刪了什麼，改為回傳完整資料
+        if changed_after < now - timedelta(days=settings.sync_tombstone_retention_days):
+            changed_after = None
+    reset = changed_after is None
+
+    def changed(column) -> tuple:
+        return () if reset else (column > changed_after,)
+
+    user_id = current_user.id
+    # 軟刪除課程的子資料不再同步，客戶端收到課程的刪除時一併移除
+    live_course = (Course.user_id == user_id, Course.deleted_at.is_(None))
+
+    course_stmt = select(*schema_columns(CourseResponse, Course), Course.deleted_at).where(
+        Course.user_id == user_id, *changed(Course.updated_at)
+    )
+    if reset:
+        course_stmt = course_stmt.where(Course.deleted_at.is_(None))
+    course_rows = (await db.execute(course_stmt)).all()
+
+    # 有 user_id 的資料表直接以 (user_id, updated_at) 索引篩選，其餘經由課程
+    children = {}
+    for key, model, schema, column, owned in (
+        ("knowledge_points", KnowledgePoint, KnowledgePointResponse, KnowledgePoint.updated_at, ()),
+        ("action_items", ActionItem, ActionItemResponse, ActionItem.updated_at, (ActionItem.user_id == user_id,)),
+        ("review_logs", ReviewLog, ReviewLogResponse, ReviewLog.updated_at, (ReviewLog.user_id == user_id,)),
+        ("course_tags", CourseTag, CourseTagLink, CourseTag.created_at, ()),
+    ):
+        result = await db.execute(
+            select(*schema_columns(schema, model))
+            .join(Course, Course.id == model.course_id)
+            .where(*owned, *live_course, *changed(column))
+        )
+        children[key] = records(result.all(), schema)
+
+    result = await db.execute(
+        select(*schema_columns(TagResponse, Tag)).where(Tag.user_id == user_id, *changed(Tag.updated_at))
+    )
+    tags = records(result.all(), TagResponse)
+
+    deleted = {name: [] for name in SyncDeleted.model_fields}
+    deleted["courses"] = [row.id for row in course_rows if row.deleted_at is not None]
+    if not reset:
+        result = await db.execute(
+            select(SyncTombstone.entity_type, SyncTombstone.entity_id)
+            .where(SyncTombstone.user_id == user_id, SyncTombstone.deleted_at > changed_after)
+        )
+        for entity_type, entity_id in result.all():
+            deleted[entity_type].append(entity_id)
+
+    return Response(content=dumps({
+        "token": encode_token(now),
+        "reset": reset,
+        "courses": records([row for row in course_rows if row.deleted_at is None], CourseResponse),
+        "knowledge_points": children["knowledge_points"],
+        "action_items": children["action_items"],
+        "review_logs": children["review_logs"],
+        "tags": tags,
+        "course_tags": children["course_tags"],
+        "deleted": deleted,
+    }), media_type="application/json")
@@ -1,33 +1,48 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from backend.database import get_db
-from backend.models import User, Tag, CourseTag
-from backend.schemas import TagCreate, TagResponse, CourseTagCreate, CourseTagResponse, SuccessResponse
-from backend.auth import get_current_user
+from backend.models import Tag, CourseTag, Course
+from backend.schemas import (
+    TagCreate, TagResponse, CourseTagCreate, CourseTagResponse, SuccessResponse, Page,
+    CourseTagBulk, BulkResult, CourseTagLink
+)
+from backend.auth import CurrentUser, get_current_user, get_read_db
+from backend.cache import response_cache
+from backend.events import change_events
+from backend.pagination import PageParams, paginate, split_page
+from backend.query_budget import query_budget
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
 
-@router.get("", response_model=List[TagResponse])
+@router.get("", response_model=Page[TagResponse])
+@query_budget(3)
+@response_cache.cached("tags", Page[TagResponse])
 async def list_tags(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    # 標籤依名稱排序，所以 keyset 用 (name, id) 升冪
     result = await db.execute(
-        select(Tag)
-        .where(Tag.user_id == current_user.id)
-        .order_by(Tag.name)
+        paginate(
+            select(Tag).where(Tag.user_id == current_user.id),
+            Tag.name, Tag.id, page, descending=False,
+        )
     )
-    return result.scalars().all()
+    items, next_cursor = split_page(result.scalars().all(), page, "name")
+    return Page(items=items, next_cursor=next_cursor)
 
 
 @router.post("", response_model=TagResponse)
 async def create_tag(
     data: TagCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     tag = Tag(
@@ -39,13 +54,15 @@ async def create_tag(
     db.add(tag)
     await db.flush()
     await db.refresh(tag)
+    response_cache.invalidate(db, current_user.id, "tags")
+    change_events.upserted(db, current_user.id, "tags", TagResponse, [tag])
     return tag
 
 
 @router.delete("/{tag_id}", response_model=SuccessResponse)
 async def delete_tag(
     tag_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -57,20 +74,26 @@ async def delete_tag(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tag not found")
 
     await db.delete(tag)
+    response_cache.invalidate(db, current_user.id, "tags")
+    # 課程標籤由 ON DELETE CASCADE 刪除，客戶端依 tag_id 一併移除
+    change_events.deleted(db, current_user.id, "tags", [tag_id])
     return SuccessResponse(success=True)
 
 
 # Course Tags
 @router.get("/course/{course_id}", response_model=List[CourseTagResponse])
+@query_budget(4)
+@response_cache.cached("tags", List[CourseTagResponse])
 async def list_course_tags(
     course_id: int,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     result = await db.execute(
         select(CourseTag)
         .options(selectinload(CourseTag.tag))
-        .where(CourseTag.course_id == course_id)
+        .join(Course, Course.id == CourseTag.course_id)
+        .where(CourseTag.course_id == course_id, Course.user_id == current_user.id, Course.deleted_at.is_(None))
     )
     course_tags = result.scalars().all()
 
@@ -83,30 +106,93 @@ async def list_course_tags(
     ]
 
 
+def _is_unique_violation(exc: IntegrityError) -> bool:
+    # PostgreSQL 回傳 SQLSTATE 23505；SQLite 沒有錯誤代碼，只能比對訊息
+    return getattr(exc.orig, "sqlstate", None) == "23505" or "UNIQUE constraint failed" in str(exc.orig)
+
+
 @router.post("/course", response_model=SuccessResponse)
 async def add_tag_to_course(
     data: CourseTagCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Check if already exists
-    result = await db.execute(
-        select(CourseTag)
-        .where(CourseTag.course_id == data.course_id, CourseTag.tag_id == data.tag_id)
+    # 課程與標籤都要屬於目前使用者；重複的組合由 (course_id, tag_id) 唯一索引擋下
+    owned = await db.scalar(
+        select(Course.id)
+        .join(Tag, Tag.id == data.tag_id)
+        .where(
+            Course.id == data.course_id,
+            Course.user_id == current_user.id,
+            Course.deleted_at.is_(None),
+            Tag.user_id == current_user.id,
+        )
     )
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tag already added to course")
+    if owned is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course or tag not found")
 
     course_tag = CourseTag(course_id=data.course_id, tag_id=data.tag_id)
     db.add(course_tag)
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        if not _is_unique_violation(exc):
+            raise
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tag already added to course")
+    response_cache.invalidate(db, current_user.id, "tags")
+    change_events.upserted(db, current_user.id, "course_tags", CourseTagLink, [course_tag])
     return SuccessResponse(success=True)
 
 
+@router.post("/course/bulk", response_model=BulkResult)
+async def bulk_add_tags_to_course(
+    data: CourseTagBulk,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    # INSERT ... SELECT 只挑出屬於目前使用者的課程與標籤，已存在的組合交給唯一索引略過
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(CourseTag).from_select(
+        ["course_id", "tag_id"],
+        select(literal(data.course_id), Tag.id)
+        .join(Course, Course.id == data.course_id)
+        .where(
+            Course.user_id == current_user.id,
+            Course.deleted_at.is_(None),
+            Tag.id.in_(data.tag_ids),
+            Tag.user_id == current_user.id,
+        ),
+    ).on_conflict_do_nothing(index_elements=["course_id", "tag_id"])
+    result = await db.execute(stmt)
+    response_cache.invalidate(db, current_user.id, "tags")
+    change_events.invalidated(db, current_user.id, "course_tags")
+    return BulkResult(count=result.rowcount)
+
+
+@router.post("/course/bulk-delete", response_model=BulkResult)
+async def bulk_remove_tags_from_course(
+    data: CourseTagBulk,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        delete(CourseTag).where(
+            CourseTag.course_id == data.course_id,
+            CourseTag.tag_id.in_(data.tag_ids),
+            CourseTag.tag_id.in_(select(Tag.id).where(Tag.user_id == current_user.id)),
+        ).returning(CourseTag.id)
+    )
+    deleted_ids = result.scalars().all()
+    response_cache.invalidate(db, current_user.id, "tags")
+    change_events.deleted(db, current_user.id, "course_tags", deleted_ids)
+    return BulkResult(count=len(deleted_ids))
+
+
 @router.delete("/course/{course_id}/tag/{tag_id}", response_model=SuccessResponse)
 async def remove_tag_from_course(
     course_id: int,
     tag_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -118,4 +204,6 @@ async def remove_tag_from_course(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course tag not found")
 
     await db.delete(course_tag)
+    response_cache.invalidate(db, current_user.id, "tags")
+    change_events.deleted(db, current_user.id, "course_tags", [course_tag.id])
     return SuccessResponse(success=True)
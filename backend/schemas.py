@@ -1,8 +1,19 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Optional, List, Dict, Generic, Tuple, TypeVar
 from pydantic import BaseModel, EmailStr, Field
 
+T = TypeVar("T")
+
+# 單次批次操作的筆數上限
+MAX_BULK_ITEMS = 500
+
+
+# Pagination
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 
 # Auth Schemas
 class UserCreate(BaseModel):
@@ -98,6 +109,15 @@ class KnowledgePointUpdate(BaseModel):
     personal_notes: Optional[str] = None
 
 
+class KnowledgePointBulkCreate(BaseModel):
+    items: List[KnowledgePointCreate] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class KnowledgePointBulkUpdate(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+    patch: KnowledgePointUpdate
+
+
 class KnowledgePointResponse(BaseModel):
     id: int
     course_id: int
@@ -130,6 +150,15 @@ class ActionItemUpdate(BaseModel):
     due_date: Optional[datetime] = None
 
 
+class ActionItemBulkCreate(BaseModel):
+    items: List[ActionItemCreate] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class ActionItemBulkUpdate(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+    patch: ActionItemUpdate
+
+
 class ActionItemResponse(BaseModel):
     id: int
     course_id: int
@@ -225,6 +254,11 @@ class CourseTagCreate(BaseModel):
     tag_id: int
 
 
+class CourseTagBulk(BaseModel):
+    course_id: int
+    tag_ids: List[int] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
 class CourseTagResponse(BaseModel):
     course_tag_id: int
     tag: TagResponse
@@ -233,5 +267,106 @@ class CourseTagResponse(BaseModel):
         from_attributes = True
 
 
+# Course Detail Schemas
+class CourseFull(CourseResponse):
+    """課程與其子資源；未在 include 中的欄位為 null"""
+    knowledge_points: Optional[List[KnowledgePointResponse]] = None
+    action_items: Optional[List[ActionItemResponse]] = None
+    review_logs: Optional[List[ReviewLogResponse]] = None
+    tags: Optional[List[CourseTagResponse]] = None
+
+
+# Analytics Schemas
+class PlatformCount(BaseModel):
+    platform: Optional[str]
+    count: int
+
+
+class CourseProgressPoint(BaseModel):
+    id: int
+    title: str
+    progress_percentage: Decimal
+
+
+class EmotionalTrendPoint(BaseModel):
+    review_date: datetime
+    emotional_indicator: int
+
+
+class AnalyticsSummary(BaseModel):
+    course_stats: CourseStats
+    action_item_stats: ActionItemStats
+    average_progress: float
+    platform_distribution: List[PlatformCount]
+    course_progress: List[CourseProgressPoint]
+    recent_courses: List[CourseResponse]
+    in_progress_courses: List[CourseResponse]
+    review_log_count: int
+    average_emotional_score: Optional[float]
+    emotional_trend: List[EmotionalTrendPoint]
+
+
+# Search Schemas
+class SearchHit(BaseModel):
+    type: str  # course, knowledge_point, review_log
+    id: int
+    course_id: int
+    title: str
+    snippet: str
+    # 命中位置 [start, end)，分別對應 title 與 snippet
+    title_highlights: List[Tuple[int, int]]
+    highlights: List[Tuple[int, int]]
+    score: float
+
+
 class SuccessResponse(BaseModel):
     success: bool = True
+
+
+# Bulk Schemas
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkResult(BaseModel):
+    success: bool = True
+    count: int
+
+
+# Backup Schemas
+class ImportResult(BaseModel):
+    success: bool = True
+    # 各類型匯入的筆數
+    imported: Dict[str, int]
+
+
+# Sync Schemas
+class CourseTagLink(BaseModel):
+    id: int
+    course_id: int
+    tag_id: int
+    created_at: datetime
+
+
+class SyncDeleted(BaseModel):
+    # 各類型已刪除的 id；課程被刪除時其子資料不一定列出，客戶端應一併移除
+    courses: List[int] = []
+    knowledge_points: List[int] = []
+    action_items: List[int] = []
+    review_logs: List[int] = []
+    tags: List[int] = []
+    course_tags: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    # 下次同步時帶回的 since
+    token: str
+    # true 表示這是完整資料，客戶端應以此取代本機的所有資料
+    reset: bool
+    courses: List[CourseResponse]
+    knowledge_points: List[KnowledgePointResponse]
+    action_items: List[ActionItemResponse]
+    review_logs: List[ReviewLogResponse]
+    tags: List[TagResponse]
+    course_tags: List[CourseTagLink]
+    deleted: SyncDeleted
@@ -0,0 +1,199 @@
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import select, insert, delete, func, literal_column, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Course, KnowledgePoint, ReviewLog, SearchDocument
+
+# 中日韓文字沒有空白分詞，以單字 + 相鄰雙字 (bigram) 建索引
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W_{_CJK}]+")
+
+SNIPPET_LENGTH = 120
+
+# SQLite FTS5 虛擬表，定義見 backend/models.py 的 SEARCH_INDEX_DDL
+search_fts = table("search_fts", column("rowid"))
+
+# entity_type -> (標題欄位, 內文欄位)
+ENTITY_FIELDS = {
+    "course": ("title", ("description", "instructor", "platform")),
+    "knowledge_point": ("title", ("summary", "content", "personal_notes")),
+    "review_log": ("title", ("key_takeaways", "reflection", "application_insights")),
+}
+
+
+def normalize(text: str) -> str:
+    # NFKC 把全形英數轉成半形，再統一小寫
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _is_cjk(char: str) -> bool:
+    return re.match(f"[{_CJK}]", char) is not None
+
+
+def _runs(text: str) -> Iterable[str]:
+    return (match.group() for match in _TOKEN_RE.finditer(normalize(text)))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """文件用的 token：英數字以單字切分，中日韓文字產生單字與 bigram"""
+    tokens = []
+    for run in _runs(text or ""):
+        if _is_cjk(run[0]):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def query_terms(query: str) -> List[str]:
+    """查詢用的 token：中日韓文字只取 bigram（單一字才用單字），避免單字造成大量誤中"""
+    terms = []
+    for run in _runs(query):
+        if _is_cjk(run[0]) and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return list(dict.fromkeys(terms))
+
+
+def _match_expression(terms: Sequence[str], dialect: str, prefix_last: bool) -> str:
+    # token 只含文字與數字，不會出現 tsquery / FTS5 的特殊字元
+    last = len(terms) - 1
+    if dialect == "postgresql":
+        return " & ".join(
+            f"{term}:*" if prefix_last and i == last else term for i, term in enumerate(terms)
+        )
+    return " AND ".join(
+        f'"{term}"*' if prefix_last and i == last else f'"{term}"' for i, term in enumerate(terms)
+    )
+
+
+def build_document(user_id: int, entity_type: str, obj) -> dict:
+    title_field, body_fields = ENTITY_FIELDS[entity_type]
+    title = getattr(obj, title_field) or ""
+    body = "\n".join(value for value in (getattr(obj, field) for field in body_fields) if value)
+    return {
+        "user_id": user_id,
+        "course_id": obj.id if entity_type == "course" else obj.course_id,
+        "knowledge_point_id": obj.id if entity_type == "knowledge_point" else None,
+        "review_log_id": obj.id if entity_type == "review_log" else None,
+        "entity_type": entity_type,
+        "entity_id": obj.id,
+        "title": title,
+        "body": body,
+        "title_tokens": " ".join(tokenize(title)),
+        "body_tokens": " ".join(tokenize(body)),
+    }
+
+
+async def index_documents(db: AsyncSession, user_id: int, entity_type: str, objects: Sequence) -> None:
+    """新增或更新資料後呼叫，重建這些資料的索引文件；刪除則由外鍵 CASCADE 處理"""
+    if not objects:
+        return
+    await db.execute(
+        delete(SearchDocument).where(
+            SearchDocument.entity_type == entity_type,
+            SearchDocument.entity_id.in_([obj.id for obj in objects]),
+        )
+    )
+    await db.execute(insert(SearchDocument), [build_document(user_id, entity_type, obj) for obj in objects])
+
+
+async def reindex_user(db: AsyncSession, user_id: int) -> None:
+    """重建某位使用者的全部索引（遷移或修復用）"""
+    courses = (await db.scalars(select(Course).where(Course.user_id == user_id))).all()
+    course_ids = [course.id for course in courses]
+    points = (await db.scalars(select(KnowledgePoint).where(KnowledgePoint.course_id.in_(course_ids)))).all()
+    logs = (await db.scalars(select(ReviewLog).where(ReviewLog.user_id == user_id))).all()
+    await index_documents(db, user_id, "course", courses)
+    await index_documents(db, user_id, "knowledge_point", points)
+    await index_documents(db, user_id, "review_log", logs)
+
+
+def highlight(text: str, terms: Sequence[str], length: Optional[int] = None) -> Tuple[str, List[Tuple[int, int]]]:
+    """回傳（可能截斷的）文字與命中位置 [start, end)；length 為 None 時不截斷"""
+    folded = normalize(text)
+    if len(folded) != len(text):
+        # 正規化改變了長度（少見），直接顯示正規化後的文字，位置才對得上
+        text = folded
+
+    ranges = []
+    for term in terms:
+        start = folded.find(term)
+        while start != -1:
+            ranges.append((start, start + len(term)))
+            start = folded.find(term, start + 1)
+    ranges.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    if length is None or len(text) <= length:
+        return text, merged
+
+    # 以第一個命中位置為中心截取片段
+    first = merged[0][0] if merged else 0
+    start = max(0, min(first - length // 4, len(text) - length))
+    end = start + length
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    offset = len(prefix) - start
+    shifted = [
+        (max(s, start) + offset, min(e, end) + offset)
+        for s, e in merged if e > start and s < end
+    ]
+    return prefix + text[start:end] + suffix, shifted
+
+
+async def search_documents(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    *,
+    entity_type: Optional[str] = None,
+    course_id: Optional[int] = None,
+    limit: int,
+    offset: int = 0,
+) -> List[Tuple[SearchDocument, float]]:
+    """依相關度排序的搜尋結果，分數越高越相關"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    # 輸入中的最後一個英文字可能還沒打完，用前綴比對
+    prefix_last = not _is_cjk(terms[-1][0]) and query == query.rstrip()
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("simple", _match_expression(terms, dialect, prefix_last))
+        vector = literal_column("search_documents.search_vector")
+        rank = func.ts_rank(vector, tsquery)
+        stmt = select(SearchDocument, rank.label("rank")).where(vector.op("@@")(tsquery))
+        order = rank.desc()
+    else:
+        fts = literal_column("search_fts")
+        # bm25 越小越相關；標題權重較高
+        rank = func.bm25(fts, 10.0, 1.0)
+        stmt = (
+            select(SearchDocument, (-rank).label("rank"))
+            .join(search_fts, search_fts.c.rowid == SearchDocument.id)
+            .where(fts.op("MATCH")(_match_expression(terms, dialect, prefix_last)))
+        )
+        order = rank.asc()
+
+    stmt = (
+        stmt.join(Course, Course.id == SearchDocument.course_id)
+        .where(SearchDocument.user_id == user_id, Course.deleted_at.is_(None))
+    )
+    if entity_type:
+        stmt = stmt.where(SearchDocument.entity_type == entity_type)
+    if course_id:
+        stmt = stmt.where(SearchDocument.course_id == course_id)
+
+    stmt = stmt.order_by(order, SearchDocument.id.desc()).limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    return [(row[0], float(row[1])) for row in result.all()]
@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Set, Tuple
+import brotli
+from starlette.responses import FileResponse, Response
+from backend.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 偏好順序：壓縮率較好的在前
+ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".ico", ".webmanifest"}
+INDEX = "index.html"
+ASSETS_PREFIX = "assets/"  # Vite 輸出的檔名帶有內容雜湊，內容不會再變
+
+
+@dataclass
+class Asset:
+    path: Path
+    media_type: str
+    etag: str
+    last_modified: str
+    mtime: int
+    # 編碼 -> (檔案路徑, stat)；identity 為原始檔案
+    variants: Dict[str, Tuple[Path, os.stat_result]] = field(default_factory=dict)
+    # 只有 index.html 會整份放在記憶體
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _digest(path: Path) -> str:
+    hasher = hashlib.blake2b(digest_size=10)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _load(path: Path, keep_in_memory: bool = False) -> Asset:
+    stat_result = path.stat()
+    asset = Asset(
+        path=path,
+        media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        etag=f'"{_digest(path)}"',
+        last_modified=formatdate(stat_result.st_mtime, usegmt=True),
+        mtime=int(stat_result.st_mtime),
+        variants={"identity": (path, stat_result)},
+    )
+    for encoding, suffix in ENCODINGS:
+        sibling = path.with_name(path.name + suffix)
+        if sibling.is_file():
+            asset.variants[encoding] = (sibling, sibling.stat())
+    if keep_in_memory:
+        asset.bodies = {encoding: variant.read_bytes() for encoding, (variant, _) in asset.variants.items()}
+    return asset
+
+
+def accepted_encodings(header: Optional[str]) -> Set[str]:
+    """解析 Accept-Encoding，排除 q=0 的編碼"""
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+def _not_modified(asset: Asset, etag: str, request_headers: Mapping[str, str]) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 優先於 If-Modified-Since，比較時忽略 W/ 前綴
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags or asset.etag in tags
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return asset.mtime <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class StaticAssets:
+    """前端建置結果（dist/）的檔案清單，啟動時建立一次
+
+    - assets/ 下帶雜湊的檔案以 immutable 長效快取回應
+    - 依 Accept-Encoding 回傳預先壓縮的 .br / .gz 檔
+    - index.html 放在記憶體，每 static_index_ttl_seconds 檢查一次檔案是否更新
+    - 支援 If-None-Match / If-Modified-Since，符合時回 304
+    """
+
+    def __init__(self, dist_dir: Path):
+        self.dist_dir = dist_dir
+        self.files: Dict[str, Asset] = {}
+        self.index: Optional[Asset] = None
+        self._index_checked_at = 0.0
+        self.scan()
+
+    def scan(self) -> None:
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for path in sorted(self.dist_dir.rglob("*")):
+            if not path.is_file() or path.name.endswith(suffixes):
+                continue
+            key = path.relative_to(self.dist_dir).as_posix()
+            files[key] = _load(path, keep_in_memory=key == INDEX)
+        self.files = files
+        self.index = files.get(INDEX)
+        self._index_checked_at = time.monotonic()
+        logger.info("Indexed %d static files in %s", len(files), self.dist_dir)
+
+    def _current_index(self) -> Optional[Asset]:
+        # 不重啟就替換 dist/index.html 時（例如只重新建置前端），TTL 到期後重新載入
+        now = time.monotonic()
+        if self.index is not None and now - self._index_checked_at >= settings.static_index_ttl_seconds:
+            self._index_checked_at = now
+            try:
+                if int(self.index.path.stat().st_mtime) != self.index.mtime:
+                    self.index = self.files[INDEX] = _load(self.index.path, keep_in_memory=True)
+            except OSError:
+                logger.warning("Failed to reload %s", self.index.path)
+        return self.index
+
+    def response(self, path: str, request_headers: Mapping[str, str]) -> Response:
+        path = path.lstrip("/")
+        asset = self.files.get(path) if path != INDEX else None
+        if asset is None:
+            if path.startswith(ASSETS_PREFIX):
+                # 缺少的 JS/CSS 不回 index.html，否則瀏覽器會把 HTML 當成腳本執行
+                return Response(status_code=404)
+            asset = self._current_index()
+            if asset is None:
+                return Response(status_code=404)
+
+        if path.startswith(ASSETS_PREFIX):
+            cache_control = f"public, max-age={settings.static_asset_max_age_seconds}, immutable"
+        else:
+            cache_control = f"public, max-age={settings.static_index_ttl_seconds}, must-revalidate"
+
+        accepted = accepted_encodings(request_headers.get("accept-encoding"))
+        encoding = next(
+            (name for name, _ in ENCODINGS if name in asset.variants and (name in accepted or "*" in accepted)),
+            "identity",
+        )
+        # 每種編碼是不同的表示，ETag 需要不同，避免快取把 gzip 內容交給不支援的客戶端
+        etag = asset.etag if encoding == "identity" else f'{asset.etag[:-1]}-{encoding}"'
+        headers = {"cache-control": cache_control, "etag": etag, "last-modified": asset.last_modified}
+        if len(asset.variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+
+        if _not_modified(asset, etag, request_headers):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        if asset.bodies:
+            return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+        variant_path, stat_result = asset.variants[encoding]
+        return FileResponse(variant_path, media_type=asset.media_type, headers=headers, stat_result=stat_result)
+
+
+def precompress(dist_dir: Path, min_size: int = 1024) -> int:
+    """為可壓縮的檔案產生 .gz 與 .br，在前端建置後執行一次"""
+    written = 0
+    for path in sorted(dist_dir.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES or path.stat().st_size < min_size:
+            continue
+        data = path.read_bytes()
+        outputs = {
+            ".gz": gzip.compress(data, compresslevel=9, mtime=0),
+            ".br": brotli.compress(data, quality=11),
+        }
+        for suffix, compressed in outputs.items():
+            # 壓縮後沒有變小就不產生，回應時自然會使用原始檔
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    dist = Path(__file__).parent.parent / "dist"
+    print(f"wrote {precompress(dist)} precompressed files in {dist}")
@@ -0,0 +1,117 @@
+from typing import Literal, Optional, Sequence, Tuple, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.fast_json import JSONBytes, dumps, records, schema_columns
+from backend.models import Course
+from backend.pagination import PageParams, paginate, split_page
+from backend.schemas import CourseResponse
+
+COURSE_PREFIX = "course."
+
+
+class WithCourseParams:
+    """附帶課程的列表（行動項目、復盤日誌）的回應形式
+
+    - `shape=nested`（預設）：每筆為 `{<項目>: {...}, "course": {...}}`
+    - `shape=normalized`：`{"items": [...], "courses": {"<id>": {...}}}`，項目以 course_id 參照課程，
+      同一門課程只輸出一次
+    - `fields`：逗號分隔的欄位，課程欄位加上 `course.` 前綴，例如 `fields=title,review_date,course.title`；
+      沒有列出欄位的一方回傳全部欄位，`id` 一律保留
+    """
+
+    def __init__(
+        self,
+        shape: Literal["nested", "normalized"] = Query("nested"),
+        fields: Optional[str] = Query(None),
+    ):
+        self.shape = shape
+        self.fields = fields
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Tuple[Optional[set], Optional[set]]:
+    """把 fields 參數拆成 (項目欄位, 課程欄位)；None 表示全部欄位"""
+    if not fields:
+        return None, None
+    item_fields, course_fields = set(), set()
+    for field in filter(None, (part.strip() for part in fields.split(","))):
+        if field.startswith(COURSE_PREFIX):
+            target, known, name = course_fields, CourseResponse.model_fields, field[len(COURSE_PREFIX):]
+        else:
+            target, known, name = item_fields, schema.model_fields, field
+        if name not in known:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field: {field}")
+        target.add(name)
+    return (
+        item_fields | {"id"} if item_fields else None,
+        course_fields | {"id"} if course_fields else None,
+    )
+
+
+def _only(rows: list, fields: Optional[set]) -> list:
+    if fields is None:
+        return rows
+    return [{name: value for name, value in row.items() if name in fields} for row in rows]
+
+
+async def list_with_course(
+    db: AsyncSession,
+    model,
+    schema: Type[BaseModel],
+    item_key: str,
+    sort_attr: str,
+    where: Sequence,
+    page: PageParams,
+    view: WithCourseParams,
+) -> JSONBytes:
+    """以欄位查詢產生附帶課程的分頁列表，直接輸出 JSON（見 backend/fast_json.py）
+
+    已軟刪除、等待背景清除的課程，其項目不會列出。
+    """
+    item_fields, course_fields = parse_fields(view.fields, schema)
+    sort_column = getattr(model, sort_attr)
+    # keyset 分頁需要 id 與排序欄位，normalized 需要 course_id；沒有要求的欄位查出後再移除
+    query_fields = None if item_fields is None else item_fields | {"id", sort_attr, "course_id"}
+    columns = schema_columns(schema, model, fields=query_fields)
+
+    if view.shape == "normalized":
+        result = await db.execute(paginate(
+            select(*columns).join(Course, Course.id == model.course_id).where(*where, Course.deleted_at.is_(None)),
+            sort_column, model.id, page,
+        ))
+        rows, next_cursor = split_page(result.all(), page, sort_attr)
+
+        courses = {}
+        course_ids = {row.course_id for row in rows}
+        if course_ids:
+            result = await db.execute(
+                select(*schema_columns(CourseResponse, Course, fields=course_fields))
+                .where(Course.id.in_(course_ids))
+            )
+            courses = {
+                str(course["id"]): course
+                for course in records(result.all(), CourseResponse, fields=course_fields)
+            }
+        items = records(rows, schema, fields=query_fields)
+        return dumps({
+            "items": _only(items, None if item_fields is None else item_fields | {"course_id"}),
+            "courses": courses,
+            "next_cursor": next_cursor,
+        })
+
+    # 課程欄位加上 course__ 前綴，避免與項目欄位同名
+    result = await db.execute(paginate(
+        select(*columns, *schema_columns(CourseResponse, Course, "course__", course_fields))
+        .join(Course, Course.id == model.course_id)
+        .where(*where, Course.deleted_at.is_(None)),
+        sort_column, model.id, page,
+    ))
+    rows, next_cursor = split_page(result.all(), page, sort_attr)
+
+    items = _only(records(rows, schema, fields=query_fields), item_fields)
+    courses = records(rows, CourseResponse, start=len(columns), fields=course_fields)
+    return dumps({
+        "items": [{item_key: item, "course": course} for item, course in zip(items, courses)],
+        "next_cursor": next_cursor,
+    })
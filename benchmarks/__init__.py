@@ -0,0 +1 @@
+# AAR 效能基準測試
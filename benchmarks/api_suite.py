@@ -0,0 +1,284 @@
+"""API 基準測試：以固定種子產生資料後執行數種典型工作負載
+
+工作負載：
+  dashboard      儀表板載入（課程統計、行動項目統計、分析摘要、課程列表）
+  course_detail  課程詳情頁（/courses/{id}/full）
+  bulk_edit      批次切換 10 個行動項目的完成狀態
+  login_storm    大量登入（bcrypt）
+
+可在行程內透過 ASGI 執行（--target asgi，排除網路與序列化到 socket 的成本），
+或啟動本機 uvicorn 後以 HTTP 連線（--target uvicorn）。結果包含各工作負載的
+p50/p95/p99 與吞吐量，並寫成 JSON；加上 --compare 可與先前的結果比較。
+
+    python -m benchmarks.api_suite
+    python -m benchmarks.api_suite --target uvicorn --users 50 --courses 20 --concurrency 16
+    python -m benchmarks.api_suite --compare benchmarks/results/<之前的結果>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmarks.datagen import PASSWORD, DatasetSpec, SeededUser, auth_headers, counts, seed_database
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class Recorder:
+    """記錄每個 HTTP 請求的延遲與狀態碼"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+
+    async def request(self, client, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        errors = sum(count for code, count in self.statuses.items() if code >= 400)
+        latencies = self.latencies or [0.0]
+        return {
+            "requests": len(self.latencies),
+            "errors": errors,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(self.latencies) / elapsed, 1) if elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+
+async def dashboard(client, recorder: Recorder, user: SeededUser, headers: dict, rng: random.Random):
+    for url in ("/api/courses/stats", "/api/action-items/stats", "/api/analytics/summary", "/api/courses?limit=20"):
+        await recorder.request(client, "GET", url, headers=headers)
+
+
+async def course_detail(client, recorder: Recorder, user: SeededUser, headers: dict, rng: random.Random):
+    if user.course_ids:
+        await recorder.request(client, "GET", f"/api/courses/{rng.choice(user.course_ids)}/full", headers=headers)
+
+
+async def bulk_edit(client, recorder: Recorder, user: SeededUser, headers: dict, rng: random.Random):
+    if user.action_item_ids:
+        ids = rng.sample(user.action_item_ids, min(10, len(user.action_item_ids)))
+        await recorder.request(client, "PATCH", "/api/action-items/bulk", headers=headers, json={
+            "ids": ids, "patch": {"completed": rng.random() < 0.5},
+        })
+
+
+async def login_storm(client, recorder: Recorder, user: SeededUser, headers: dict, rng: random.Random):
+    await recorder.request(client, "POST", "/api/auth/login", json={"email": user.email, "password": PASSWORD})
+
+
+WORKLOADS = {
+    "dashboard": dashboard,
+    "course_detail": course_detail,
+    "bulk_edit": bulk_edit,
+    "login_storm": login_storm,
+}
+
+
+async def run_workload(client, name: str, users: List[SeededUser], iterations: int,
+                       concurrency: int, seed: int) -> dict:
+    recorder = Recorder()
+    workload = WORKLOADS[name]
+    headers = {user.id: auth_headers(user) for user in users}
+    remaining = iterations
+
+    async def worker(worker_id: int):
+        nonlocal remaining
+        rng = random.Random(f"{seed}-{name}-{worker_id}")
+        while remaining > 0:
+            remaining -= 1
+            user = rng.choice(users)
+            await workload(client, recorder, user, headers[user.id], rng)
+
+    # 先跑幾次暖身（填滿連線池與快取），不列入統計
+    warmup = Recorder()
+    warmup_rng = random.Random(seed)
+    for user in users[:min(len(users), concurrency)]:
+        await workload(client, warmup, user, headers[user.id], warmup_rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_server(client, process, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited before becoming ready")
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+async def run(args) -> dict:
+    import httpx
+
+    spec = DatasetSpec(users=args.users, courses=args.courses, seed=args.seed)
+    started = time.perf_counter()
+    users = await seed_database(spec, index_search=False)
+    print(f"seeded {counts(users)} in {time.perf_counter() - started:.1f}s")
+
+    plan = {
+        name: args.login_requests if name == "login_storm" else args.requests
+        for name in args.workloads.split(",")
+    }
+    results = {}
+    timeout = httpx.Timeout(60)
+
+    if args.target == "asgi":
+        from backend.main import app, lifespan
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                for name, iterations in plan.items():
+                    results[name] = await run_workload(client, name, users, iterations, args.concurrency, args.seed)
+                    _print_result(name, results[name])
+    else:
+        from backend.database import engine
+        await engine.dispose()
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--log-level", "warning", "--workers", str(args.workers)],
+            env=os.environ.copy(),
+        )
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits) as client:
+                await _wait_for_server(client, process)
+                for name, iterations in plan.items():
+                    results[name] = await run_workload(client, name, users, iterations, args.concurrency, args.seed)
+                    _print_result(name, results[name])
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return results
+
+
+def _print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<14} n={result['requests']:<6} err={result['errors']:<4} "
+        f"{result['throughput_rps']:>8.1f} req/s  p50={result['p50_ms']:>7.2f}ms  "
+        f"p95={result['p95_ms']:>7.2f}ms  p99={result['p99_ms']:>7.2f}ms"
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: dict, current: dict) -> None:
+    print(f"\ncompared with {previous['meta'].get('commit')} ({previous['meta'].get('timestamp')})")
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if before[key]:
+                changes.append(f"{key}={(result[key] - before[key]) / before[key]:+.1%}")
+        print(f"{name:<14} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="以逗號分隔")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--courses", type=int, default=10, help="每位使用者的課程數")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=500, help="每個工作負載的迭代次數")
+    parser.add_argument("--login-requests", type=int, default=40, help="login_storm 的迭代次數（bcrypt 很慢）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker 數")
+    parser.add_argument("--no-cache", action="store_true", help="關閉回應快取")
+    parser.add_argument("--database-url", help="預設使用暫存目錄的 SQLite（每次重新產生資料）")
+    parser.add_argument("--output", help=f"結果 JSON 路徑，預設寫到 {RESULTS_DIR}")
+    parser.add_argument("--compare", help="與先前的結果 JSON 比較")
+    args = parser.parse_args()
+
+    unknown = set(args.workloads.split(",")) - WORKLOADS.keys()
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    os.environ["DATABASE_URL"] = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    )
+    os.environ.setdefault("DEBUG", "false")
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    results = asyncio.run(run(args))
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "target": args.target,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "users": args.users,
+            "courses_per_user": args.courses,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "workers": args.workers if args.target == "uvicorn" else None,
+            "response_cache": not args.no_cache,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}-{args.target}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
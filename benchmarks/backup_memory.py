@@ -0,0 +1,97 @@
+"""大量資料匯入 / 匯出時的記憶體用量
+
+產生指定大小的 NDJSON 匯出檔並以串流方式上傳到 /api/backup/import，再把
+匯出的串流逐塊讀完丟棄，回報各階段的最大 RSS 增量。記憶體不應隨
+檔案大小成長（只有舊 id -> 新 id 的對照表會隨課程與知識點筆數增加）。
+
+    python -m benchmarks.backup_memory --megabytes 100
+    python -m benchmarks.backup_memory --megabytes 500 --format csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+
+
+def peak_rss_mb() -> float:
+    # Linux 上 ru_maxrss 單位為 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate_ndjson(megabytes: int, points_per_course: int = 200):
+    """依序產生課程與知識點，直到總大小達到指定 MB"""
+    target = megabytes * 1024 * 1024
+    content = "學習筆記 learning notes " * 20
+    written = 0
+    record_id = 0
+    while written < target:
+        record_id += 1
+        course_id = record_id
+        line = json.dumps({"type": "course", "id": course_id, "title": f"course {course_id}"}) + "\n"
+        lines = [line]
+        for _ in range(points_per_course):
+            record_id += 1
+            lines.append(json.dumps({
+                "type": "knowledge_point", "id": record_id, "course_id": course_id,
+                "title": f"point {record_id}", "content": content,
+            }, ensure_ascii=False) + "\n")
+        chunk = "".join(lines).encode("utf-8")
+        written += len(chunk)
+        yield chunk
+
+
+async def run(args):
+    import httpx
+    from backend.backup import export_csv, export_ndjson
+    from backend.main import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            response = await client.post(
+                "/api/auth/register",
+                json={"email": "backup@example.com", "password": "password123", "name": "backup"},
+            )
+            user_id = response.json()["user"]["id"]
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+            async def body():
+                for chunk in generate_ndjson(args.megabytes):
+                    yield chunk
+
+            baseline = peak_rss_mb()
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/backup/import", content=body(),
+                headers={**headers, "Content-Type": "application/x-ndjson"},
+            )
+            assert response.status_code == 200, response.text
+            print(f"import  {args.megabytes} MB in {time.perf_counter() - started:.1f}s "
+                  f"peak RSS +{peak_rss_mb() - baseline:.0f} MB  {response.json()['imported']}")
+
+            # httpx 的 ASGITransport 會把整個回應收進記憶體，所以直接讀取端點使用的產生器
+            baseline = peak_rss_mb()
+            started = time.perf_counter()
+            exported = 0
+            async for chunk in (export_csv if args.format == "csv" else export_ndjson)(user_id):
+                exported += len(chunk)
+            print(f"export  {exported / 1024 / 1024:.0f} MB {args.format} in {time.perf_counter() - started:.1f}s "
+                  f"peak RSS +{peak_rss_mb() - baseline:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=50, help="產生的匯入檔大小")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="匯出格式")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    os.environ.setdefault("DEBUG", "false")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
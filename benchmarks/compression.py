@@ -0,0 +1,127 @@
+"""API 回應壓縮：各編碼與等級的傳輸位元組數與 CPU 成本
+
+以 datagen 產生資料，透過 ASGI 取得幾個典型回應的原始本文，再用 CompressionMiddleware
+實際使用的壓縮器逐一壓縮，回報壓縮比與每個回應花費的 CPU 時間；最後比較開啟壓縮前後
+整個請求的延遲。任何壓縮結果無法還原成原始本文就以非零狀態結束。
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --courses 50 --repeat 50
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+# 各編碼要比較的等級（設定欄位, 等級）
+LEVELS = {
+    "gzip": ("compression_gzip_level", (1, 6, 9)),
+    "br": ("compression_brotli_quality", (1, 4, 11)),
+    "zstd": ("compression_zstd_level", (1, 3, 10)),
+}
+
+
+def _decompress(encoding: str, data: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(data)
+    import zstandard
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def measure_encoders(name: str, body: bytes, repeat: int) -> int:
+    from backend.compression import COMPRESSORS, settings
+
+    failures = 0
+    print(f"\n{name}: {len(body) / 1024:.1f} KB uncompressed")
+    for encoding, factory in COMPRESSORS.items():
+        field, levels = LEVELS[encoding]
+        original = getattr(settings, field)
+        try:
+            for level in levels:
+                setattr(settings, field, level)
+                started = time.process_time()
+                for _ in range(repeat):
+                    compressed = factory().finish(body)
+                cpu = (time.process_time() - started) / repeat
+                ok = _decompress(encoding, compressed) == body
+                failures += not ok
+                print(
+                    f"  {encoding:<5} level {level:<3} {len(compressed) / 1024:>8.1f} KB  "
+                    f"ratio {len(body) / len(compressed):>5.1f}x  cpu {cpu * 1000:>7.2f} ms  "
+                    f"{len(body) / cpu / 1024 / 1024 if cpu else 0:>7.0f} MB/s"
+                    f"{'' if ok else '  ROUND-TRIP FAILED'}"
+                )
+        finally:
+            setattr(settings, field, original)
+    return failures
+
+
+async def run(args) -> int:
+    import httpx
+    from backend.main import app, lifespan
+    from backend.compression import available_encodings
+    from benchmarks.datagen import DatasetSpec, auth_headers, seed_database
+
+    users = await seed_database(DatasetSpec(users=1, courses=args.courses, action_items=20, review_logs=10))
+    headers = auth_headers(users[0])
+    urls = {
+        "review_logs": "/api/review-logs?limit=200",
+        "review_logs_normalized": "/api/review-logs?limit=200&shape=normalized",
+        "action_items": "/api/action-items?limit=200",
+        "courses": "/api/courses?limit=100",
+        "backup_export": "/api/backup/export",
+    }
+
+    failures = 0
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            bodies = {}
+            for name, url in urls.items():
+                response = await client.get(url, headers={**headers, "Accept-Encoding": "identity"})
+                response.raise_for_status()
+                bodies[name] = response.content
+            for name, body in bodies.items():
+                failures += measure_encoders(name, body, args.repeat)
+
+            # 端到端：同一組請求在不壓縮與各編碼下的延遲與傳輸量（httpx 會自動解壓 gzip / br / zstd）
+            print("\nend to end (ASGI, per request)")
+            for encoding in ["identity", *available_encodings()]:
+                wire = 0
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    for url in urls.values():
+                        async with client.stream(
+                            "GET", url, headers={**headers, "Accept-Encoding": encoding},
+                        ) as response:
+                            async for chunk in response.aiter_raw():
+                                wire += len(chunk)
+                requests = args.repeat * len(urls)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {encoding:<8} {wire / requests / 1024:>8.1f} KB on the wire  "
+                    f"{elapsed / requests * 1000:>7.2f} ms"
+                )
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=20, help="使用者的課程數")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    os.environ.setdefault("DEBUG", "false")
+    # 端到端比較時每次都要實際產生回應
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
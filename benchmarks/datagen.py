@@ -0,0 +1,185 @@
+"""以固定亂數種子產生 N 位使用者 × M 門課程的測試資料
+
+各類子資料的筆數依經驗分佈抽樣（多數課程只有少量知識點，少數課程很多），同一組
+參數與種子每次產生完全相同的資料，方便比較不同 commit 的基準測試結果。
+
+    python -m benchmarks.datagen --users 50 --courses 20 --seed 1
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+PLATFORMS = ["Udemy", "Coursera", "Hahow", "YouTube", "PressPlay", None]
+STATUSES = ["not-started", "in-progress", "completed"]
+PRIORITIES = ["low", "medium", "high"]
+TAG_NAMES = ["前端", "後端", "資料庫", "設計", "管理", "行銷", "AI", "DevOps", "英文", "理財"]
+WORDS = (
+    "學習 筆記 重點 實作 架構 效能 測試 部署 review pattern async cache index query "
+    "design system product growth 策略 心得 應用 反思"
+).split()
+PASSWORD = "password123"
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 20
+    courses: int = 10  # 每位使用者的課程數
+    knowledge_points: float = 12  # 每門課程的平均筆數（幾何分佈）
+    action_items: float = 6
+    review_logs: float = 3
+    tags: int = 8  # 每位使用者的標籤數
+    tags_per_course: int = 3  # 每門課程最多的標籤數
+    seed: int = 1
+
+
+@dataclass
+class SeededUser:
+    id: int
+    email: str
+    course_ids: List[int] = field(default_factory=list)
+    action_item_ids: List[int] = field(default_factory=list)
+    tag_ids: List[int] = field(default_factory=list)
+
+
+def auth_headers(user: SeededUser) -> dict:
+    """直接簽發 token，不經過登入（bcrypt）即可以這位使用者呼叫 API"""
+    from backend.auth import create_access_token
+    token = create_access_token({"id": user.id, "email": user.email, "name": user.email, "ver": 0})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    # 幾何分佈：長尾，少數課程的子資料特別多
+    if mean <= 0:
+        return 0
+    return int(rng.expovariate(1 / mean))
+
+
+async def seed_database(spec: DatasetSpec, index_search: bool = True) -> List[SeededUser]:
+    """寫入 backend.database 設定的資料庫，回傳每位使用者的 id 與主要資料 id"""
+    from sqlalchemy import insert
+    from backend.auth import get_password_hash
+    from backend.database import AsyncSessionLocal, Base, engine
+    from backend.models import User, Course, KnowledgePoint, ActionItem, ReviewLog, Tag, CourseTag
+    from backend.search import reindex_user
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(spec.seed)
+    now = datetime(2026, 1, 1)
+    # bcrypt 很慢，所有使用者共用同一個密碼雜湊
+    password_hash = await get_password_hash(PASSWORD)
+    seeded: List[SeededUser] = []
+
+    async with AsyncSessionLocal() as db:
+        for user_index in range(spec.users):
+            email = f"bench{spec.seed}-{user_index}@example.com"
+            user_id = await db.scalar(insert(User).returning(User.id), [{
+                "email": email, "password_hash": password_hash, "name": f"Bench {user_index}",
+            }])
+            user = SeededUser(id=user_id, email=email)
+
+            user.tag_ids = list(await db.scalars(insert(Tag).returning(Tag.id, sort_by_parameter_order=True), [
+                {"user_id": user_id, "name": name, "color": f"#{rng.randrange(0x1000000):06x}"}
+                for name in rng.sample(TAG_NAMES, min(spec.tags, len(TAG_NAMES)))
+            ])) if spec.tags else []
+
+            course_rows = []
+            for course_index in range(spec.courses):
+                total = rng.randint(5, 60)
+                completed = rng.randint(0, total)
+                course_rows.append({
+                    "user_id": user_id,
+                    "title": f"{_text(rng, 3)} {course_index}",
+                    "platform": rng.choice(PLATFORMS),
+                    "description": _text(rng, 30),
+                    "status": rng.choice(STATUSES),
+                    "priority": rng.choice(PRIORITIES),
+                    "total_chapters": total,
+                    "completed_chapters": completed,
+                    "progress_percentage": round(completed * 100 / total, 2),
+                    "updated_at": now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+                })
+            user.course_ids = list(await db.scalars(
+                insert(Course).returning(Course.id, sort_by_parameter_order=True), course_rows,
+            )) if course_rows else []
+
+            points, items, logs, course_tags = [], [], [], []
+            for course_id in user.course_ids:
+                for _ in range(_count(rng, spec.knowledge_points)):
+                    points.append({
+                        "course_id": course_id, "title": _text(rng, 4),
+                        "content": _text(rng, 80), "summary": _text(rng, 15),
+                        "created_at": now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+                    })
+                for _ in range(_count(rng, spec.action_items)):
+                    done = rng.random() < 0.4
+                    items.append({
+                        "course_id": course_id, "user_id": user_id, "title": _text(rng, 5),
+                        "priority": rng.choice(PRIORITIES), "completed": done,
+                        "completed_at": now if done else None,
+                        "due_date": now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.5 else None,
+                        "created_at": now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+                    })
+                for _ in range(_count(rng, spec.review_logs)):
+                    logs.append({
+                        "course_id": course_id, "user_id": user_id, "title": _text(rng, 4),
+                        "reflection": _text(rng, 60), "key_takeaways": _text(rng, 20),
+                        "emotional_indicator": rng.randint(1, 5),
+                        "review_date": now - timedelta(days=rng.randrange(365)),
+                    })
+                for tag_id in rng.sample(user.tag_ids, rng.randint(0, min(spec.tags_per_course, len(user.tag_ids)))):
+                    course_tags.append({"course_id": course_id, "tag_id": tag_id})
+
+            if points:
+                await db.execute(insert(KnowledgePoint), points)
+            if items:
+                user.action_item_ids = list(await db.scalars(
+                    insert(ActionItem).returning(ActionItem.id, sort_by_parameter_order=True), items,
+                ))
+            if logs:
+                await db.execute(insert(ReviewLog), logs)
+            if course_tags:
+                await db.execute(insert(CourseTag), course_tags)
+            if index_search:
+                await reindex_user(db, user_id)
+            seeded.append(user)
+        await db.commit()
+    return seeded
+
+
+def counts(users: List[SeededUser]) -> Dict[str, int]:
+    return {
+        "users": len(users),
+        "courses": sum(len(user.course_ids) for user in users),
+        "action_items": sum(len(user.action_item_ids) for user in users),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--courses", type=int, default=DatasetSpec.courses, help="每位使用者的課程數")
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--database-url", help="預設寫入暫存目錄的 SQLite")
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DATABASE_POOL_WARMUP", "false")
+    users = asyncio.run(seed_database(DatasetSpec(users=args.users, courses=args.courses, seed=args.seed)))
+    print(f"seeded {counts(users)} into {database_url}")
+
+
+if __name__ == "__main__":
+    main()
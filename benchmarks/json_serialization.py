@@ -0,0 +1,192 @@
+"""列表端點的序列化路徑：ORM + pydantic 與欄位 Row + 快速編碼器的比較
+
+在同一門課程建立大量復盤日誌與行動項目，分別以舊作法（載入 ORM 物件、
+建立 pydantic model 再以 response_model 驗證並輸出）與目前端點使用的作法
+（只選需要的欄位、直接編碼成 JSON）產生同一份回應，確認輸出完全相同，
+並回報每秒可處理的請求數與 tracemalloc 的峰值記憶體。
+
+    python -m benchmarks.json_serialization --rows 5000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+
+async def seed(rows: int):
+    from sqlalchemy import insert
+    from backend.database import AsyncSessionLocal, Base, engine
+    from backend.models import User, Course, ActionItem, ReviewLog
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(insert(User).returning(User.id), [{
+            "email": "json@example.com", "password_hash": "x", "name": "json",
+        }])
+        course_id = await db.scalar(insert(Course).returning(Course.id), [{
+            "user_id": user_id, "title": "序列化", "progress_percentage": 12.5, "description": "course " * 20,
+        }])
+        await db.execute(insert(ReviewLog), [{
+            "course_id": course_id, "user_id": user_id, "title": f"復盤 {i}",
+            "reflection": "今天學到的重點 " * 10, "key_takeaways": "takeaway " * 5, "emotional_indicator": i % 5 + 1,
+        } for i in range(rows)])
+        await db.execute(insert(ActionItem), [{
+            "course_id": course_id, "user_id": user_id, "title": f"行動 {i}", "completed": i % 2 == 0,
+        } for i in range(rows)])
+        await db.commit()
+    return user_id, course_id
+
+
+def legacy_paths(user_id: int, course_id: int):
+    """改用欄位 Row 之前的端點實作"""
+    from pydantic import TypeAdapter
+    from sqlalchemy import select, desc
+    from sqlalchemy.orm import selectinload
+    from backend.models import ActionItem, ReviewLog
+    from backend.pagination import PageParams, paginate, split_page
+    from backend.schemas import (
+        ActionItemResponse, ActionItemWithCourse, CourseResponse, Page, ReviewLogResponse, ReviewLogWithCourse,
+    )
+
+    by_course = TypeAdapter(list[ReviewLogResponse])
+    with_course = TypeAdapter(Page[ReviewLogWithCourse])
+    items_with_course = TypeAdapter(Page[ActionItemWithCourse])
+
+    async def review_logs_by_course(db, limit):
+        result = await db.execute(
+            select(ReviewLog)
+            .where(ReviewLog.course_id == course_id, ReviewLog.user_id == user_id)
+            .order_by(desc(ReviewLog.review_date))
+        )
+        return by_course.dump_json(by_course.validate_python(result.scalars().all(), from_attributes=True))
+
+    async def review_logs_with_course(db, limit):
+        page = PageParams(limit=limit, cursor=None)
+        result = await db.execute(paginate(
+            select(ReviewLog).options(selectinload(ReviewLog.course)).where(ReviewLog.user_id == user_id),
+            ReviewLog.review_date, ReviewLog.id, page,
+        ))
+        logs, next_cursor = split_page(result.scalars().all(), page, "review_date")
+        response = Page(items=[
+            ReviewLogWithCourse(
+                review_log=ReviewLogResponse.model_validate(log),
+                course=CourseResponse.model_validate(log.course) if log.course else None,
+            )
+            for log in logs
+        ], next_cursor=next_cursor)
+        return with_course.dump_json(with_course.validate_python(response, from_attributes=True))
+
+    async def action_items_with_course(db, limit):
+        page = PageParams(limit=limit, cursor=None)
+        result = await db.execute(paginate(
+            select(ActionItem).options(selectinload(ActionItem.course)).where(ActionItem.user_id == user_id),
+            ActionItem.created_at, ActionItem.id, page,
+        ))
+        items, next_cursor = split_page(result.scalars().all(), page, "created_at")
+        response = Page(items=[
+            ActionItemWithCourse(
+                action_item=ActionItemResponse.model_validate(item),
+                course=CourseResponse.model_validate(item.course) if item.course else None,
+            )
+            for item in items
+        ], next_cursor=next_cursor)
+        return items_with_course.dump_json(items_with_course.validate_python(response, from_attributes=True))
+
+    return {
+        "review_logs_by_course": review_logs_by_course,
+        "review_logs_with_course": review_logs_with_course,
+        "action_items_with_course": action_items_with_course,
+    }
+
+
+def current_paths(user_id: int, course_id: int):
+    from backend.pagination import PageParams
+    from backend.routers import action_items, review_logs
+    from backend.with_course import WithCourseParams
+
+    current_user = SimpleNamespace(id=user_id)
+
+    async def review_logs_by_course(db, limit):
+        return await review_logs.list_review_logs_by_course.__wrapped__(
+            course_id=course_id, current_user=current_user, db=db,
+        )
+
+    async def review_logs_with_course(db, limit):
+        return await review_logs.list_review_logs_by_user.__wrapped__(
+            page=PageParams(limit=limit, cursor=None), view=WithCourseParams(shape="nested", fields=None),
+            current_user=current_user, db=db,
+        )
+
+    async def action_items_with_course(db, limit):
+        return await action_items.list_action_items_by_user.__wrapped__(
+            page=PageParams(limit=limit, cursor=None), view=WithCourseParams(shape="nested", fields=None),
+            current_user=current_user, db=db,
+        )
+
+    return {
+        "review_logs_by_course": review_logs_by_course,
+        "review_logs_with_course": review_logs_with_course,
+        "action_items_with_course": action_items_with_course,
+    }
+
+
+async def measure(func, repeat: int, limit: int):
+    from backend.database import AsyncSessionLocal
+
+    async def once():
+        async with AsyncSessionLocal() as db:
+            return await func(db, limit)
+
+    body = await once()
+    tracemalloc.start()
+    await once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await once()
+    elapsed = time.perf_counter() - started
+    return bytes(body), repeat / elapsed, peak
+
+
+async def run(args) -> int:
+    user_id, course_id = await seed(args.rows)
+    legacy = legacy_paths(user_id, course_id)
+    current = current_paths(user_id, course_id)
+    # 分頁端點上限 200 筆；不分頁的 by_course 端點一次回傳全部
+    limit = 200
+
+    failures = 0
+    for name in legacy:
+        old_body, old_rps, old_peak = await measure(legacy[name], args.repeat, limit)
+        new_body, new_rps, new_peak = await measure(current[name], args.repeat, limit)
+        same = old_body == new_body
+        failures += not same
+        print(
+            f"{name:<24} {len(new_body) / 1024:>8.0f} KB  "
+            f"legacy {old_rps:>7.1f} req/s peak {old_peak / 1024 / 1024:>6.1f} MB  |  "
+            f"rows {new_rps:>7.1f} req/s peak {new_peak / 1024 / 1024:>6.1f} MB  "
+            f"({new_rps / old_rps:.1f}x)  {'identical' if same else 'OUTPUT DIFFERS'}"
+        )
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="復盤日誌與行動項目各自的筆數")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    os.environ.setdefault("DEBUG", "false")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
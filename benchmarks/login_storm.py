@@ -0,0 +1,79 @@
+"""登入風暴期間一般讀取請求的延遲基準測試
+
+同時送出大量 /api/auth/login，並持續量測 /api/auth/me 的延遲，比較 bcrypt
+放在專用執行緒池（目前作法）與直接在 event loop 上執行（--inline）的差異。
+
+    python -m benchmarks.login_storm --logins 40 --reads 200
+    python -m benchmarks.login_storm --inline
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(args):
+    import httpx
+    from backend import auth
+    from backend.main import app, lifespan
+
+    if args.inline:
+        async def run_inline(fn, *fn_args):
+            return fn(*fn_args)
+        auth._run_hash_job = run_inline
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"email": "storm@example.com", "password": "password123"}
+            response = await client.post("/api/auth/register", json={**credentials, "name": "storm"})
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+            read_latencies = []
+            login_statuses = []
+
+            async def reader():
+                for _ in range(args.reads):
+                    started = time.perf_counter()
+                    await client.get("/api/auth/me", headers=headers)
+                    read_latencies.append((time.perf_counter() - started) * 1000)
+                    await asyncio.sleep(0)
+
+            async def login():
+                response = await client.post("/api/auth/login", json=credentials)
+                login_statuses.append(response.status_code)
+
+            started = time.perf_counter()
+            await asyncio.gather(reader(), *(login() for _ in range(args.logins)))
+            elapsed = time.perf_counter() - started
+
+    mode = "inline" if args.inline else f"pool(workers={auth.settings.password_hash_workers})"
+    print(f"mode={mode} logins={args.logins} reads={args.reads} elapsed={elapsed:.2f}s")
+    print(
+        f"read latency ms: p50={statistics.median(read_latencies):.1f} "
+        f"p95={percentile(read_latencies, 0.95):.1f} max={max(read_latencies):.1f}"
+    )
+    print("login status counts:", {code: login_statuses.count(code) for code in sorted(set(login_statuses))})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--inline", action="store_true", help="在 event loop 上直接執行 bcrypt（舊行為）")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+    os.environ.setdefault("DEBUG", "false")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
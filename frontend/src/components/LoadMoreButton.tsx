@@ -0,0 +1,21 @@
+import { Button } from "@/components/ui/button";
+import { Loader2 } from "lucide-react";
+
+interface LoadMoreButtonProps {
+  hasNextPage: boolean;
+  isFetchingNextPage: boolean;
+  fetchNextPage: () => unknown;
+}
+
+export default function LoadMoreButton({ hasNextPage, isFetchingNextPage, fetchNextPage }: LoadMoreButtonProps) {
+  if (!hasNextPage) return null;
+
+  return (
+    <div className="flex justify-center pt-6">
+      <Button variant="outline" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+        {isFetchingNextPage && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+        載入更多
+      </Button>
+    </div>
+  );
+}
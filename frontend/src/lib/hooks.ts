@@ -1,14 +1,43 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { api, type CourseCreate, type CourseUpdate, type ActionItemCreate, type ActionItemUpdate, type KnowledgePointCreate, type KnowledgePointUpdate, type ReviewLogCreate, type ReviewLogUpdate, type TagCreate } from "./api";
+import { useEffect } from "react";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { applyChange } from "./liveUpdates";
+import { api, type Page, type CourseCreate, type CourseUpdate, type ActionItemCreate, type ActionItemUpdate, type KnowledgePointCreate, type KnowledgePointUpdate, type ReviewLogCreate, type ReviewLogUpdate, type TagCreate, type SearchType } from "./api";
+
+// Paginated list helpers: each page carries the cursor for the next one,
+// and `select` flattens the loaded pages so callers still get a plain array.
+function getNextCursor<T>(lastPage: Page<T>) {
+  return lastPage.next_cursor ?? undefined;
+}
+
+function flattenPages<T>(data: { pages: Page<T>[] }) {
+  return data.pages.flatMap((page) => page.items);
+}
+
+// Mutations patch the cached lists with their result (see liveUpdates.ts) instead of
+// invalidating them; the same events arrive from /api/events for other tabs and devices.
 
 // Course hooks
 export function useCourses() {
-  return useQuery({
-    queryKey: ["courses"],
-    queryFn: () => api.courses.list(),
+  return useInfiniteQuery({
+    queryKey: ["courses", "list"],
+    queryFn: ({ pageParam }) => api.courses.list(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
   });
 }
 
+// For course pickers: keeps loading pages until every course is in the list.
+// Shares the cache entry with useCourses, so the courses page gets the full list too.
+export function useAllCourses() {
+  const query = useCourses();
+  const { hasNextPage, isFetchingNextPage, isFetchNextPageError, fetchNextPage } = query;
+  useEffect(() => {
+    if (hasNextPage && !isFetchingNextPage && !isFetchNextPageError) fetchNextPage();
+  }, [hasNextPage, isFetchingNextPage, isFetchNextPageError, fetchNextPage]);
+  return query;
+}
+
 export function useCourse(id: number) {
   return useQuery({
     queryKey: ["courses", id],
@@ -17,6 +46,14 @@ export function useCourse(id: number) {
   });
 }
 
+export function useCourseFull(id: number) {
+  return useQuery({
+    queryKey: ["courses", id, "full"],
+    queryFn: () => api.courses.full(id, ["knowledge_points", "action_items", "review_logs"]),
+    enabled: !!id,
+  });
+}
+
 export function useCourseStats() {
   return useQuery({
     queryKey: ["courses", "stats"],
@@ -28,8 +65,8 @@ export function useCreateCourse() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (data: CourseCreate) => api.courses.create(data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["courses"] });
+    onSuccess: (course) => {
+      applyChange(queryClient, { op: "upsert", resource: "courses", items: [course] });
     },
   });
 }
@@ -39,9 +76,8 @@ export function useUpdateCourse() {
   return useMutation({
     mutationFn: ({ id, data }: { id: number; data: CourseUpdate }) =>
       api.courses.update(id, data),
-    onSuccess: (_, { id }) => {
-      queryClient.invalidateQueries({ queryKey: ["courses"] });
-      queryClient.invalidateQueries({ queryKey: ["courses", id] });
+    onSuccess: (course) => {
+      applyChange(queryClient, { op: "upsert", resource: "courses", items: [course] });
     },
   });
 }
@@ -50,17 +86,20 @@ export function useDeleteCourse() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (id: number) => api.courses.delete(id),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["courses"] });
+    onSuccess: (_, id) => {
+      applyChange(queryClient, { op: "delete", resource: "courses", ids: [id] });
     },
   });
 }
 
 // Knowledge Point hooks
 export function useKnowledgePoints(courseId: number) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ["knowledgePoints", courseId],
-    queryFn: () => api.knowledgePoints.listByCourse(courseId),
+    queryFn: ({ pageParam }) => api.knowledgePoints.listByCourse(courseId, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
     enabled: !!courseId,
   });
 }
@@ -69,8 +108,8 @@ export function useCreateKnowledgePoint() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (data: KnowledgePointCreate) => api.knowledgePoints.create(data),
-    onSuccess: (_, { course_id }) => {
-      queryClient.invalidateQueries({ queryKey: ["knowledgePoints", course_id] });
+    onSuccess: (point) => {
+      applyChange(queryClient, { op: "upsert", resource: "knowledge_points", items: [point] });
     },
   });
 }
@@ -80,8 +119,8 @@ export function useUpdateKnowledgePoint() {
   return useMutation({
     mutationFn: ({ id, data, courseId }: { id: number; data: KnowledgePointUpdate; courseId: number }) =>
       api.knowledgePoints.update(id, data),
-    onSuccess: (_, { courseId }) => {
-      queryClient.invalidateQueries({ queryKey: ["knowledgePoints", courseId] });
+    onSuccess: (point) => {
+      applyChange(queryClient, { op: "upsert", resource: "knowledge_points", items: [point] });
     },
   });
 }
@@ -91,17 +130,30 @@ export function useDeleteKnowledgePoint() {
   return useMutation({
     mutationFn: ({ id, courseId }: { id: number; courseId: number }) =>
       api.knowledgePoints.delete(id),
-    onSuccess: (_, { courseId }) => {
-      queryClient.invalidateQueries({ queryKey: ["knowledgePoints", courseId] });
+    onSuccess: (_, { id }) => {
+      applyChange(queryClient, { op: "delete", resource: "knowledge_points", ids: [id] });
+    },
+  });
+}
+
+export function useBulkDeleteKnowledgePoints() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: ({ ids }: { ids: number[]; courseId: number }) => api.knowledgePoints.bulkDelete(ids),
+    onSuccess: (_, { ids }) => {
+      applyChange(queryClient, { op: "delete", resource: "knowledge_points", ids });
     },
   });
 }
 
 // Action Item hooks
 export function useActionItems() {
-  return useQuery({
-    queryKey: ["actionItems"],
-    queryFn: () => api.actionItems.listByUser(),
+  return useInfiniteQuery({
+    queryKey: ["actionItems", "list"],
+    queryFn: ({ pageParam }) => api.actionItems.listByUser(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
   });
 }
 
@@ -124,8 +176,8 @@ export function useCreateActionItem() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (data: ActionItemCreate) => api.actionItems.create(data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["actionItems"] });
+    onSuccess: (item) => {
+      applyChange(queryClient, { op: "upsert", resource: "action_items", items: [item] });
     },
   });
 }
@@ -135,8 +187,8 @@ export function useUpdateActionItem() {
   return useMutation({
     mutationFn: ({ id, data }: { id: number; data: ActionItemUpdate }) =>
       api.actionItems.update(id, data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["actionItems"] });
+    onSuccess: (item) => {
+      applyChange(queryClient, { op: "upsert", resource: "action_items", items: [item] });
     },
   });
 }
@@ -145,17 +197,51 @@ export function useDeleteActionItem() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (id: number) => api.actionItems.delete(id),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["actionItems"] });
+    onSuccess: (_, id) => {
+      applyChange(queryClient, { op: "delete", resource: "action_items", ids: [id] });
+    },
+  });
+}
+
+export function useBulkCreateActionItems() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: (items: ActionItemCreate[]) => api.actionItems.bulkCreate(items),
+    onSuccess: (items) => {
+      applyChange(queryClient, { op: "upsert", resource: "action_items", items });
+    },
+  });
+}
+
+export function useBulkUpdateActionItems() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: ({ ids, patch }: { ids: number[]; patch: ActionItemUpdate }) =>
+      api.actionItems.bulkUpdate(ids, patch),
+    onSuccess: (items) => {
+      applyChange(queryClient, { op: "upsert", resource: "action_items", items });
+    },
+  });
+}
+
+export function useBulkDeleteActionItems() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: (ids: number[]) => api.actionItems.bulkDelete(ids),
+    onSuccess: (_, ids) => {
+      applyChange(queryClient, { op: "delete", resource: "action_items", ids });
     },
   });
 }
 
 // Review Log hooks
 export function useReviewLogs() {
-  return useQuery({
-    queryKey: ["reviewLogs"],
-    queryFn: () => api.reviewLogs.listByUser(),
+  return useInfiniteQuery({
+    queryKey: ["reviewLogs", "list"],
+    queryFn: ({ pageParam }) => api.reviewLogs.listByUser(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
   });
 }
 
@@ -171,8 +257,8 @@ export function useCreateReviewLog() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (data: ReviewLogCreate) => api.reviewLogs.create(data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["reviewLogs"] });
+    onSuccess: (log) => {
+      applyChange(queryClient, { op: "upsert", resource: "review_logs", items: [log] });
     },
   });
 }
@@ -182,8 +268,8 @@ export function useUpdateReviewLog() {
   return useMutation({
     mutationFn: ({ id, data }: { id: number; data: ReviewLogUpdate }) =>
       api.reviewLogs.update(id, data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["reviewLogs"] });
+    onSuccess: (log) => {
+      applyChange(queryClient, { op: "upsert", resource: "review_logs", items: [log] });
     },
   });
 }
@@ -192,17 +278,40 @@ export function useDeleteReviewLog() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (id: number) => api.reviewLogs.delete(id),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["reviewLogs"] });
+    onSuccess: (_, id) => {
+      applyChange(queryClient, { op: "delete", resource: "review_logs", ids: [id] });
     },
   });
 }
 
+// Analytics hooks
+export function useAnalyticsSummary(days?: number | null) {
+  return useQuery({
+    queryKey: ["analytics", "summary", days ?? "all"],
+    queryFn: () => api.analytics.summary(days),
+  });
+}
+
+// Search hooks
+export function useSearch(q: string, type?: SearchType | null) {
+  return useInfiniteQuery({
+    queryKey: ["search", q, type ?? null],
+    queryFn: ({ pageParam }) => api.search.query({ q, type }, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
+    enabled: q.trim().length > 0,
+  });
+}
+
 // Tag hooks
 export function useTags() {
-  return useQuery({
-    queryKey: ["tags"],
-    queryFn: () => api.tags.list(),
+  return useInfiniteQuery({
+    queryKey: ["tags", "list"],
+    queryFn: ({ pageParam }) => api.tags.list(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: getNextCursor,
+    select: flattenPages,
   });
 }
 
@@ -218,8 +327,8 @@ export function useCreateTag() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (data: TagCreate) => api.tags.create(data),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["tags"] });
+    onSuccess: (tag) => {
+      applyChange(queryClient, { op: "upsert", resource: "tags", items: [tag] });
     },
   });
 }
@@ -228,8 +337,8 @@ export function useDeleteTag() {
   const queryClient = useQueryClient();
   return useMutation({
     mutationFn: (id: number) => api.tags.delete(id),
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ["tags"] });
+    onSuccess: (_, id) => {
+      applyChange(queryClient, { op: "delete", resource: "tags", ids: [id] });
     },
   });
 }
@@ -0,0 +1,334 @@
+import { useEffect } from "react";
+import { useQueryClient, type InfiniteData, type QueryClient, type QueryKey } from "@tanstack/react-query";
+import {
+  api,
+  type ActionItem,
+  type ActionItemWithCourse,
+  type ChangeEvent,
+  type Course,
+  type CourseTagLink,
+  type CourseTagResponse,
+  type KnowledgePoint,
+  type Page,
+  type ReviewLog,
+  type ReviewLogWithCourse,
+  type SyncEntity,
+  type Tag,
+} from "./api";
+
+// Applies change events (from mutations in this tab or the server's /api/events stream)
+// to the React Query cache in place, so lists don't have to be refetched after every write.
+// Aggregates (stats, analytics, search, course detail) are still invalidated; only the
+// queries that are currently rendered refetch.
+
+type Pages<T> = InfiniteData<Page<T>, string | null>;
+type WithId = { id: number };
+
+// Query key roots used in hooks.ts for each resource
+const QUERY_ROOTS: Record<SyncEntity, QueryKey> = {
+  courses: ["courses"],
+  knowledge_points: ["knowledgePoints"],
+  action_items: ["actionItems"],
+  review_logs: ["reviewLogs"],
+  tags: ["tags"],
+  course_tags: ["tags", "course"],
+};
+
+function invalidateDerived(queryClient: QueryClient, resource: SyncEntity) {
+  const invalidate = (queryKey: QueryKey) => queryClient.invalidateQueries({ queryKey });
+  if (resource !== "tags" && resource !== "course_tags") {
+    invalidate(["analytics"]);
+    invalidate(["search"]);
+    queryClient.invalidateQueries({ queryKey: ["courses"], predicate: (query) => query.queryKey[2] === "full" });
+  }
+  if (resource === "courses") invalidate(["courses", "stats"]);
+  if (resource === "action_items") invalidate(["actionItems", "stats"]);
+}
+
+function mapPages<T>(data: Pages<T> | undefined, map: (items: T[]) => T[]): Pages<T> | undefined {
+  if (!data) return data;
+  return { ...data, pages: data.pages.map((page) => ({ ...page, items: map(page.items) })) };
+}
+
+// Replaces items in place; returns the items that were not found in any page.
+function replaceInPages<T, I extends WithId>(
+  data: Pages<T>,
+  items: I[],
+  idOf: (entry: T) => number,
+  build: (item: I, old: T) => T
+) {
+  const byId = new Map(items.map((item) => [item.id, item]));
+  const found = new Set<number>();
+  const next = mapPages(data, (entries) =>
+    entries.map((entry) => {
+      const item = byId.get(idOf(entry));
+      if (!item) return entry;
+      found.add(item.id);
+      return build(item, entry);
+    })
+  )!;
+  return { next, missing: items.filter((item) => !found.has(item.id)) };
+}
+
+function prependToPages<T>(data: Pages<T>, entries: T[]): Pages<T> {
+  if (entries.length === 0 || data.pages.length === 0) return data;
+  const [first, ...rest] = data.pages;
+  return { ...data, pages: [{ ...first, items: [...entries, ...first.items] }, ...rest] };
+}
+
+function removeFromPages<T>(data: Pages<T> | undefined, remove: (entry: T) => boolean) {
+  return mapPages(data, (entries) => entries.filter((entry) => !remove(entry)));
+}
+
+function upsertArray<T extends WithId>(data: T[], items: T[], prependMissing: boolean): T[] {
+  const byId = new Map(items.map((item) => [item.id, item]));
+  const next = data.map((entry) => byId.get(entry.id) ?? entry);
+  const missing = items.filter((item) => !data.some((entry) => entry.id === item.id));
+  return prependMissing ? [...missing, ...next] : next;
+}
+
+// Any course already in the cache (list, detail or embedded in another list)
+function findCachedCourse(queryClient: QueryClient, courseId: number): Course | null {
+  const direct = queryClient.getQueryData<Course>(["courses", courseId]);
+  if (direct) return direct;
+  for (const [, data] of queryClient.getQueriesData<Pages<Course>>({ queryKey: ["courses", "list"] })) {
+    const course = data?.pages.flatMap((page) => page.items).find((entry) => entry.id === courseId);
+    if (course) return course;
+  }
+  return null;
+}
+
+// Lists of { <item>, course } pairs (actionItems / reviewLogs "list" queries)
+function upsertWithCourse<T extends WithId & { course_id: number }, E extends { course: Course | null }>(
+  queryClient: QueryClient,
+  queryKey: QueryKey,
+  items: T[],
+  get: (entry: E) => T,
+  build: (item: T, course: Course | null) => E,
+  prependMissing: boolean
+) {
+  const data = queryClient.getQueryData<Pages<E>>(queryKey);
+  if (!data) return;
+  const { next, missing } = replaceInPages(data, items, (entry) => get(entry).id, (item, old) => build(item, old.course));
+  const courses = missing.map((item) => findCachedCourse(queryClient, item.course_id));
+  queryClient.setQueryData(queryKey, next);
+  if (!prependMissing || courses.some((course) => !course)) {
+    if (missing.length > 0) queryClient.invalidateQueries({ queryKey, exact: true });
+    return;
+  }
+  queryClient.setQueryData(queryKey, prependToPages(next, missing.map((item, i) => build(item, courses[i]))));
+}
+
+function upsert(queryClient: QueryClient, resource: SyncEntity, items: unknown[]) {
+  switch (resource) {
+    case "courses": {
+      // The course list is sorted by updated_at, so a changed course moves to the front.
+      const courses = items as Course[];
+      const ids = new Set(courses.map((course) => course.id));
+      queryClient.setQueriesData<Pages<Course>>({ queryKey: ["courses", "list"] }, (data) =>
+        data && prependToPages(removeFromPages(data, (course) => ids.has(course.id))!, courses)
+      );
+      for (const course of courses) {
+        queryClient.setQueryData<Course>(["courses", course.id], (old) => old && course);
+      }
+      const byId = new Map(courses.map((course) => [course.id, course]));
+      for (const root of ["actionItems", "reviewLogs"]) {
+        queryClient.setQueriesData<Pages<{ course: Course | null }>>({ queryKey: [root, "list"] }, (data) =>
+          mapPages(data, (entries) =>
+            entries.map((entry) => (entry.course && byId.has(entry.course.id) ? { ...entry, course: byId.get(entry.course.id)! } : entry))
+          )
+        );
+      }
+      return;
+    }
+    case "knowledge_points": {
+      const points = items as KnowledgePoint[];
+      for (const [queryKey, data] of queryClient.getQueriesData<Pages<KnowledgePoint>>({ queryKey: ["knowledgePoints"] })) {
+        if (!data) continue;
+        const { next, missing } = replaceInPages(data, points, (point) => point.id, (item) => item);
+        const added = missing.filter((point) => point.course_id === queryKey[1]);
+        queryClient.setQueryData(queryKey, prependToPages(next, added));
+      }
+      return;
+    }
+    case "action_items": {
+      const actionItems = items as ActionItem[];
+      upsertWithCourse<ActionItem, ActionItemWithCourse>(queryClient, ["actionItems", "list"], actionItems,
+        (entry) => entry.action_item, (action_item, course) => ({ action_item, course }), true);
+      for (const [queryKey, data] of queryClient.getQueriesData<ActionItem[]>({ queryKey: ["actionItems", "course"] })) {
+        const own = actionItems.filter((item) => item.course_id === queryKey[2]);
+        if (data && own.length > 0) queryClient.setQueryData(queryKey, upsertArray(data, own, true));
+      }
+      return;
+    }
+    case "review_logs": {
+      // Sorted by review_date, which may be in the past: new logs refetch the list instead.
+      const logs = items as ReviewLog[];
+      upsertWithCourse<ReviewLog, ReviewLogWithCourse>(queryClient, ["reviewLogs", "list"], logs,
+        (entry) => entry.review_log, (review_log, course) => ({ review_log, course }), false);
+      for (const [queryKey, data] of queryClient.getQueriesData<ReviewLog[]>({ queryKey: ["reviewLogs", "course"] })) {
+        const own = logs.filter((log) => log.course_id === queryKey[2]);
+        if (!data || own.length === 0) continue;
+        queryClient.setQueryData(queryKey, upsertArray(data, own, false));
+        if (own.some((log) => !data.some((entry) => entry.id === log.id))) {
+          queryClient.invalidateQueries({ queryKey, exact: true });
+        }
+      }
+      return;
+    }
+    case "tags": {
+      // Sorted by name: renamed tags are replaced in place, new tags refetch the list.
+      const tags = items as Tag[];
+      for (const [queryKey, data] of queryClient.getQueriesData<Pages<Tag>>({ queryKey: ["tags", "list"] })) {
+        if (!data) continue;
+        const { next, missing } = replaceInPages(data, tags, (tag) => tag.id, (item) => item);
+        queryClient.setQueryData(queryKey, next);
+        if (missing.length > 0) queryClient.invalidateQueries({ queryKey, exact: true });
+      }
+      const byId = new Map(tags.map((tag) => [tag.id, tag]));
+      queryClient.setQueriesData<CourseTagResponse[]>({ queryKey: ["tags", "course"] }, (data) =>
+        data?.map((entry) => (byId.has(entry.tag.id) ? { ...entry, tag: byId.get(entry.tag.id)! } : entry))
+      );
+      return;
+    }
+    case "course_tags": {
+      const tags = new Map<number, Tag>();
+      for (const [, data] of queryClient.getQueriesData<Pages<Tag>>({ queryKey: ["tags", "list"] })) {
+        data?.pages.forEach((page) => page.items.forEach((tag) => tags.set(tag.id, tag)));
+      }
+      for (const link of items as CourseTagLink[]) {
+        const queryKey = ["tags", "course", link.course_id];
+        const data = queryClient.getQueryData<CourseTagResponse[]>(queryKey);
+        if (!data || data.some((entry) => entry.course_tag_id === link.id)) continue;
+        const tag = tags.get(link.tag_id);
+        if (tag) {
+          queryClient.setQueryData(queryKey, [...data, { course_tag_id: link.id, tag }]);
+        } else {
+          queryClient.invalidateQueries({ queryKey, exact: true });
+        }
+      }
+      return;
+    }
+  }
+}
+
+function remove(queryClient: QueryClient, resource: SyncEntity, ids: number[]) {
+  const deleted = new Set(ids);
+  const removeFromLists = <T>(queryKey: QueryKey, match: (entry: T) => boolean) =>
+    queryClient.setQueriesData<Pages<T>>({ queryKey }, (data) => removeFromPages(data, match));
+  const removeFromArrays = <T>(queryKey: QueryKey, match: (entry: T) => boolean) =>
+    queryClient.setQueriesData<T[]>({ queryKey }, (data) => data?.filter((entry) => !match(entry)));
+
+  switch (resource) {
+    case "courses":
+      // Children go with the course (ON DELETE CASCADE)
+      removeFromLists<Course>(["courses", "list"], (course) => deleted.has(course.id));
+      removeFromLists<ActionItemWithCourse>(["actionItems", "list"], (entry) => deleted.has(entry.action_item.course_id));
+      removeFromLists<ReviewLogWithCourse>(["reviewLogs", "list"], (entry) => deleted.has(entry.review_log.course_id));
+      for (const id of ids) {
+        queryClient.removeQueries({ queryKey: ["courses", id] });
+        queryClient.removeQueries({ queryKey: ["knowledgePoints", id] });
+        queryClient.removeQueries({ queryKey: ["actionItems", "course", id] });
+        queryClient.removeQueries({ queryKey: ["reviewLogs", "course", id] });
+        queryClient.removeQueries({ queryKey: ["tags", "course", id] });
+      }
+      return;
+    case "knowledge_points": {
+      removeFromLists<KnowledgePoint>(["knowledgePoints"], (point) => deleted.has(point.id));
+      // Linked action items are unlinked (ON DELETE SET NULL)
+      const unlink = (item: ActionItem) =>
+        item.knowledge_point_id !== null && deleted.has(item.knowledge_point_id) ? { ...item, knowledge_point_id: null } : item;
+      queryClient.setQueriesData<Pages<ActionItemWithCourse>>({ queryKey: ["actionItems", "list"] }, (data) =>
+        mapPages(data, (entries) => entries.map((entry) => ({ ...entry, action_item: unlink(entry.action_item) })))
+      );
+      queryClient.setQueriesData<ActionItem[]>({ queryKey: ["actionItems", "course"] }, (data) => data?.map(unlink));
+      return;
+    }
+    case "action_items":
+      removeFromLists<ActionItemWithCourse>(["actionItems", "list"], (entry) => deleted.has(entry.action_item.id));
+      removeFromArrays<ActionItem>(["actionItems", "course"], (item) => deleted.has(item.id));
+      return;
+    case "review_logs":
+      removeFromLists<ReviewLogWithCourse>(["reviewLogs", "list"], (entry) => deleted.has(entry.review_log.id));
+      removeFromArrays<ReviewLog>(["reviewLogs", "course"], (log) => deleted.has(log.id));
+      return;
+    case "tags":
+      removeFromLists<Tag>(["tags", "list"], (tag) => deleted.has(tag.id));
+      removeFromArrays<CourseTagResponse>(["tags", "course"], (entry) => deleted.has(entry.tag.id));
+      return;
+    case "course_tags":
+      removeFromArrays<CourseTagResponse>(["tags", "course"], (entry) => deleted.has(entry.course_tag_id));
+      return;
+  }
+}
+
+export function applyChange(queryClient: QueryClient, event: ChangeEvent) {
+  if (event.op === "resync") {
+    queryClient.invalidateQueries();
+    return;
+  }
+  if (event.op === "upsert") upsert(queryClient, event.resource, event.items);
+  if (event.op === "delete") remove(queryClient, event.resource, event.ids);
+  if (event.op === "invalidate") queryClient.invalidateQueries({ queryKey: QUERY_ROOTS[event.resource] });
+  invalidateDerived(queryClient, event.resource);
+}
+
+// Reads "data:" lines from the text/event-stream body.
+async function readEvents(body: ReadableStream<Uint8Array>, onEvent: (event: ChangeEvent) => void) {
+  const reader = body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value;
+    const messages = buffer.split("\n\n");
+    buffer = messages.pop() ?? "";
+    for (const message of messages) {
+      const data = message
+        .split("\n")
+        .filter((line) => line.startsWith("data: "))
+        .map((line) => line.slice(6))
+        .join("\n");
+      if (data) onEvent(JSON.parse(data) as ChangeEvent);
+    }
+  }
+}
+
+// Keeps a /api/events stream open while signed in. Events caused by this tab are skipped
+// (the mutation hooks already applied them); after a reconnect everything is refetched once
+// because events sent while disconnected are not replayed.
+export function useLiveUpdates(enabled: boolean) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+    const controller = new AbortController();
+    let connectedBefore = false;
+
+    const run = async () => {
+      let delay = 1000;
+      while (!controller.signal.aborted) {
+        try {
+          const response = await api.events.open(controller.signal);
+          if (response.status === 401) return;
+          if (response.ok && response.body) {
+            if (connectedBefore) queryClient.invalidateQueries();
+            connectedBefore = true;
+            delay = 1000;
+            await readEvents(response.body, (event) => {
+              if (event.op === "resync" || event.origin !== api.clientId) applyChange(queryClient, event);
+            });
+          } else {
+            delay = Math.max(delay, Number(response.headers.get("Retry-After") ?? 0) * 1000);
+          }
+        } catch {
+          if (controller.signal.aborted) return;
+        }
+        await new Promise((resolve) => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, 30000);
+      }
+    };
+    run();
+    return () => controller.abort();
+  }, [enabled, queryClient]);
+}
@@ -1,6 +1,14 @@
-import { useCourses, useCourseStats, useActionItemStats, useReviewLogs } from "@/lib/hooks";
+import { useState } from "react";
+import { useAnalyticsSummary } from "@/lib/hooks";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Progress } from "@/components/ui/progress";
+import {
+  Select,
+  SelectContent,
+  SelectItem,
+  SelectTrigger,
+  SelectValue,
+} from "@/components/ui/select";
 import {
   BarChart,
   Bar,
@@ -33,14 +41,21 @@ const COLORS = {
   notStarted: "oklch(0.552 0.016 285.938)",
 };
 
-export default function AnalyticsPage() {
-  const { data: courses, isLoading: coursesLoading } = useCourses();
-  const { data: courseStats, isLoading: courseStatsLoading } = useCourseStats();
-  const { data: actionStats, isLoading: actionStatsLoading } = useActionItemStats();
-  const { data: reviewLogs, isLoading: reviewLogsLoading } = useReviewLogs();
+const TIME_WINDOWS = [
+  { value: "all", label: "全部時間" },
+  { value: "7", label: "最近 7 天" },
+  { value: "30", label: "最近 30 天" },
+  { value: "90", label: "最近 90 天" },
+  { value: "365", label: "最近一年" },
+];
 
-  const isLoading =
-    coursesLoading || courseStatsLoading || actionStatsLoading || reviewLogsLoading;
+export default function AnalyticsPage() {
+  const [timeWindow, setTimeWindow] = useState<string>("all");
+  const { data: summary, isLoading } = useAnalyticsSummary(
+    timeWindow === "all" ? null : Number(timeWindow)
+  );
+  const courseStats = summary?.course_stats;
+  const actionStats = summary?.action_item_stats;
 
   // Course status data for pie chart
   const courseStatusData = [
@@ -51,31 +66,26 @@ export default function AnalyticsPage() {
 
   // Course progress data for bar chart
   const courseProgressData =
-    courses
-      ?.slice(0, 8)
-      .map((course) => ({
-        name: course.title.slice(0, 15) + (course.title.length > 15 ? "..." : ""),
-        progress: Number(course.progress_percentage),
-      })) || [];
+    summary?.course_progress.map((course) => ({
+      name: course.title.slice(0, 15) + (course.title.length > 15 ? "..." : ""),
+      progress: Number(course.progress_percentage),
+    })) || [];
 
   // Emotional trend data
   const emotionalTrendData =
-    reviewLogs
-      ?.slice(0, 10)
-      .reverse()
-      .map((item) => ({
-        date: new Date(item.review_log.review_date).toLocaleDateString("zh-TW", {
-          month: "short",
-          day: "numeric",
-        }),
-        score: item.review_log.emotional_indicator,
-      })) || [];
+    summary?.emotional_trend.map((point) => ({
+      date: new Date(point.review_date).toLocaleDateString("zh-TW", {
+        month: "short",
+        day: "numeric",
+      }),
+      score: point.emotional_indicator,
+    })) || [];
 
-  // Platform distribution
+  // Platform distribution (courses without a platform are grouped as 其他)
   const platformCounts: Record<string, number> = {};
-  courses?.forEach((course) => {
-    const platform = course.platform || "其他";
-    platformCounts[platform] = (platformCounts[platform] || 0) + 1;
+  summary?.platform_distribution.forEach(({ platform, count }) => {
+    const name = platform || "其他";
+    platformCounts[name] = (platformCounts[name] || 0) + count;
   });
   const platformData = Object.entries(platformCounts).map(([name, value]) => ({
     name,
@@ -83,20 +93,13 @@ export default function AnalyticsPage() {
   }));
 
   // Average emotional score
-  const avgEmotionalScore = reviewLogs?.length
-    ? (
-        reviewLogs.reduce((sum, item) => sum + item.review_log.emotional_indicator, 0) /
-        reviewLogs.length
-      ).toFixed(1)
-    : "N/A";
+  const avgEmotionalScore =
+    summary?.average_emotional_score != null
+      ? summary.average_emotional_score.toFixed(1)
+      : "N/A";
 
   // Average progress
-  const avgProgress = courses?.length
-    ? Math.round(
-        courses.reduce((sum, course) => sum + Number(course.progress_percentage), 0) /
-          courses.length
-      )
-    : 0;
+  const avgProgress = Math.round(summary?.average_progress || 0);
 
   if (isLoading) {
     return (
@@ -109,13 +112,27 @@ export default function AnalyticsPage() {
   return (
     <div className="space-y-6">
       {/* Header */}
-      <div>
-        <h1 className="text-3xl font-display font-bold tracking-display">
-          統計分析
-        </h1>
-        <p className="text-muted-foreground mt-1">
-          查看您的學習數據和趨勢
-        </p>
+      <div className="flex flex-col sm:flex-row sm:items-end sm:justify-between gap-4">
+        <div>
+          <h1 className="text-3xl font-display font-bold tracking-display">
+            統計分析
+          </h1>
+          <p className="text-muted-foreground mt-1">
+            查看您的學習數據和趨勢
+          </p>
+        </div>
+        <Select value={timeWindow} onValueChange={setTimeWindow}>
+          <SelectTrigger className="w-40">
+            <SelectValue />
+          </SelectTrigger>
+          <SelectContent>
+            {TIME_WINDOWS.map((option) => (
+              <SelectItem key={option.value} value={option.value}>
+                {option.label}
+              </SelectItem>
+            ))}
+          </SelectContent>
+        </Select>
       </div>
 
       {/* Stats Overview */}
@@ -181,7 +198,7 @@ export default function AnalyticsPage() {
               <span className="text-2xl">{avgEmotionalScore}</span>
             </div>
             <p className="text-xs text-muted-foreground mt-1">
-              {reviewLogs?.length || 0} 篇復盤日誌
+              {summary?.review_log_count || 0} 篇復盤日誌
             </p>
           </CardContent>
         </Card>
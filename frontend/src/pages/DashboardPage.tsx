@@ -1,5 +1,5 @@
 import { Link } from "wouter";
-import { useCourseStats, useActionItemStats, useCourses } from "@/lib/hooks";
+import { useAnalyticsSummary } from "@/lib/hooks";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Progress } from "@/components/ui/progress";
 import { Badge } from "@/components/ui/badge";
@@ -15,12 +15,12 @@ import {
 import { formatDate, getStatusLabel } from "@/lib/utils";
 
 export default function DashboardPage() {
-  const { data: courseStats, isLoading: courseStatsLoading } = useCourseStats();
-  const { data: actionStats, isLoading: actionStatsLoading } = useActionItemStats();
-  const { data: courses, isLoading: coursesLoading } = useCourses();
+  const { data: summary, isLoading } = useAnalyticsSummary();
+  const courseStats = summary?.course_stats;
+  const actionStats = summary?.action_item_stats;
 
-  const recentCourses = courses?.slice(0, 3) || [];
-  const inProgressCourses = courses?.filter((c) => c.status === "in-progress") || [];
+  const recentCourses = summary?.recent_courses || [];
+  const inProgressCourses = summary?.in_progress_courses || [];
 
   return (
     <div className="space-y-8">
@@ -46,7 +46,7 @@ export default function DashboardPage() {
             </div>
           </CardHeader>
           <CardContent>
-            {courseStatsLoading ? (
+            {isLoading ? (
               <Loader2 className="h-6 w-6 animate-spin" />
             ) : (
               <>
@@ -69,7 +69,7 @@ export default function DashboardPage() {
             </div>
           </CardHeader>
           <CardContent>
-            {courseStatsLoading ? (
+            {isLoading ? (
               <Loader2 className="h-6 w-6 animate-spin" />
             ) : (
               <>
@@ -94,7 +94,7 @@ export default function DashboardPage() {
             </div>
           </CardHeader>
           <CardContent>
-            {actionStatsLoading ? (
+            {isLoading ? (
               <Loader2 className="h-6 w-6 animate-spin" />
             ) : (
               <>
@@ -119,7 +119,7 @@ export default function DashboardPage() {
             </div>
           </CardHeader>
           <CardContent>
-            {courseStatsLoading ? (
+            {isLoading ? (
               <Loader2 className="h-6 w-6 animate-spin" />
             ) : (
               <>
@@ -195,7 +195,7 @@ export default function DashboardPage() {
             </Button>
           </Link>
         </div>
-        {coursesLoading ? (
+        {isLoading ? (
           <div className="flex items-center justify-center py-12">
             <Loader2 className="h-8 w-8 animate-spin text-primary" />
           </div>
@@ -1,6 +1,7 @@
 import { useState, useMemo } from "react";
 import { Link } from "wouter";
-import { useReviewLogs, useCourses, useCreateReviewLog, useUpdateReviewLog, useDeleteReviewLog } from "@/lib/hooks";
+import { useReviewLogs, useAllCourses, useCreateReviewLog, useUpdateReviewLog, useDeleteReviewLog } from "@/lib/hooks";
+import LoadMoreButton from "@/components/LoadMoreButton";
 import type { ReviewLog } from "@/lib/api";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import {
@@ -52,8 +53,9 @@ import { useToast } from "@/components/ui/use-toast";
 import { formatDate, getEmotionalIndicator } from "@/lib/utils";
 
 export default function ReviewsPage() {
-  const { data: reviewLogsData, isLoading } = useReviewLogs();
-  const { data: courses } = useCourses();
+  const reviewLogsQuery = useReviewLogs();
+  const { data: reviewLogsData, isLoading } = reviewLogsQuery;
+  const { data: courses } = useAllCourses();
   const createMutation = useCreateReviewLog();
   const updateMutation = useUpdateReviewLog();
   const deleteMutation = useDeleteReviewLog();
@@ -523,6 +525,8 @@ export default function ReviewsPage() {
               })}
             </div>
           )}
+
+          <LoadMoreButton {...reviewLogsQuery} />
         </div>
 
         {/* Mini Calendar - Takes 1/4 */}
@@ -1,6 +1,7 @@
 import { Route, Switch, Redirect } from "wouter";
 import { AuthContext, useAuthProvider, useAuth } from "@/_core/hooks/useAuth";
 import { Toaster } from "@/components/ui/toaster";
+import { useLiveUpdates } from "@/lib/liveUpdates";
 import Layout from "@/components/Layout";
 import LoginPage from "@/pages/LoginPage";
 import RegisterPage from "@/pages/RegisterPage";
@@ -10,6 +11,7 @@ import CourseDetailPage from "@/pages/CourseDetailPage";
 import ActionItemsPage from "@/pages/ActionItemsPage";
 import ReviewsPage from "@/pages/ReviewsPage";
 import AnalyticsPage from "@/pages/AnalyticsPage";
+import SearchPage from "@/pages/SearchPage";
 import { Loader2 } from "lucide-react";
 
 function ProtectedRoute({ children }: { children: React.ReactNode }) {
@@ -105,6 +107,13 @@ function AppRoutes() {
           </Layout>
         </ProtectedRoute>
       </Route>
+      <Route path="/search">
+        <ProtectedRoute>
+          <Layout>
+            <SearchPage />
+          </Layout>
+        </ProtectedRoute>
+      </Route>
       <Route>
         <Redirect to="/" />
       </Route>
@@ -114,6 +123,7 @@ function AppRoutes() {
 
 export default function App() {
   const auth = useAuthProvider();
+  useLiveUpdates(auth.isAuthenticated);
 
   return (
     <AuthContext.Provider value={auth}>
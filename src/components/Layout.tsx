@@ -7,6 +7,7 @@ import {
   CheckSquare,
   FileText,
   BarChart3,
+  Search,
   LogOut,
   Menu,
   X,
@@ -24,6 +25,7 @@ const navItems = [
   { href: "/action-items", label: "行動項目", icon: CheckSquare },
   { href: "/reviews", label: "復盤日誌", icon: FileText },
   { href: "/analytics", label: "統計分析", icon: BarChart3 },
+  { href: "/search", label: "搜尋", icon: Search },
 ];
 
 export default function Layout({ children }: LayoutProps) {
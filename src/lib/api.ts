@@ -1,5 +1,21 @@
 const API_BASE_URL = import.meta.env.VITE_API_URL || "/api";
 
+function withCursor(endpoint: string, cursor?: string | null): string {
+  if (!cursor) return endpoint;
+  return `${endpoint}${endpoint.includes("?") ? "&" : "?"}cursor=${encodeURIComponent(cursor)}`;
+}
+
+// shape=normalized 的回應每門課程只傳一次，這裡還原成每筆附帶 course 的形式
+function withCourses<T extends { course_id: number }, R>(
+  page: NormalizedPage<T>,
+  build: (item: T, course: Course | null) => R
+): Page<R> {
+  return {
+    items: page.items.map((item) => build(item, page.courses[item.course_id] ?? null)),
+    next_cursor: page.next_cursor,
+  };
+}
+
 interface RequestOptions {
   method?: string;
   body?: unknown;
@@ -7,6 +23,10 @@ interface RequestOptions {
 }
 
 class ApiClient {
+  // Sent as X-Client-Id so this tab can skip the change events it caused itself
+  readonly clientId =
+    typeof crypto.randomUUID === "function" ? crypto.randomUUID() : Math.random().toString(36).slice(2);
+
   private getToken(): string | null {
     return localStorage.getItem("auth_token");
   }
@@ -17,6 +37,7 @@ class ApiClient {
     const token = this.getToken();
     const requestHeaders: Record<string, string> = {
       "Content-Type": "application/json",
+      "X-Client-Id": this.clientId,
       ...headers,
     };
 
@@ -51,10 +72,16 @@ class ApiClient {
 
   // Courses
   courses = {
-    list: () => this.request<Course[]>("/courses"),
+    list: (cursor?: string | null) =>
+      this.request<Page<Course>>(withCursor("/courses", cursor)),
 
     get: (id: number) => this.request<Course>(`/courses/${id}`),
 
+    full: (id: number, include?: CourseInclude[]) =>
+      this.request<CourseFull>(
+        include ? `/courses/${id}/full?include=${include.join(",")}` : `/courses/${id}/full`
+      ),
+
     create: (data: CourseCreate) =>
       this.request<Course>("/courses", { method: "POST", body: data }),
 
@@ -69,8 +96,8 @@ class ApiClient {
 
   // Knowledge Points
   knowledgePoints = {
-    listByCourse: (courseId: number) =>
-      this.request<KnowledgePoint[]>(`/knowledge-points/course/${courseId}`),
+    listByCourse: (courseId: number, cursor?: string | null) =>
+      this.request<Page<KnowledgePoint>>(withCursor(`/knowledge-points/course/${courseId}`, cursor)),
 
     create: (data: KnowledgePointCreate) =>
       this.request<KnowledgePoint>("/knowledge-points", { method: "POST", body: data }),
@@ -80,6 +107,15 @@ class ApiClient {
 
     delete: (id: number) =>
       this.request<{ success: boolean }>(`/knowledge-points/${id}`, { method: "DELETE" }),
+
+    bulkCreate: (items: KnowledgePointCreate[]) =>
+      this.request<KnowledgePoint[]>("/knowledge-points/bulk", { method: "POST", body: { items } }),
+
+    bulkUpdate: (ids: number[], patch: KnowledgePointUpdate) =>
+      this.request<KnowledgePoint[]>("/knowledge-points/bulk", { method: "PATCH", body: { ids, patch } }),
+
+    bulkDelete: (ids: number[]) =>
+      this.request<BulkResult>("/knowledge-points/bulk-delete", { method: "POST", body: { ids } }),
   };
 
   // Action Items
@@ -87,8 +123,11 @@ class ApiClient {
     listByCourse: (courseId: number) =>
       this.request<ActionItem[]>(`/action-items/course/${courseId}`),
 
-    listByUser: () =>
-      this.request<ActionItemWithCourse[]>("/action-items"),
+    listByUser: (cursor?: string | null) =>
+      this.request<NormalizedPage<ActionItem>>(withCursor("/action-items?shape=normalized", cursor)).then(
+        (page): Page<ActionItemWithCourse> =>
+          withCourses(page, (action_item, course) => ({ action_item, course }))
+      ),
 
     create: (data: ActionItemCreate) =>
       this.request<ActionItem>("/action-items", { method: "POST", body: data }),
@@ -99,6 +138,15 @@ class ApiClient {
     delete: (id: number) =>
       this.request<{ success: boolean }>(`/action-items/${id}`, { method: "DELETE" }),
 
+    bulkCreate: (items: ActionItemCreate[]) =>
+      this.request<ActionItem[]>("/action-items/bulk", { method: "POST", body: { items } }),
+
+    bulkUpdate: (ids: number[], patch: ActionItemUpdate) =>
+      this.request<ActionItem[]>("/action-items/bulk", { method: "PATCH", body: { ids, patch } }),
+
+    bulkDelete: (ids: number[]) =>
+      this.request<BulkResult>("/action-items/bulk-delete", { method: "POST", body: { ids } }),
+
     stats: () => this.request<ActionItemStats>("/action-items/stats"),
   };
 
@@ -107,8 +155,11 @@ class ApiClient {
     listByCourse: (courseId: number) =>
       this.request<ReviewLog[]>(`/review-logs/course/${courseId}`),
 
-    listByUser: () =>
-      this.request<ReviewLogWithCourse[]>("/review-logs"),
+    listByUser: (cursor?: string | null) =>
+      this.request<NormalizedPage<ReviewLog>>(withCursor("/review-logs?shape=normalized", cursor)).then(
+        (page): Page<ReviewLogWithCourse> =>
+          withCourses(page, (review_log, course) => ({ review_log, course }))
+      ),
 
     create: (data: ReviewLogCreate) =>
       this.request<ReviewLog>("/review-logs", { method: "POST", body: data }),
@@ -120,9 +171,27 @@ class ApiClient {
       this.request<{ success: boolean }>(`/review-logs/${id}`, { method: "DELETE" }),
   };
 
+  // Analytics
+  analytics = {
+    summary: (days?: number | null) =>
+      this.request<AnalyticsSummary>(days ? `/analytics/summary?days=${days}` : "/analytics/summary"),
+  };
+
+  // Search
+  search = {
+    query: (params: { q: string; type?: SearchType | null; courseId?: number | null }, cursor?: string | null) => {
+      const query = new URLSearchParams({ q: params.q });
+      if (params.type) query.set("type", params.type);
+      if (params.courseId) query.set("course_id", String(params.courseId));
+      if (cursor) query.set("cursor", cursor);
+      return this.request<Page<SearchHit>>(`/search?${query}`);
+    },
+  };
+
   // Tags
   tags = {
-    list: () => this.request<Tag[]>("/tags"),
+    list: (cursor?: string | null) =>
+      this.request<Page<Tag>>(withCursor("/tags", cursor)),
 
     create: (data: TagCreate) =>
       this.request<Tag>("/tags", { method: "POST", body: data }),
@@ -143,12 +212,55 @@ class ApiClient {
       this.request<{ success: boolean }>(`/tags/course/${courseId}/tag/${tagId}`, {
         method: "DELETE",
       }),
+
+    bulkAddToCourse: (courseId: number, tagIds: number[]) =>
+      this.request<BulkResult>("/tags/course/bulk", {
+        method: "POST",
+        body: { course_id: courseId, tag_ids: tagIds },
+      }),
+
+    bulkRemoveFromCourse: (courseId: number, tagIds: number[]) =>
+      this.request<BulkResult>("/tags/course/bulk-delete", {
+        method: "POST",
+        body: { course_id: courseId, tag_ids: tagIds },
+      }),
+  };
+
+  // Live updates: a text/event-stream of ChangeEvent, read by useLiveUpdates
+  events = {
+    open: (signal: AbortSignal) => {
+      const token = this.getToken();
+      return fetch(`${API_BASE_URL}/events`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+        signal,
+      });
+    },
+  };
+
+  // Sync
+  sync = {
+    pull: (since?: string | null) =>
+      this.request<SyncResponse>(since ? `/sync?since=${encodeURIComponent(since)}` : "/sync"),
   };
 }
 
 export const api = new ApiClient();
 
 // Types
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+export interface NormalizedPage<T> extends Page<T> {
+  courses: Record<number, Course>;
+}
+
+export interface BulkResult {
+  success: boolean;
+  count: number;
+}
+
 export interface User {
   id: number;
   email: string;
@@ -328,3 +440,65 @@ export interface CourseTagResponse {
   course_tag_id: number;
   tag: Tag;
 }
+
+export type CourseInclude = "knowledge_points" | "action_items" | "review_logs" | "tags";
+
+export interface CourseFull extends Course {
+  knowledge_points: KnowledgePoint[] | null;
+  action_items: ActionItem[] | null;
+  review_logs: ReviewLog[] | null;
+  tags: CourseTagResponse[] | null;
+}
+
+export type SearchType = "course" | "knowledge_point" | "review_log";
+
+export interface SearchHit {
+  type: SearchType;
+  id: number;
+  course_id: number;
+  title: string;
+  snippet: string;
+  title_highlights: [number, number][];
+  highlights: [number, number][];
+  score: number;
+}
+
+export interface AnalyticsSummary {
+  course_stats: CourseStats;
+  action_item_stats: ActionItemStats;
+  average_progress: number;
+  platform_distribution: { platform: string | null; count: number }[];
+  course_progress: { id: number; title: string; progress_percentage: number }[];
+  recent_courses: Course[];
+  in_progress_courses: Course[];
+  review_log_count: number;
+  average_emotional_score: number | null;
+  emotional_trend: { review_date: string; emotional_indicator: number }[];
+}
+
+export interface CourseTagLink {
+  id: number;
+  course_id: number;
+  tag_id: number;
+  created_at: string;
+}
+
+export type SyncEntity = "courses" | "knowledge_points" | "action_items" | "review_logs" | "tags" | "course_tags";
+
+export interface SyncResponse {
+  token: string;
+  reset: boolean;
+  courses: Course[];
+  knowledge_points: KnowledgePoint[];
+  action_items: ActionItem[];
+  review_logs: ReviewLog[];
+  tags: Tag[];
+  course_tags: CourseTagLink[];
+  deleted: Record<SyncEntity, number[]>;
+}
+
+export type ChangeEvent =
+  | { op: "upsert"; resource: SyncEntity; items: unknown[]; origin?: string }
+  | { op: "delete"; resource: SyncEntity; ids: number[]; origin?: string }
+  | { op: "invalidate"; resource: SyncEntity; origin?: string }
+  | { op: "resync" };
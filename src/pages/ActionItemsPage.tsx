@@ -1,6 +1,7 @@
 import { useState } from "react";
 import { Link } from "wouter";
 import { useActionItems, useUpdateActionItem, useDeleteActionItem } from "@/lib/hooks";
+import LoadMoreButton from "@/components/LoadMoreButton";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
@@ -28,7 +29,8 @@ import { useToast } from "@/components/ui/use-toast";
 import { formatDate, getPriorityLabel } from "@/lib/utils";
 
 export default function ActionItemsPage() {
-  const { data: actionItemsData, isLoading } = useActionItems();
+  const actionItemsQuery = useActionItems();
+  const { data: actionItemsData, isLoading } = actionItemsQuery;
   const updateMutation = useUpdateActionItem();
   const deleteMutation = useDeleteActionItem();
   const { toast } = useToast();
@@ -209,6 +211,8 @@ export default function ActionItemsPage() {
           )}
         </div>
       )}
+
+      <LoadMoreButton {...actionItemsQuery} />
     </div>
   );
 }
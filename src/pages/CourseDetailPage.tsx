@@ -1,15 +1,12 @@
 import { useState } from "react";
 import { useLocation } from "wouter";
 import {
-  useCourse,
+  useCourseFull,
   useUpdateCourse,
   useDeleteCourse,
-  useKnowledgePoints,
   useCreateKnowledgePoint,
   useDeleteKnowledgePoint,
-  useActionItemsByCourse,
   useCreateActionItem,
-  useReviewLogsByCourse,
 } from "@/lib/hooks";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -68,12 +65,13 @@ interface CourseDetailPageProps {
 
 export default function CourseDetailPage({ id }: CourseDetailPageProps) {
   const [, setLocation] = useLocation();
-  const { data: course, isLoading } = useCourse(id);
+  // One request for the course and its children instead of four
+  const { data: course, isLoading } = useCourseFull(id);
+  const knowledgePoints = course?.knowledge_points;
+  const actionItems = course?.action_items;
+  const reviewLogs = course?.review_logs;
   const updateMutation = useUpdateCourse();
   const deleteMutation = useDeleteCourse();
-  const { data: knowledgePoints } = useKnowledgePoints(id);
-  const { data: actionItems } = useActionItemsByCourse(id);
-  const { data: reviewLogs } = useReviewLogsByCourse(id);
   const createKnowledgePointMutation = useCreateKnowledgePoint();
   const deleteKnowledgePointMutation = useDeleteKnowledgePoint();
   const createActionItemMutation = useCreateActionItem();
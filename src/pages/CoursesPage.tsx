@@ -1,6 +1,7 @@
 import { useState } from "react";
 import { Link } from "wouter";
 import { useCourses, useCreateCourse, useDeleteCourse } from "@/lib/hooks";
+import LoadMoreButton from "@/components/LoadMoreButton";
 import type { CourseCreate } from "@/lib/api";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
@@ -48,7 +49,8 @@ import { useToast } from "@/components/ui/use-toast";
 import { formatDate, getStatusLabel, getPriorityLabel } from "@/lib/utils";
 
 export default function CoursesPage() {
-  const { data: courses, isLoading } = useCourses();
+  const coursesQuery = useCourses();
+  const { data: courses, isLoading } = coursesQuery;
   const createMutation = useCreateCourse();
   const deleteMutation = useDeleteCourse();
   const { toast } = useToast();
@@ -400,6 +402,8 @@ export default function CoursesPage() {
           ))}
         </div>
       )}
+
+      <LoadMoreButton {...coursesQuery} />
     </div>
   );
 }
@@ -0,0 +1,122 @@
+import { useEffect, useState } from "react";
+import { Link } from "wouter";
+import { useSearch } from "@/lib/hooks";
+import type { SearchType } from "@/lib/api";
+import LoadMoreButton from "@/components/LoadMoreButton";
+import { Card, CardContent } from "@/components/ui/card";
+import { Input } from "@/components/ui/input";
+import { Badge } from "@/components/ui/badge";
+import {
+  Select,
+  SelectContent,
+  SelectItem,
+  SelectTrigger,
+  SelectValue,
+} from "@/components/ui/select";
+import { Search, Loader2 } from "lucide-react";
+
+const typeLabels: Record<SearchType, string> = {
+  course: "課程",
+  knowledge_point: "知識點",
+  review_log: "復盤日誌",
+};
+
+function Highlighted({ text, ranges }: { text: string; ranges: [number, number][] }) {
+  const parts: React.ReactNode[] = [];
+  let cursor = 0;
+  ranges.forEach(([start, end], index) => {
+    if (start > cursor) parts.push(text.slice(cursor, start));
+    parts.push(
+      <mark key={index} className="bg-primary/20 text-foreground rounded px-0.5">
+        {text.slice(start, end)}
+      </mark>
+    );
+    cursor = end;
+  });
+  if (cursor < text.length) parts.push(text.slice(cursor));
+  return <>{parts}</>;
+}
+
+export default function SearchPage() {
+  const [input, setInput] = useState("");
+  const [query, setQuery] = useState("");
+  const [type, setType] = useState<SearchType | "all">("all");
+
+  // Wait for typing to pause before hitting the API
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(input.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [input]);
+
+  const searchQuery = useSearch(query, type === "all" ? null : type);
+  const { data: results, isFetching } = searchQuery;
+
+  return (
+    <div className="space-y-6">
+      {/* Header */}
+      <div>
+        <h1 className="text-3xl font-display font-bold tracking-display">搜尋</h1>
+        <p className="text-muted-foreground mt-1">搜尋課程、知識點與復盤日誌</p>
+      </div>
+
+      {/* Search bar */}
+      <div className="flex flex-col sm:flex-row gap-4">
+        <div className="relative flex-1">
+          <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-muted-foreground" />
+          <Input
+            placeholder="輸入關鍵字..."
+            value={input}
+            onChange={(e) => setInput(e.target.value)}
+            className="pl-10"
+            autoFocus
+          />
+        </div>
+        <Select value={type} onValueChange={(value) => setType(value as SearchType | "all")}>
+          <SelectTrigger className="w-full sm:w-[160px]">
+            <SelectValue />
+          </SelectTrigger>
+          <SelectContent>
+            <SelectItem value="all">全部</SelectItem>
+            {Object.entries(typeLabels).map(([value, label]) => (
+              <SelectItem key={value} value={value}>
+                {label}
+              </SelectItem>
+            ))}
+          </SelectContent>
+        </Select>
+      </div>
+
+      {/* Results */}
+      {!query ? null : isFetching && !results ? (
+        <div className="flex justify-center py-12">
+          <Loader2 className="h-8 w-8 animate-spin text-primary" />
+        </div>
+      ) : results?.length === 0 ? (
+        <p className="text-center text-muted-foreground py-12">找不到符合「{query}」的結果</p>
+      ) : (
+        <div className="space-y-3">
+          {results?.map((hit) => (
+            <Link key={`${hit.type}-${hit.id}`} href={`/courses/${hit.course_id}`}>
+              <Card className="cursor-pointer hover:shadow-md transition-shadow">
+                <CardContent className="p-4 space-y-2">
+                  <div className="flex items-center gap-2">
+                    <Badge variant="outline">{typeLabels[hit.type]}</Badge>
+                    <h3 className="font-medium">
+                      <Highlighted text={hit.title} ranges={hit.title_highlights} />
+                    </h3>
+                  </div>
+                  {hit.snippet && (
+                    <p className="text-sm text-muted-foreground whitespace-pre-line">
+                      <Highlighted text={hit.snippet} ranges={hit.highlights} />
+                    </p>
+                  )}
+                </CardContent>
+              </Card>
+            </Link>
+          ))}
+          <LoadMoreButton {...searchQuery} />
+        </div>
+      )}
+    </div>
+  );
+}
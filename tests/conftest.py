@@ -0,0 +1,61 @@
+"""測試共用的 app 與資料庫
+
+backend 在 import 時就讀取設定並建立 engine，所以環境變數要在 import backend 之前設定。
+預設使用暫存目錄中的 SQLite；設定 TEST_DATABASE_URL 可改用 PostgreSQL，
+每個測試開始前都會清空所有資料表。
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="aar-tests-"), "test.db")
+)
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ.update({
+    "DATABASE_POOL_WARMUP": "false",
+    # 查詢數與查詢計畫的檢查都要真的查資料庫
+    "RESPONSE_CACHE_ENABLED": "false",
+    "QUERY_GUARD": "true",
+    "BCRYPT_ROUNDS": "4",
+})
+
+import httpx
+import pytest
+from backend import auth, database
+from backend.database import Base, engine
+from backend.main import app as asgi_app, lifespan
+
+
+@pytest.fixture
+async def app():
+    """清空資料庫後執行 app 的 lifespan（建立資料表、啟動背景工作）"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    auth._token_cache.clear()
+    auth._token_version_cache.clear()
+    database._primary_reads_until.clear()
+    async with lifespan(asgi_app):
+        yield asgi_app
+    # 每個測試有自己的 event loop，連線不能留到下一個測試
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """註冊一位使用者，回傳帶 token 的 headers"""
+    async def register(email: str = "user@example.com") -> dict:
+        response = await client.post(
+            "/api/auth/register",
+            json={"email": email, "password": "password123", "name": email.split("@")[0]},
+        )
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+
+    return register
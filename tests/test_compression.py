@@ -0,0 +1,29 @@
+"""API 回應依 Accept-Encoding 協商 zstd / br / gzip，解壓後與未壓縮的本文相同"""
+import pytest
+
+
+@pytest.fixture
+async def headers(client, register):
+    headers = await register()
+    # 本文要超過 compression_min_size 才會壓縮
+    for i in range(20):
+        await client.post("/api/courses", json={"title": f"course-{i}", "description": "x" * 100}, headers=headers)
+    return headers
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("zstd", "zstd"),
+    ("br", "br"),
+    ("gzip", "gzip"),
+    ("gzip, br, zstd", "zstd"),
+    ("gzip, br", "br"),
+])
+async def test_negotiates_encoding(client, headers, accept, expected):
+    plain = await client.get("/api/courses", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    response = await client.get("/api/courses", headers={**headers, "Accept-Encoding": accept})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == expected
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == plain.content
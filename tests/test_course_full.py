@@ -0,0 +1,72 @@
+"""/api/courses/{id}/full 的查詢數不隨子資源筆數增加，子資源排序與各自的列表端點一致"""
+from datetime import datetime
+from sqlalchemy import update
+from backend.database import engine
+from backend.models import ActionItem
+from backend.query_budget import QueryCounter
+
+SIZES = [0, 1, 10, 100]
+
+
+async def create_course(client, headers, size: int, tag_ids) -> int:
+    course_id = (await client.post("/api/courses", json={"title": f"course-{size}"}, headers=headers)).json()["id"]
+    if size:
+        await client.post("/api/knowledge-points/bulk", headers=headers, json={
+            "items": [{"course_id": course_id, "title": f"kp-{i}"} for i in range(size)],
+        })
+        await client.post("/api/action-items/bulk", headers=headers, json={
+            "items": [{"course_id": course_id, "title": f"ai-{i}"} for i in range(size)],
+        })
+        for i in range(size):
+            await client.post("/api/review-logs", headers=headers, json={"course_id": course_id, "title": f"log-{i}"})
+        await client.post("/api/tags/course/bulk", headers=headers, json={
+            "course_id": course_id, "tag_ids": tag_ids[:size],
+        })
+    return course_id
+
+
+async def test_course_full_query_count_is_constant(client, register):
+    headers = await register()
+    tag_ids = [
+        (await client.post("/api/tags", json={"name": f"tag-{i}"}, headers=headers)).json()["id"]
+        for i in range(max(SIZES))
+    ]
+
+    counts = {}
+    for size in SIZES:
+        course_id = await create_course(client, headers, size, tag_ids)
+        with QueryCounter() as counter:
+            response = await client.get(f"/api/courses/{course_id}/full", headers=headers)
+        body = response.json()
+        assert response.status_code == 200, body
+        for key in ("knowledge_points", "action_items", "review_logs", "tags"):
+            assert len(body[key]) == size, key
+        counts[size] = counter.count
+
+    # 沒有子資源時 SQLAlchemy 會略過巢狀的 selectinload，所以只要求不超過一筆時的查詢數
+    assert max(counts.values()) <= counts[1], counts
+
+
+async def test_course_full_breaks_ties_by_id(client, register):
+    headers = await register()
+    course_id = (await client.post("/api/courses", json={"title": "course"}, headers=headers)).json()["id"]
+    await client.post("/api/action-items/bulk", headers=headers, json={
+        "items": [{"course_id": course_id, "title": f"ai-{i}"} for i in range(3)],
+    })
+    for i in range(3):
+        await client.post("/api/review-logs", headers=headers, json={
+            "course_id": course_id, "title": f"log-{i}", "review_date": "2026-01-01T00:00:00",
+        })
+    # 同一時間建立的資料
+    async with engine.begin() as conn:
+        await conn.execute(update(ActionItem).values(created_at=datetime(2026, 1, 1)))
+
+    body = (await client.get(f"/api/courses/{course_id}/full", headers=headers)).json()
+    for key, url in (
+        ("action_items", f"/api/action-items/course/{course_id}"),
+        ("review_logs", f"/api/review-logs/course/{course_id}"),
+    ):
+        ids = [row["id"] for row in body[key]]
+        assert ids == sorted(ids, reverse=True), key
+        listed = (await client.get(url, headers=headers)).json()
+        assert [row["id"] for row in listed] == ids, key
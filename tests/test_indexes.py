@@ -0,0 +1,72 @@
+"""各 router 的熱門查詢要走到 backend/models.py 宣告的複合索引
+
+實際呼叫端點、記錄它送出的 SELECT，再以同樣的參數執行 EXPLAIN（SQLite 為
+EXPLAIN QUERY PLAN），所以改動 router 的查詢時也會一併檢查。
+"""
+import pytest
+from sqlalchemy import event
+from backend.database import engine
+
+# (method, url, 查詢計畫中應出現的索引；任一即可)
+INDEXED_ENDPOINTS = [
+    ("GET", "/api/courses", ["ix_courses_user_id_updated_at"]),
+    ("GET", "/api/courses?cursor={cursor}", ["ix_courses_user_id_updated_at"]),
+    ("GET", "/api/courses/stats", ["ix_courses_user_id_updated_at"]),
+    ("GET", "/api/knowledge-points/course/{course_id}", ["ix_knowledge_points_course_id_created_at"]),
+    ("GET", "/api/action-items", ["ix_action_items_user_id_created_at"]),
+    ("GET", "/api/action-items?shape=normalized", ["ix_action_items_user_id_created_at"]),
+    ("GET", "/api/action-items/course/{course_id}", ["ix_action_items_course_id_user_id_created_at"]),
+    ("GET", "/api/review-logs", ["ix_review_logs_user_id_review_date"]),
+    ("GET", "/api/review-logs/course/{course_id}", ["ix_review_logs_course_id_user_id_review_date"]),
+    ("GET", "/api/tags", ["ix_tags_user_id_name"]),
+    ("GET", "/api/tags/course/{course_id}", ["uq_course_tags_course_id_tag_id", "ix_course_tags_course_id_created_at"]),
+    ("DELETE", "/api/tags/course/{course_id}/tag/{tag_id}", ["uq_course_tags_course_id_tag_id"]),
+]
+
+
+@pytest.fixture
+async def data(client, register):
+    headers = await register()
+    course_ids = [
+        (await client.post("/api/courses", json={"title": title}, headers=headers)).json()["id"]
+        for title in ("first", "second")
+    ]
+    course_id = course_ids[0]
+    await client.post("/api/knowledge-points", json={"course_id": course_id, "title": "kp"}, headers=headers)
+    await client.post("/api/action-items", json={"course_id": course_id, "title": "item"}, headers=headers)
+    await client.post("/api/review-logs", json={"course_id": course_id, "title": "log"}, headers=headers)
+    tag_id = (await client.post("/api/tags", json={"name": "tag"}, headers=headers)).json()["id"]
+    await client.post("/api/tags/course", json={"course_id": course_id, "tag_id": tag_id}, headers=headers)
+    cursor = (await client.get("/api/courses?limit=1", headers=headers)).json()["next_cursor"]
+    return {"headers": headers, "course_id": course_id, "tag_id": tag_id, "cursor": cursor}
+
+
+async def explain(statement: str, parameters) -> str:
+    async with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            # 測試資料很少，PostgreSQL 會偏好 seq scan；這裡只關心索引是否「可用」
+            await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            prefix = "EXPLAIN "
+        rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+    return " | ".join(str(row[-1]) for row in rows)
+
+
+@pytest.mark.parametrize("method, url, indexes", INDEXED_ENDPOINTS, ids=[f"{m} {u}" for m, u, _ in INDEXED_ENDPOINTS])
+async def test_endpoint_queries_use_index(client, data, method, url, indexes):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            executed.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.request(method, url.format(**data), headers=data["headers"])
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+
+    plans = [await explain(statement, parameters) for statement, parameters in executed]
+    assert any(index in plan for plan in plans for index in indexes), "\n".join(plans)
@@ -0,0 +1,27 @@
+"""知識點沒有 user_id，所有端點都要以所屬課程限定在目前使用者的資料"""
+
+
+async def test_other_users_cannot_touch_knowledge_points(client, register):
+    owner = await register("owner@example.com")
+    other = await register("other@example.com")
+    course_id = (await client.post("/api/courses", json={"title": "owner course"}, headers=owner)).json()["id"]
+    point_id = (await client.post(
+        "/api/knowledge-points",
+        json={"course_id": course_id, "title": "機器學習筆記", "content": "私人筆記"},
+        headers=owner,
+    )).json()["id"]
+
+    assert (await client.post(
+        "/api/knowledge-points", json={"course_id": course_id, "title": "x"}, headers=other,
+    )).status_code == 404
+    assert (await client.post(
+        "/api/knowledge-points/bulk", json={"items": [{"course_id": course_id, "title": "x"}]}, headers=other,
+    )).status_code == 404
+    assert (await client.patch(f"/api/knowledge-points/{point_id}", json={}, headers=other)).status_code == 404
+    assert (await client.delete(f"/api/knowledge-points/{point_id}", headers=other)).status_code == 404
+
+    # 搜尋索引仍屬於擁有者
+    other_hits = (await client.get("/api/search?q=機器", headers=other)).json()
+    owner_hits = (await client.get("/api/search?q=機器", headers=owner)).json()
+    assert not other_hits["items"]
+    assert [hit["id"] for hit in owner_hits["items"] if hit["type"] == "knowledge_point"] == [point_id]
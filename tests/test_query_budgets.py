@@ -0,0 +1,45 @@
+"""每個 GET 端點的查詢數不超過 @query_budget 標註的預算
+
+conftest 開啟了 QUERY_GUARD（關聯一律 lazy="raise"）：端點觸發 lazy load 或送出的 SQL
+超過預算時，QueryGuardMiddleware 會記錄警告，這裡把警告視為失敗。
+"""
+import logging
+import pytest
+from benchmarks.datagen import DatasetSpec, auth_headers, seed_database
+
+URLS = [
+    "/api/auth/me",
+    "/api/courses",
+    "/api/courses/stats",
+    "/api/courses/{course_id}",
+    "/api/courses/{course_id}/full",
+    "/api/knowledge-points/course/{course_id}",
+    "/api/action-items",
+    "/api/action-items?shape=normalized&fields=title,completed,course.title",
+    "/api/action-items/stats",
+    "/api/action-items/course/{course_id}",
+    "/api/review-logs",
+    "/api/review-logs?shape=normalized",
+    "/api/review-logs/course/{course_id}",
+    "/api/tags",
+    "/api/tags/course/{course_id}",
+    "/api/analytics/summary",
+    "/api/search?q=learning",
+    "/api/sync",
+]
+
+
+@pytest.fixture
+async def seeded(app):
+    # 資料筆數越多，N+1 越容易超出預算
+    users = await seed_database(DatasetSpec(users=2, courses=10))
+    return users[0]
+
+
+@pytest.mark.parametrize("url", URLS)
+async def test_endpoint_stays_within_query_budget(client, seeded, caplog, url):
+    caplog.set_level(logging.WARNING, logger="backend.query_budget")
+    response = await client.get(url.format(course_id=seeded.course_ids[0]), headers=auth_headers(seeded))
+
+    assert response.status_code == 200, response.text
+    assert not [record.getMessage() for record in caplog.records if record.name == "backend.query_budget"]
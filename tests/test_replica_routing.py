@@ -0,0 +1,119 @@
+"""讀取複本的路由：寫入一定進主資料庫，GET 讀取走複本
+
+以兩個 SQLite 檔案模擬主資料庫與讀取複本；複本從主資料庫複製後就不再同步，
+方便分辨資料來自哪一邊。
+"""
+import os
+import shutil
+import sqlite3
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend import auth, database
+
+pytestmark = pytest.mark.skipif(
+    database.engine.dialect.name != "sqlite", reason="以 SQLite 檔案模擬複本"
+)
+
+
+def course_titles(path: str):
+    with sqlite3.connect(path) as conn:
+        return {title for (title,) in conn.execute("SELECT title FROM courses")}
+
+
+def use_replica(monkeypatch, replica_engine):
+    monkeypatch.setattr(database, "replica_engine", replica_engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", async_sessionmaker(
+        replica_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False,
+    ))
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+
+
+@pytest.fixture
+async def replica(client, register, monkeypatch, tmp_path):
+    headers = await register()
+    primary_path = database.engine.url.database
+    replica_path = str(tmp_path / "replica.db")
+    # 複本從目前的主資料庫複製而來，之後不再同步
+    shutil.copyfile(primary_path, replica_path)
+    replica_engine = database._create_engine("sqlite+aiosqlite:///" + replica_path)
+    use_replica(monkeypatch, replica_engine)
+
+    statements = {"primary": [], "replica": []}
+    listeners = [
+        (target.sync_engine, lambda conn, cursor, statement, *args, name=name: statements[name].append(statement))
+        for name, target in (("primary", database.engine), ("replica", replica_engine))
+    ]
+    for target, listener in listeners:
+        event.listen(target, "before_cursor_execute", listener)
+
+    yield {"headers": headers, "primary": primary_path, "replica": replica_path, "statements": statements}
+
+    for target, listener in listeners:
+        event.remove(target, "before_cursor_execute", listener)
+    await replica_engine.dispose()
+
+
+async def list_titles(client, replica):
+    for bucket in replica["statements"].values():
+        bucket.clear()
+    response = await client.get("/api/courses", headers=replica["headers"])
+    assert response.status_code == 200, response.text
+    return {course["title"] for course in response.json()["items"]}
+
+
+async def create_course(client, replica, title: str = "written"):
+    for bucket in replica["statements"].values():
+        bucket.clear()
+    response = await client.post("/api/courses", json={"title": title}, headers=replica["headers"])
+    assert response.status_code == 200, response.text
+
+
+async def test_writes_go_to_primary_only(client, replica):
+    await create_course(client, replica)
+
+    assert "written" in course_titles(replica["primary"])
+    assert "written" not in course_titles(replica["replica"])
+    assert not any(
+        statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        for statement in replica["statements"]["replica"]
+    )
+
+
+async def test_reads_right_after_a_write_use_primary(client, replica):
+    await create_course(client, replica)
+
+    assert "written" in await list_titles(client, replica)
+    assert not replica["statements"]["replica"]
+
+
+async def test_reads_use_replica_after_lag_window(client, replica):
+    await create_course(client, replica)
+    database._primary_reads_until.clear()
+
+    assert "written" not in await list_titles(client, replica)
+    assert replica["statements"]["replica"]
+    assert not replica["statements"]["primary"]
+
+
+async def test_falls_back_to_primary_when_replica_is_down(client, replica, monkeypatch):
+    await create_course(client, replica)
+    database._primary_reads_until.clear()
+    # 指向不存在的目錄，連線時就會失敗
+    broken = create_async_engine("sqlite+aiosqlite:///" + os.path.join(replica["replica"], "missing", "replica.db"))
+    use_replica(monkeypatch, broken)
+    try:
+        assert "written" in await list_titles(client, replica)
+        assert database._replica_down_until > 0
+    finally:
+        await broken.dispose()
+
+
+async def test_authentication_on_cold_cache_does_not_touch_primary(client, replica):
+    database._primary_reads_until.clear()
+    auth._token_cache.clear()
+    auth._token_version_cache.clear()
+
+    await list_titles(client, replica)
+    assert any("token_version" in statement for statement in replica["statements"]["replica"])
+    assert not replica["statements"]["primary"]
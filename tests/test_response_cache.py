@@ -0,0 +1,41 @@
+"""回應快取的 ETag 由資料庫的版本號產生，多個 worker 之間也不會回傳過期的 304"""
+import pytest
+from backend import cache
+from backend.cache import MemoryCacheBackend, response_cache
+
+
+@pytest.fixture
+def workers(app, monkeypatch):
+    monkeypatch.setattr(cache.settings, "response_cache_enabled", True)
+    # 每個 worker 各有自己的記憶體快取
+    backends = [MemoryCacheBackend(max_entries=100, max_bytes=1024 * 1024) for _ in range(2)]
+
+    def use(worker: int) -> None:
+        monkeypatch.setattr(response_cache, "_backend", backends[worker])
+
+    return use
+
+
+async def test_write_on_another_worker_changes_etag(client, register, workers):
+    headers = await register()
+    workers(0)
+    first = await client.get("/api/courses", headers=headers)
+    etag = first.headers["etag"]
+
+    workers(1)
+    assert (await client.get("/api/courses", headers={**headers, "If-None-Match": etag})).status_code == 304
+    await client.post("/api/courses", json={"title": "written"}, headers=headers)
+
+    workers(0)
+    response = await client.get("/api/courses", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [course["title"] for course in response.json()["items"]] == ["written"]
+
+
+async def test_etag_is_stable_without_writes(client, register, workers):
+    headers = await register()
+    workers(0)
+    etag = (await client.get("/api/courses/stats", headers=headers)).headers["etag"]
+    workers(1)
+    assert (await client.get("/api/courses/stats", headers=headers)).headers["etag"] == etag
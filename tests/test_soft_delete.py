@@ -0,0 +1,60 @@
+"""課程軟刪除後、子資料清除前，統計與批次操作都要略過這門課程的子資料"""
+import pytest
+from backend.routers import courses
+
+
+@pytest.fixture
+async def data(client, register, monkeypatch):
+    # 模擬 commit 後的清除還沒執行（失敗或等待 run_course_purge_loop）
+    async def skip_purge(course_ids):
+        return 0
+
+    monkeypatch.setattr(courses.settings, "course_soft_delete", True)
+    monkeypatch.setattr(courses, "purge_deleted_courses", skip_purge)
+    headers = await register()
+    kept, deleted = [
+        (await client.post("/api/courses", json={"title": title}, headers=headers)).json()["id"]
+        for title in ("kept", "deleted")
+    ]
+    for course_id in (kept, deleted):
+        await client.post("/api/action-items", json={"course_id": course_id, "title": "item"}, headers=headers)
+        await client.post("/api/review-logs", json={
+            "course_id": course_id, "title": "log", "emotional_indicator": 5 if course_id == deleted else 1,
+        }, headers=headers)
+    point_id = (await client.post(
+        "/api/knowledge-points", json={"course_id": deleted, "title": "kp"}, headers=headers,
+    )).json()["id"]
+    tag_id = (await client.post("/api/tags", json={"name": "tag"}, headers=headers)).json()["id"]
+
+    response = await client.delete(f"/api/courses/{deleted}", headers=headers)
+    assert response.status_code == 200, response.text
+    return {"headers": headers, "deleted": deleted, "point_id": point_id, "tag_id": tag_id}
+
+
+async def test_analytics_skips_deleted_course_children(client, data):
+    summary = (await client.get("/api/analytics/summary", headers=data["headers"])).json()
+
+    assert summary["action_item_stats"]["total"] == 1
+    assert summary["review_log_count"] == 1
+    assert summary["average_emotional_score"] == 1
+    assert [point["emotional_indicator"] for point in summary["emotional_trend"]] == [1]
+
+
+async def test_bulk_add_tags_skips_deleted_course(client, data):
+    response = await client.post("/api/tags/course/bulk", json={
+        "course_id": data["deleted"], "tag_ids": [data["tag_id"]],
+    }, headers=data["headers"])
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+
+
+async def test_bulk_knowledge_point_writes_skip_deleted_course(client, data):
+    ids = {"ids": [data["point_id"]]}
+    updated = await client.patch("/api/knowledge-points/bulk", json={**ids, "patch": {"title": "new"}}, headers=data["headers"])
+    assert updated.status_code == 200
+    assert updated.json() == []
+
+    removed = await client.post("/api/knowledge-points/bulk-delete", json=ids, headers=data["headers"])
+    assert removed.status_code == 200
+    assert removed.json()["count"] == 0
@@ -0,0 +1,18 @@
+"""/api/sync 的刪除紀錄：資料庫 trigger 寫入的 tombstone 要涵蓋連帶刪除的資料"""
+
+
+async def test_deleting_tag_reports_its_course_tags(client, register):
+    headers = await register()
+    course_id = (await client.post("/api/courses", json={"title": "course"}, headers=headers)).json()["id"]
+    tag_id = (await client.post("/api/tags", json={"name": "tag"}, headers=headers)).json()["id"]
+    await client.post("/api/tags/course", json={"course_id": course_id, "tag_id": tag_id}, headers=headers)
+
+    synced = (await client.get("/api/sync", headers=headers)).json()
+    [link] = synced["course_tags"]
+
+    response = await client.delete(f"/api/tags/{tag_id}", headers=headers)
+    assert response.status_code == 200, response.text
+
+    deleted = (await client.get("/api/sync", params={"since": synced["token"]}, headers=headers)).json()["deleted"]
+    assert deleted["tags"] == [tag_id]
+    assert deleted["course_tags"] == [link["id"]]